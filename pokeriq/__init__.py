@@ -6,8 +6,25 @@ from .made_hand import Hand
 from .player import Player
 from .runout_simulation import Simulation
 from .equity_tools import EquitySolver
+from .runout_sampler import RunoutSampler
+from .random_engine import RandomEngine
+from .hand_evaluator import HandEvaluator, BoardState
+from .river_index import RiverIndex
+from .distributed_runner import WorkQueue, EquityWorker, EquityCoordinator
+from .results_store import ResultsStore
+from .checkpoint import Checkpoint
+from .hand_strength import HandStrength
+from .flop_report import FlopReport
+from .icm import ICMCalculator
+from .preflop_table import PreflopTable
+from .jit_kernel import JitKernel
+from .range_stream import RangeStream
+from .hand_history import HandHistory
+from .push_fold import PushFoldSolver
+from .range_session import RangeSession
+from .spot_batch import SpotBatch
 
-__all__ = ['Card', 'Deck', 'Hand', 'Player', 'Simulation', 'EquitySolver']
+__all__ = ['Card', 'Deck', 'Hand', 'Player', 'Simulation', 'EquitySolver', 'RunoutSampler', 'RandomEngine', 'HandEvaluator', 'BoardState', 'RiverIndex', 'WorkQueue', 'EquityWorker', 'EquityCoordinator', 'ResultsStore', 'Checkpoint', 'HandStrength', 'FlopReport', 'ICMCalculator', 'PreflopTable', 'JitKernel', 'RangeStream', 'HandHistory', 'PushFoldSolver', 'RangeSession', 'SpotBatch']
 __title__ = 'pokeriq'
 __version__ = '0.2.0'
 __author__ = 'Sucheer Maddury <sm2939@cornell.edu>'
@@ -44,6 +44,14 @@ class Card:
         """
         return(Card.suits[self.suit]+Card.ranks[self.rank])
     
+    def getIndex(self) -> int:
+        """
+        Returns the integer index of the card, suit-major in the order of Card.suits (e.g., '2s' is 0, 'Ac' is 51).
+        
+        :return: An integer representing the card (0-51).
+        """
+        return(list(Card.suits.keys()).index(self.suit)*13 + self.rank - 2)
+
     def equals(self, card: Self) -> bool:
         """
         Compares the current card with another card to check for equality.
@@ -117,6 +125,18 @@ class Card:
                 return(True)
         return(False)
     
+    @staticmethod
+    def fromIndex(index: int) -> Self:
+        """
+        Generates a Card object from its integer index (the inverse of getIndex).
+        
+        :param index: An integer representing a card (0-51).
+        :return: A Card object created from the index.
+        """
+        assert isinstance(index, int) and index >= 0 and index < 52, "INDEX IS NOT AN INTEGER ON [0,51]."
+
+        return(Card(list(Card.suits.keys())[index//13], index % 13 + 2))
+
     @staticmethod
     def generate(card: str) -> Self:
         """
@@ -0,0 +1,70 @@
+from typing import Self
+import hashlib
+import socket
+import json
+import os
+
+# checkpoint.py
+# This file contains a class for saving and restoring the partial state of long-running calculations.
+# A checkpoint is a small JSON file tagged with a digest of the calculation's inputs, written atomically
+# so that a process killed mid-write leaves the previous checkpoint intact.
+
+class Checkpoint:
+    def __init__(self, path: str, inputs: object) -> Self:
+        """
+        Initializes a checkpoint file for a calculation.
+
+        :param path: The path of the checkpoint file.
+        :param inputs: A JSON-serializable description of the calculation's inputs; a stored checkpoint
+                       is only resumed if its inputs match.
+        """
+        assert isinstance(path, str), "CHECKPOINT PATH IS NOT A STRING."
+
+        self.path = path
+        self.digest = Checkpoint.hash(inputs)
+
+    def load(self) -> dict | None:
+        """
+        Reads the stored state if it belongs to the same inputs.
+
+        :return: The stored state dictionary, or None if there is no checkpoint to resume.
+        """
+        try:
+            with open(self.path) as file:
+                stored = json.load(file)
+        except FileNotFoundError:
+            return(None)
+        assert stored.get("digest") == self.digest, "CHECKPOINT "+self.path+" WAS WRITTEN FOR DIFFERENT INPUTS."
+        return(stored["state"])
+
+    def save(self, state: dict) -> None:
+        """
+        Writes the state atomically, replacing any previous checkpoint.
+
+        :param state: A JSON-serializable dictionary of partial results.
+        """
+        temp = self.path+"."+socket.gethostname()+"."+str(os.getpid())+".tmp"
+        with open(temp, "w") as file:
+            json.dump({"digest": self.digest, "state": state}, file, separators = (",", ":"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp, self.path)
+
+    def clear(self) -> None:
+        """
+        Removes the checkpoint once the calculation has finished.
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def hash(inputs: object) -> str:
+        """
+        Returns a digest of a calculation's inputs.
+
+        :param inputs: A JSON-serializable description of the inputs.
+        :return: A hex digest.
+        """
+        return(hashlib.sha1(json.dumps(inputs, sort_keys = True).encode()).hexdigest())
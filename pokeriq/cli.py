@@ -0,0 +1,154 @@
+from .card import Card
+from .equity_tools import EquitySolver
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterator, TextIO
+from math import ceil, sqrt
+import numpy as np
+import argparse
+import json
+import time
+import sys
+
+# cli.py
+# This file contains the `pokeriq` console script, which streams equity jobs from JSONL.
+# Each input line is a spot, e.g. {"id": 1, "holes": [["Ah", "Kh"], []], "board": ["Jh", "7c", "2h"], "dead": ["2c"]}
+# or {"id": 2, "ranges": [["AA", "AKs"], ["QQ", "JJ"]], "board": ["Jh", "7c", "2h"], "precision": 0.002}.
+# One JSON result line is written as each spot finishes, with at most a few spots per worker held in memory.
+
+def solveSpot(spot: dict, precision: float, seed: list[int] | None) -> dict:
+    """
+    Solves one spot. The number of trials is the spot's "trials", or else the number of trials that
+    brings the worst-case binomial standard error down to the spot's (or the default) precision.
+
+    :param spot: A spot definition with "holes" or "ranges", and optional "board", "dead", "trials" and "precision".
+    :param precision: The default target standard error.
+    :param seed: An optional seed (entropy list) for reproducible results.
+    :return: A result dictionary with the spot id, equities, trials, standard error and elapsed seconds.
+    """
+    start = time.time()
+    precision = spot.get("precision", precision)
+    assert isinstance(precision, (int, float)) and not isinstance(precision, bool) and precision > 0, "PRECISION IS NOT A POSITIVE NUMBER."
+    assert spot.get("trials") is None or (isinstance(spot["trials"], int) and not isinstance(spot["trials"], bool) and spot["trials"] > 0), "TRIALS INPUT IS NOT A POSITIVE INTEGER."
+    trials = spot.get("trials") or ceil(0.25/precision**2)
+    sequence = np.random.SeedSequence(seed) if seed is not None else None
+    if "ranges" in spot:
+        dead = {card.getIndex() for card in Card.generateSet(spot.get("dead", []))}
+        ranges = [[hand for hand in EquitySolver.generateRange(range) if not dead & {card.getIndex() for card in hand}] for range in spot["ranges"]]
+        board = Card.generateSet(spot.get("board", []))
+        deck = EquitySolver.deadDeck(Card.generateSet(spot.get("dead", [])))
+        if len(board) == 5 and len(ranges) == 2:
+            equities, _ = EquitySolver.calculateRangeEquity(*ranges, customDeck = deck, customBoard = board)
+            trials = None
+        else:
+            equities = EquitySolver.sampleRangeEquity(*ranges, samples = trials, customDeck = deck, customBoard = board, rng = np.random.default_rng(sequence))
+    else:
+        solver = EquitySolver.fromSpot(spot)
+        equities = solver.calculateHandEquity(trials, rng = np.random.default_rng(sequence))
+    error = (max(sqrt(max(0.0, p*(1 - p))/trials) for p in equities.values()) if trials else 0.0)
+    return({"id": spot.get("id"), "equities": equities, "trials": trials, "standardError": error, "elapsed": time.time() - start})
+
+def readSpots(stream: TextIO) -> Iterator[tuple[int, dict | None, str | None]]:
+    """
+    Lazily parses spots from a JSONL stream, skipping blank lines.
+
+    :param stream: A text stream with one JSON spot per line.
+    :return: An iterator of (line number, spot or None, parse error or None) tuples.
+    """
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            spot = json.loads(line)
+            assert isinstance(spot, dict), "LINE IS NOT A JSON OBJECT."
+            spot.setdefault("id", number)
+            yield (number, spot, None)
+        except (ValueError, AssertionError) as error:
+            yield (number, None, str(error))
+
+def failure(spot: dict | None, number: int, error: BaseException | str) -> dict:
+    """
+    Builds the result line of a spot that could not be solved.
+
+    :param spot: The spot, or None if it could not be parsed.
+    :param number: The line number of the spot.
+    :param error: The exception or message describing the failure.
+    :return: A result dictionary with the spot id and the failure message.
+    """
+    return({"id": (spot or {}).get("id", number), "failure": str(error) or type(error).__name__})
+
+def main(argv: list[str] = None) -> int:
+    """
+    Runs the console script.
+
+    :param argv: Optional command line arguments (default is sys.argv[1:]).
+    :return: The exit status (1 if any spot failed, 0 otherwise).
+    """
+    parser = argparse.ArgumentParser(prog = "pokeriq", description = "Stream equity results for JSONL spot definitions.")
+    parser.add_argument("input", nargs = "?", default = "-", help = "JSONL file of spots (default is stdin)")
+    parser.add_argument("-o", "--output", default = "-", help = "JSONL file for results (default is stdout)")
+    parser.add_argument("-w", "--workers", type = int, default = 1, help = "number of worker processes (default is 1)")
+    parser.add_argument("-p", "--precision", type = float, default = 0.005, help = "default target standard error (default is 0.005)")
+    parser.add_argument("-s", "--seed", type = int, default = None, help = "seed for reproducible results")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    sink = sys.stdout if args.output == "-" else open(args.output, "w")
+    failed = False
+
+    def emit(result: dict) -> None:
+        nonlocal failed
+        failed = failed or "failure" in result
+        sink.write(json.dumps(result)+"\n")
+        sink.flush()
+
+    def seedOf(number: int) -> list[int] | None:
+        return(None if args.seed is None else [args.seed, number])
+
+    try:
+        if args.workers <= 1:
+            for number, spot, error in readSpots(source):
+                try:
+                    emit(failure(spot, number, error) if error else solveSpot(spot, args.precision, seedOf(number)))
+                except Exception as exception:
+                    emit(failure(spot, number, exception))
+        else:
+            with ProcessPoolExecutor(args.workers) as pool:
+                running = {}
+                for number, spot, error in readSpots(source):
+                    if error:
+                        emit(failure(spot, number, error))
+                        continue
+                    # Bound the spots in flight, so memory stays flat however long the input is.
+                    while len(running) >= 2*args.workers:
+                        finished, _ = wait(running, return_when = FIRST_COMPLETED)
+                        for future in finished:
+                            emitFuture(future, running.pop(future), emit)
+                    running[pool.submit(solveSpot, spot, args.precision, seedOf(number))] = (number, spot)
+                while running:
+                    finished, _ = wait(running, return_when = FIRST_COMPLETED)
+                    for future in finished:
+                        emitFuture(future, running.pop(future), emit)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    return(1 if failed else 0)
+
+def emitFuture(future, origin: tuple[int, dict], emit) -> None:
+    """
+    Emits the result of a finished spot, or its failure. Any error of one spot is reported in its result line,
+    so a bad line never ends the stream.
+
+    :param future: The finished Future of a solveSpot call.
+    :param origin: The line number and spot the future was submitted for.
+    :param emit: The callable writing a result line.
+    """
+    number, spot = origin
+    try:
+        emit(future.result())
+    except Exception as exception:
+        emit(failure(spot, number, exception))
+
+if __name__ == "__main__":
+    sys.exit(main())
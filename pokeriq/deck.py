@@ -1,6 +1,7 @@
 from .card import Card
+from .random_engine import RandomEngine
 from typing import Self
-import random
+import numpy as np
 import copy
 
 # deck.py
@@ -8,12 +9,16 @@ import copy
 # It provides methods for shuffling, drawing, adding/removing cards, and dealing cards for poker games.
 
 class Deck:
-    def __init__(self, cardStack: list[Card] = None) -> Self:
+    def __init__(self, cardStack: list[Card] = None, rng: RandomEngine | np.random.Generator = None, seed: int = None) -> Self:
         """
         Initializes the deck with a list of Card objects, either provided or by creating a standard 52-card deck.
+        The cards the deck starts with are kept as its composition, which removing dead cards does not change.
         
         :param cardStack: An optional list of Card objects to initialize the deck with.
+        :param rng: An optional RandomEngine or NumPy Generator used for shuffling.
+        :param seed: An optional integer seed used for shuffling when no rng is given.
         """
+        self.rng = RandomEngine.resolve(rng, seed)
         if cardStack:
             assert isinstance(cardStack, list) and all(isinstance(card, Card) for card in cardStack), "INPUT CARDSTACK IS NOT A LIST OF CARDS."
 
@@ -23,14 +28,15 @@ class Deck:
             for i in list(Card.suits.keys()):
                 for k in list(Card.ranks.keys()):
                     self.cards.append(Card(i, k))
+        self.composition = list(self.cards)
     
-    def shuffle(self) -> None:
+    def shuffle(self, rng: RandomEngine | np.random.Generator = None) -> None:
         """
-        Shuffles the deck of cards multiple times.
+        Shuffles the deck of cards with a single uniform permutation.
+
+        :param rng: An optional RandomEngine or NumPy Generator to shuffle with (default is the deck's own engine).
         """
-        random.shuffle(self.cards)
-        random.shuffle(self.cards)
-        random.shuffle(self.cards)
+        (RandomEngine.resolve(rng) if rng is not None else self.rng).shuffle(self.cards)
     
     def contains(self, card: Card) -> bool:
         """
@@ -51,6 +57,16 @@ class Deck:
         """
         return(self.cards)
     
+    def getComposition(self) -> list[Card]:
+        """
+        Returns the cards of the game the deck was built for: the cards it started (or was reset) with and any cards
+        added since, including cards removed or drawn. Hand evaluators are generated from the composition (see
+        HandEvaluator.forDeck), so dead cards never change which straights exist.
+        
+        :return: A list of Card objects.
+        """
+        return(self.composition)
+
     def getDepth(self) -> int:
         """
         Returns the number of cards remaining in the deck.
@@ -83,6 +99,8 @@ class Deck:
         assert isinstance(card, Card), "INPUT IS OF INVALID TYPE."
 
         self.cards.append(card)
+        if not Card.contains(self.composition, card):
+            self.composition.append(card)
 
     def draw(self) -> Card:
         """
@@ -131,6 +149,7 @@ class Deck:
             for i in list(Card.suits.keys()):
                 for k in list(Card.ranks.keys()):
                     self.cards.append(Card(i, k))
+        self.composition = list(self.cards)
     
     
 
@@ -0,0 +1,325 @@
+from .equity_tools import EquitySolver
+from .random_engine import RandomEngine
+from typing import Self, Iterator
+import multiprocessing
+import tempfile
+import shutil
+import socket
+import json
+import time
+import sys
+import os
+
+# distributed_runner.py
+# This file contains classes for running many equity spots over a pool of worker processes on one or more nodes.
+# Work is sharded into (spot, trial block) tasks on a file-backed queue in a shared directory; workers claim tasks
+# by atomic rename, and the coordinator merges block results associatively and requeues tasks of lost workers.
+
+class WorkQueue:
+    def __init__(self, root: str) -> Self:
+        """
+        Initializes a queue in a directory shared by the coordinator and all workers.
+
+        :param root: The path of the queue directory (created if missing).
+        """
+        assert isinstance(root, str), "QUEUE ROOT IS NOT A STRING."
+
+        self.root = root
+        for folder in ("pending", "claimed", "done"):
+            os.makedirs(os.path.join(root, folder), exist_ok = True)
+
+    def path(self, folder: str, taskId: str) -> str:
+        """
+        Returns the path of a task file.
+
+        :param folder: The queue folder ('pending', 'claimed' or 'done').
+        :param taskId: The identifier of the task.
+        :return: The path of the task file.
+        """
+        return(os.path.join(self.root, folder, taskId+".json"))
+
+    def write(self, path: str, content: dict) -> None:
+        """
+        Writes a JSON file atomically, so readers never see a partial file.
+
+        :param path: The destination path.
+        :param content: A JSON-serializable dictionary.
+        """
+        temp = path+"."+socket.gethostname()+"."+str(os.getpid())+".tmp"
+        with open(temp, "w") as file:
+            json.dump(content, file)
+        os.replace(temp, path)
+
+    def put(self, taskId: str, task: dict) -> None:
+        """
+        Adds a task to the pending folder.
+
+        :param taskId: The identifier of the task.
+        :param task: A JSON-serializable task description.
+        """
+        self.write(self.path("pending", taskId), task)
+
+    def claim(self) -> tuple[str, dict] | None:
+        """
+        Claims the next pending task. The rename into the claimed folder is atomic, so each task is
+        claimed by exactly one worker; the claim time marks the start of the worker's lease.
+
+        :return: A tuple of the task identifier and the task, or None if no task is pending.
+        """
+        for name in sorted(os.listdir(os.path.join(self.root, "pending"))):
+            if not name.endswith(".json"):
+                continue
+            taskId = name[:-5]
+            try:
+                os.rename(self.path("pending", taskId), self.path("claimed", taskId))
+            except FileNotFoundError:
+                continue
+            os.utime(self.path("claimed", taskId))
+            with open(self.path("claimed", taskId)) as file:
+                return(taskId, json.load(file))
+        return(None)
+
+    def complete(self, taskId: str, result: dict) -> None:
+        """
+        Publishes the result of a claimed task and releases the claim.
+
+        :param taskId: The identifier of the task.
+        :param result: A JSON-serializable result.
+        """
+        self.write(self.path("done", taskId), result)
+        try:
+            os.remove(self.path("claimed", taskId))
+        except FileNotFoundError:
+            pass
+
+    def results(self) -> Iterator[tuple[str, dict]]:
+        """
+        Yields and removes the published results.
+
+        :return: An iterator of (task identifier, result) tuples.
+        """
+        for name in sorted(os.listdir(os.path.join(self.root, "done"))):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.root, "done", name)
+            with open(path) as file:
+                result = json.load(file)
+            os.remove(path)
+            yield (name[:-5], result)
+
+    def expire(self, lease: float) -> list[str]:
+        """
+        Returns the claimed tasks whose lease has run out to the pending folder.
+
+        :param lease: The number of seconds a worker may hold a task.
+        :return: A list of the identifiers of the requeued tasks.
+        """
+        expired = []
+        now = time.time()
+        for name in os.listdir(os.path.join(self.root, "claimed")):
+            if not name.endswith(".json"):
+                continue
+            taskId = name[:-5]
+            try:
+                if now - os.path.getmtime(self.path("claimed", taskId)) > lease:
+                    os.rename(self.path("claimed", taskId), self.path("pending", taskId))
+                    expired.append(taskId)
+            except FileNotFoundError:
+                continue
+        return(expired)
+
+    def stop(self) -> None:
+        """
+        Signals all workers attached to the queue to exit.
+        """
+        open(os.path.join(self.root, "STOP"), "w").close()
+
+    def isStopped(self) -> bool:
+        """
+        Checks whether the queue has been stopped.
+
+        :return: True if the coordinator has stopped the queue, False otherwise.
+        """
+        return(os.path.exists(os.path.join(self.root, "STOP")))
+
+class EquityWorker:
+    def __init__(self, root: str, pollInterval: float = 0.05) -> Self:
+        """
+        Initializes a worker attached to a queue directory.
+
+        :param root: The path of the queue directory.
+        :param pollInterval: The number of seconds to wait when no task is pending (default is 0.05).
+        """
+        self.queue = WorkQueue(root)
+        self.pollInterval = pollInterval
+
+    def run(self) -> None:
+        """
+        Claims and computes tasks until the queue is stopped. A task that fails publishes its error as the result,
+        so the coordinator reports it at once instead of waiting out the lease and retrying it.
+        """
+        while not self.queue.isStopped():
+            claimed = self.queue.claim()
+            if claimed is None:
+                time.sleep(self.pollInterval)
+                continue
+            taskId, task = claimed
+            try:
+                result = EquityWorker.compute(task)
+            except Exception as exception:
+                result = {"index": task.get("index"), "error": type(exception).__name__+": "+str(exception)}
+            self.queue.complete(taskId, result)
+
+    @staticmethod
+    def compute(task: dict) -> dict:
+        """
+        Computes one trial block of a spot and returns it as a mergeable accumulator.
+
+        :param task: A task with the spot definition, the number of trials and the block seed.
+        :return: An accumulator with the block's trial count and the weighted win counts of each outcome.
+        """
+        solver = EquitySolver.fromSpot(task["spot"])
+        equities = solver.calculateHandEquity(task["trials"], task.get("sampling", "uniform"), seed = task["seed"])
+        return({"index": task["index"], "trials": task["trials"], "counts": {name: value*task["trials"] for name, value in equities.items()}})
+
+class EquityCoordinator:
+    def __init__(self, root: str = None, blockSize: int = 5000, lease: float = 120.0, maxAttempts: int = 3, pollInterval: float = 0.05) -> Self:
+        """
+        Initializes a coordinator over a queue directory.
+
+        :param root: The path of the queue directory, shared with remote workers (default is a new temporary directory,
+                     owned by the coordinator and removed when a run without remote workers finishes or on close).
+        :param blockSize: The maximum number of trials per task (default is 5000).
+        :param lease: The number of seconds after which a claimed task is considered lost and requeued (default is 120).
+        :param maxAttempts: The number of times a task may be handed out before the run fails (default is 3).
+        :param pollInterval: The number of seconds between polls of the queue (default is 0.05).
+        """
+        assert isinstance(blockSize, int) and blockSize > 0, "BLOCK SIZE IS NOT A POSITIVE INTEGER."
+        assert lease > 0, "LEASE IS NOT POSITIVE."
+        assert isinstance(maxAttempts, int) and maxAttempts > 0, "MAX ATTEMPTS IS NOT A POSITIVE INTEGER."
+
+        self.queue = WorkQueue(root or tempfile.mkdtemp(prefix = "pokeriq-queue-"))
+        self.ownsRoot = root is None
+        self.blockSize = blockSize
+        self.lease = lease
+        self.maxAttempts = maxAttempts
+        self.pollInterval = pollInterval
+
+    def getRoot(self) -> str:
+        """
+        Returns the queue directory, to be passed to workers started on other nodes.
+
+        :return: The path of the queue directory.
+        """
+        return(self.queue.root)
+
+    def __enter__(self) -> Self:
+        return(self)
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stops the workers attached to the queue and removes the queue directory if the coordinator created it.
+        """
+        if os.path.isdir(self.queue.root):
+            self.queue.stop()
+        if self.ownsRoot:
+            shutil.rmtree(self.queue.root, ignore_errors = True)
+
+    def run(self, spots: list[dict], trials: int = 10000, workers: int = None, sampling: str = "uniform", rng: RandomEngine = None, seed: int = None, remoteWorkers: bool = False) -> list[dict[str: float]]:
+        """
+        Shards spots into trial blocks, waits for workers to compute them and merges the results.
+        Local worker processes are started (and restarted if they die); further workers can join from
+        other nodes with EquityWorker(coordinator.getRoot()).run(). Each block has its own seed, so the
+        result does not depend on which worker computed a block or how often it was retried. Spots are
+        validated before any task is queued, and a task that fails in a worker fails the run with its error.
+        A temporary queue directory is removed when the run finishes, unless remote workers attach to it.
+
+        :param spots: A list of spot definitions (see EquitySolver.fromSpot); a spot's "trials" overrides trials.
+        :param trials: The default number of trials per spot (default is 10000).
+        :param workers: The number of local worker processes (default is the CPU count; 0 requires remoteWorkers).
+        :param sampling: The runout sampling mode of each block (default is 'uniform').
+        :param rng: An optional RandomEngine or NumPy Generator used to seed the blocks.
+        :param seed: An optional integer seed used to seed the blocks when no rng is given.
+        :param remoteWorkers: Whether workers on other nodes attach to the queue (default is False).
+        :return: A list of equity dictionaries in the order of the spots.
+        """
+        assert isinstance(spots, list) and all(isinstance(spot, dict) for spot in spots), "SPOTS IS NOT A LIST OF DICTIONARIES."
+        assert workers is None or (isinstance(workers, int) and workers >= 0), "WORKERS IS NOT A NON-NEGATIVE INTEGER."
+        assert workers != 0 or remoteWorkers, "NO LOCAL WORKERS AND NO REMOTE WORKERS EXPECTED."
+        for spot in spots:
+            EquitySolver.fromSpot(spot)
+            assert isinstance(spot.get("trials", trials), int) and spot.get("trials", trials) > 0, "TRIALS INPUT IS NOT A POSITIVE INTEGER."
+
+        engine = RandomEngine.resolve(rng, seed)
+        self.queue = WorkQueue(self.queue.root)
+        if self.queue.isStopped():
+            os.remove(os.path.join(self.queue.root, "STOP"))
+        tasks = {}
+        for index, spot in enumerate(spots):
+            total = spot.get("trials", trials)
+            for block, start in enumerate(range(0, total, self.blockSize)):
+                taskId = str(index).zfill(8)+"-"+str(block).zfill(6)
+                tasks[taskId] = {"index": index, "spot": spot, "trials": min(self.blockSize, total - start),
+                                 "sampling": sampling, "seed": int(engine.getGenerator().integers(2**63))}
+                self.queue.put(taskId, tasks[taskId])
+
+        attempts = {taskId: 1 for taskId in tasks}
+        accumulators = [None]*len(spots)
+        processes = [None]*((os.cpu_count() or 1) if workers is None else workers)
+        try:
+            while attempts:
+                for i, process in enumerate(processes):
+                    if process is None or not process.is_alive():
+                        processes[i] = multiprocessing.Process(target = EquityWorker(self.queue.root, self.pollInterval).run, daemon = True)
+                        processes[i].start()
+                for taskId, result in self.queue.results():
+                    if attempts.pop(taskId, None) is not None:
+                        assert "error" not in result, "TASK "+taskId+" FAILED: "+str(result.get("error"))
+                        index = result["index"]
+                        accumulators[index] = EquityCoordinator.merge(accumulators[index], result)
+                for taskId in self.queue.expire(self.lease):
+                    if taskId in attempts:
+                        attempts[taskId] += 1
+                        assert attempts[taskId] <= self.maxAttempts, "TASK "+taskId+" FAILED "+str(self.maxAttempts)+" TIMES."
+                time.sleep(self.pollInterval)
+        finally:
+            self.queue.stop()
+            for process in processes:
+                if process is not None:
+                    process.join(timeout = 5)
+            if self.ownsRoot and not remoteWorkers:
+                shutil.rmtree(self.queue.root, ignore_errors = True)
+
+        return([EquityCoordinator.finalize(accumulator) for accumulator in accumulators])
+
+    @staticmethod
+    def merge(first: dict | None, second: dict) -> dict:
+        """
+        Merges two block accumulators of the same spot. Merging is associative and commutative, so blocks
+        can be combined in any order they arrive.
+
+        :param first: An accumulator, or None for an empty one.
+        :param second: An accumulator.
+        :return: The combined accumulator.
+        """
+        if first is None:
+            return({"index": second["index"], "trials": second["trials"], "counts": dict(second["counts"])})
+        counts = {name: first["counts"].get(name, 0) + second["counts"].get(name, 0) for name in first["counts"] | second["counts"]}
+        return({"index": first["index"], "trials": first["trials"] + second["trials"], "counts": counts})
+
+    @staticmethod
+    def finalize(accumulator: dict) -> dict[str: float]:
+        """
+        Converts an accumulator to an equity dictionary.
+
+        :param accumulator: A merged accumulator of a spot.
+        :return: A dictionary of player names (and "CHOP") and their respective equity percentages.
+        """
+        return({name: count/accumulator["trials"] for name, count in accumulator["counts"].items()})
+
+if __name__ == "__main__":
+    # Starts a worker on another node: python -m pokeriq.distributed_runner <queue directory>
+    EquityWorker(sys.argv[1]).run()
@@ -3,11 +3,19 @@ from .made_hand import Hand
 from .deck import Deck
 from .player import Player
 from .runout_simulation import Simulation
+from .runout_sampler import RunoutSampler
+from .random_engine import RandomEngine
+from .hand_evaluator import HandEvaluator, BoardState
+from .river_index import RiverIndex
+from .checkpoint import Checkpoint
+from .jit_kernel import JitKernel
+from .range_stream import RangeStream
+from .preflop_table import PreflopTable
 from itertools import product, combinations, permutations
 from typing import Self, Iterable, Callable
-from scipy.optimize import root_scalar
-import random
+import numpy as np
 import copy
+import time
 import builtins
 
 # equity_tools.py
@@ -16,21 +24,29 @@ import builtins
 # to determine equity percentages based on a given board state and players' hole cards.
 
 class EquitySolver:
-    def __init__(self) -> Self:
+
+    backends = ('python', 'numba')
+
+    def __init__(self, game: str = 'holdem') -> Self:
         """
         Initializes the EquitySolver instance with empty player list, 
         no community cards, and a new deck.
 
+        :param game: The game played, 'holdem' or 'omaha' (default is 'holdem').
         :param players: A list of Player objects participating in the game.
         :param flop: The first three community cards (list of Card objects).
         :param turn: The fourth community card (list of one Card object).
         :param river: The fifth community card (list of one Card object).
         """
+        assert game in Player.holeSizes, "GAME MUST BE ONE OF "+str(tuple(Player.holeSizes))+"."
+
+        self.game = game
         self.players = []
         self.flop = None
         self.turn = None
         self.river = None
         self.deck = Deck()
+        self.ranking = 'standard'
         self.handEquities = None
     
     def getHandEquities(self) -> dict[str: float]:
@@ -50,7 +66,7 @@ class EquitySolver:
         assert len(self.players) + amnt <= 10, "MAX AMOUNT OF PLAYERS ALREADY REACHED (10)."
 
         for _ in range(amnt):
-            self.players.append(Player("Player "+str(len(self.players)+1)))
+            self.players.append(Player("Player "+str(len(self.players)+1), game = self.game))
 
     def removePlayers(self, amnt: int = 1) -> None:
         """
@@ -68,17 +84,18 @@ class EquitySolver:
         Assigns hole cards to a player by their ID.
 
         :param id: The player ID to assign hole cards to.
-        :param hole: A list of two Card objects representing the player's hole cards.
+        :param hole: A list of two Card objects (four in Omaha) representing the player's hole cards.
         """
-        assert isinstance(hole, list) and all(isinstance(card, Card) for card in hole), "HOLE IS NOT A LIST OF TWO CARDS."
-        assert len(hole) == 2, "TWO CARDS NOT GIVEN."
-        assert not hole[0].equals(hole[1]), "BOTH CARDS ARE THE SAME."
+        size = Player.holeSizes[self.game]
+        assert isinstance(hole, list) and all(isinstance(card, Card) for card in hole), "HOLE IS NOT A LIST OF CARDS."
+        assert len(hole) == size, str(size)+" CARDS NOT GIVEN."
+        assert len({card.getIndex() for card in hole}) == size, "HOLE CARDS ARE NOT DISTINCT."
         assert Player.contains(self.players, "Player "+str(id)), "Player "+str(id)+" DOES NOT EXIST."
         
         index = Player.index(self.players, "Player "+str(id))
         self.players[index].clearHole()
-        self.players[index].assignHole(hole[0])
-        self.players[index].assignHole(hole[1])
+        for card in hole:
+            self.players[index].assignHole(card)
 
     def clearHole(self, id: int) -> None:
         """
@@ -91,16 +108,22 @@ class EquitySolver:
         index = Player.index(self.players, "Player "+str(id))
         self.players[index].clearHole()
     
-    def defineDeck(self, deck: Deck) -> None:
+    def defineDeck(self, deck: Deck, ranking: str | tuple[str, ...] = 'standard') -> None:
         """
-        Defines the deck to be used in the simulation.
+        Defines the deck to be used in the simulation, and the ranking order of made hands. Hands are scored by
+        the evaluator generated for the deck's composition (see HandEvaluator.forDeck), so a short deck plays
+        A-6-7-8-9 straights, and with ranking='shortdeck' flushes beat full houses.
 
         :param deck: The Deck object to be used in the simulation.
+        :param ranking: A name in HandEvaluator.rankings, or an order of the categories of Hand.hands, strongest first (default is 'standard').
         """
         assert isinstance(deck, Deck), "DECK INPUT IS OF INVALID TYPE."
-        assert deck.getDepth() >= 2*len(self.players) + 8, "DECK IS TOO SMALL, REQUIRES AT LEAST "+str(2*len(self.players) + 8)+" CARDS."
+        assert ranking in HandEvaluator.rankings or sorted(ranking) == sorted(Hand.hands), "RANKING MUST BE ONE OF "+str(tuple(HandEvaluator.rankings))+" OR AN ORDER OF Hand.hands."
+        required = Player.holeSizes[self.game]*len(self.players) + 8
+        assert deck.getDepth() >= required, "DECK IS TOO SMALL, REQUIRES AT LEAST "+str(required)+" CARDS."
 
         self.deck = deck
+        self.ranking = ranking
 
     def defineBoard(self, board: list[Card]) -> None:
         """
@@ -115,73 +138,313 @@ class EquitySolver:
         self.turn = ([board[3]] if len(board) > 3 else None)
         self.river = ([board[4]] if len(board) > 4 else None)
     
-    def calculateHandEquity(self, trials: int = 1000) -> dict[str: float]:
+    def calculateHandEquity(self, trials: int = 1000, sampling: str = 'uniform', rng: RandomEngine | np.random.Generator = None, seed: int = None, backend: str = 'python') -> dict[str: float]:
         """
         Calculates the hand equity for each player based on simulations.
 
         :param trials: The number of trials (default is 1000).
-        :return: A dictionary of player names and their respective equity percentages.
+        :param sampling: The runout sampling mode, one of RunoutSampler.modes (default is 'uniform').
+                         Of the variance reduction modes only 'sobol' (trials rounded up to a power of two) reliably
+                         pays off, reaching the error of 'uniform' with about 3-6x fewer trials. 'stratified' enumerates
+                         a flop exactly once trials cover every turn and river pair and gives under 2x below that,
+                         'antithetic' gives at most about 1.5x, and 'exact' enumerates
+                         every board completion and ignores trials.
+        :param rng: An optional RandomEngine or NumPy Generator to draw runouts from.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        :param backend: The trial loop, 'python' or 'numba' (compiled when Numba is installed, default is 'python').
+        :return: A dictionary of player names and their respective equity percentages. With 'uniform' sampling, one
+                 known hole against random holes on an empty board and a full standard deck is read from the preflop
+                 table instead (see EquitySolver.isPreflopTableSpot).
         """
-        assert isinstance(trials, int) and trials > 0, "TRIALS INPUT IS NOT A POSITIVE INTEGER."
-        assert self.deck.getDepth() >= 2*len(self.players) + 8, "DECK IS TOO SMALL, REQUIRES AT LEAST "+str(2*len(self.players) + 8)+" CARDS."
         assert len(self.players) > 0, "NO PLAYERS ADDED"
 
-        tempDeck = copy.deepcopy(self.deck)
+        holes = tuple(tuple(player.showHole()) for player in self.players)
+        board = tuple((self.flop or []) + (self.turn or []) + (self.river or []))
+        equityDict = EquitySolver.solveHandEquity(holes, board, tuple(self.deck.getCards()), trials, sampling, rng, seed, self.game, self.ranking, backend, tuple(self.deck.getComposition()))
+        equityDict = {player.getName(): equity for player, equity in zip(self.players, equityDict.values())} | {"CHOP": equityDict["CHOP"]}
 
-        equityDict = {}
-        for player in self.players:
-            equityDict[player.getName()] = 0
-            tempHole = player.showHole()
-            if len(tempHole) > 0:
-                # assert tempDeck.contains(tempHole[0]) and tempDeck.contains(tempHole[1]), "INVALID DECK."
-                tempDeck.remove(tempHole[0])
-                tempDeck.remove(tempHole[1])
-        equityDict["CHOP"] = 0
+        self.handEquities = equityDict
+        return(equityDict)
 
-        burns = 0
-
-        if self.flop:
-            for card in self.flop:
-                # assert tempDeck.contains(card), "INVALID DECK."
-                tempDeck.remove(card)
-            burns += 1
-                
-        if self.turn:
-            # assert tempDeck.contains(self.turn[0]), "INVALID DECK."
-            tempDeck.remove(self.turn[0])
-            burns += 1
-
-        if self.river:
-            # assert tempDeck.contains(self.river[0]), "INVALID DECK."
-            tempDeck.remove(self.river[0])
-            burns += 1
-        
-        
-        for _ in range(trials):
-            trialDeck = copy.deepcopy(tempDeck)
-            trialDeck.shuffle()
-            trialPlayers = copy.deepcopy(self.players)
-            
-            for player in trialPlayers:
-                if len(player.showHole()) == 0:
-                    player.assignHole(trialDeck.draw())
-                    player.assignHole(trialDeck.draw())
-            
-            for n in range(burns):
-                trialDeck.burn()
-            
-            summary = Simulation.runSim(len(trialPlayers), trialDeck, trialPlayers, self.flop, self.turn, self.river)
-            winners = summary.getWinners()
-            
-            if len(winners) == len(trialPlayers): 
-                equityDict["CHOP"] += 1/trials
+    @staticmethod
+    def solveHandEquity(holes: tuple[tuple[Card, ...], ...], board: tuple[Card, ...] = (), deck: tuple[Card, ...] = None, trials: int = 1000, sampling: str = 'uniform', rng: RandomEngine | np.random.Generator = None, seed: int = None, game: str = 'holdem', ranking: str | tuple[str, ...] = 'standard', backend: str = 'python', composition: tuple[Card, ...] = None) -> dict[str: float]:
+        """
+        The reentrant core of calculateHandEquity. It reads its inputs without modifying them, keeps no state
+        between calls and draws from its own engine (a fresh one unless rng is given), so concurrent calls from
+        a thread pool, including on free-threaded Python builds, need no locking.
+
+        :param holes: The hole of each player, as a tuple of two (Omaha: four) Card objects or an empty tuple for a random hole.
+        :param board: The known community cards, as a tuple of 0-5 Card objects (default is an empty board).
+        :param deck: The cards the runouts are dealt from, holes and board included (default is a standard deck).
+        :param trials: The number of trials (default is 1000).
+        :param sampling: The runout sampling mode, one of RunoutSampler.modes (default is 'uniform').
+        :param rng: An optional RandomEngine or NumPy Generator to draw runouts from; it must not be shared between threads.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        :param game: The game played, 'holdem' or 'omaha' (default is 'holdem').
+        :param ranking: The ranking order of made hands (see HandEvaluator.forDeck, default is 'standard').
+        :param backend: The Hold'em trial loop, 'python' or 'numba' (a compiled kernel, see JitKernel). Without Numba
+                        installed, 'numba' falls back to 'python'. Both give the same results for the same runouts; with
+                        uniform sampling the compiled kernel deals its own runouts, so it draws different ones.
+        :param composition: The cards of the game's full deck, before dead cards were removed (see Deck.getComposition);
+                            the evaluator is generated from it (default is the deck with the holes and board).
+        :return: A dictionary of player names ("Player 1", ...) and their respective equity percentages, plus "CHOP".
+                 One known hole against random holes preflop (see isPreflopTableSpot) is answered from the preflop
+                 table without sampling: the known player gets PreflopTable.lookup (ties split), the random players
+                 share the rest evenly and "CHOP" is 0.
+        """
+        deck = (Deck().getCards() if deck is None else deck)
+        assert backend in EquitySolver.backends, "BACKEND MUST BE ONE OF "+str(EquitySolver.backends)+"."
+
+        assert game in Player.holeSizes, "GAME MUST BE ONE OF "+str(tuple(Player.holeSizes))+"."
+        assert isinstance(trials, int) and trials > 0, "TRIALS INPUT IS NOT A POSITIVE INTEGER."
+        assert len(deck) >= Player.holeSizes[game]*len(holes) + 8, "DECK IS TOO SMALL, REQUIRES AT LEAST "+str(Player.holeSizes[game]*len(holes) + 8)+" CARDS."
+        assert len(holes) > 0, "NO PLAYERS ADDED"
+        assert sampling in RunoutSampler.modes, "SAMPLING MODE MUST BE ONE OF "+str(RunoutSampler.modes)+"."
+        assert all(len(hole) in {0, Player.holeSizes[game]} for hole in holes), "EACH HOLE MUST HAVE ZERO OR "+str(Player.holeSizes[game])+" CARDS."
+
+        names = ["Player "+str(i+1) for i in range(len(holes))]
+        equityDict = {name: 0 for name in names}
+        equityDict["CHOP"] = 0
+        if EquitySolver.isPreflopTableSpot(holes, board, deck, sampling, game, ranking, composition):
+            # One known hole against random holes on a full standard deck is read from the preflop table (ties split).
+            known = next(i for i, hole in enumerate(holes) if hole)
+            share = PreflopTable.default().lookup(list(holes[known]), len(holes) - 1)
+            equityDict.update({name: (share if i == known else (1 - share)/(len(holes) - 1)) for i, name in enumerate(names)})
+            return(equityDict)
+
+        holes = [[card.getIndex() for card in hole] for hole in holes]
+        board = [card.getIndex() for card in board]
+        randomHoles = sum(1 for hole in holes if not hole)
+        used = set(board) | {card for hole in holes for card in hole}
+        liveCards = [card.getIndex() for card in deck if card.getIndex() not in used]
+        boardCount = 5 - len(board)
+        evaluator = HandEvaluator.forDeck(list(composition or liveCards) + list(used), ranking)
+        sampler = RunoutSampler(liveCards, boardCount, Player.holeSizes[game]*randomHoles, sampling, RandomEngine.resolve(rng, seed))
+        if game == 'omaha':
+            return(EquitySolver.solveOmahaEquity(holes, board, sampler, trials, evaluator))
+        if backend == 'numba' and JitKernel.available:
+            kernel = JitKernel.forEvaluator(evaluator)
+            totals = np.zeros(len(holes) + 1)
+            if sampling == 'uniform':
+                kernel.deal(board, holes, boardCount, liveCards, trials, sampler.rng, totals)
+            else:
+                for block in sampler.sampleBlocks(trials):
+                    kernel.tally(board, holes, boardCount, block, totals)
+            return(dict(zip(names + ["CHOP"], totals.tolist())))
+
+        # The known board and holes are folded into partial histograms once; each trial only adds the new cards.
+        state = BoardState(board, holes, evaluator)
+        for weight, runout in sampler.sample(trials):
+            dealt = runout[boardCount:]
+            winners = state.winners(runout[:boardCount], [dealt[i:i+2] for i in range(0, len(dealt), 2)])
+
+            if len(winners) == len(names):
+                equityDict["CHOP"] += weight
             else:
                 for winner in winners:
-                    equityDict[winner.getName()] += 1/trials
-        
-        self.handEquities = equityDict
+                    equityDict[names[winner]] += weight
+
         return(equityDict)
 
+    @staticmethod
+    def isPreflopTableSpot(holes: tuple[tuple[Card, ...], ...], board: tuple[Card, ...], deck: tuple[Card, ...], sampling: str, game: str, ranking: str | tuple[str, ...], composition: tuple[Card, ...] = None) -> bool:
+        """
+        Checks whether solveHandEquity can answer a spot from the preflop table: a Hold'em spot with the standard
+        ranking, an empty board, one known hole, 1-9 random holes, no dead cards and 'uniform' sampling (the other modes
+        are explicit requests for their own estimator, so they still sample).
+
+        :param holes: The hole of each player, as a tuple of Card objects or an empty tuple for a random hole.
+        :param board: The known community cards.
+        :param deck: The cards the runouts are dealt from, holes and board included.
+        :param sampling: The runout sampling mode.
+        :param game: The game played.
+        :param ranking: The ranking order of made hands.
+        :param composition: The cards of the game's full deck, or None for the deck itself.
+        :return: True if the spot is covered by PreflopTable.default().
+        """
+        standard = list(range(52))
+        if board or game != 'holdem' or not isinstance(ranking, str) or ranking != 'standard' or sampling != 'uniform':
+            return(False)
+        if sum(1 for hole in holes if hole) != 1 or len(holes) - 1 > PreflopTable.maxOpponents:
+            return(False)
+        return(sorted(card.getIndex() for card in deck) == standard and (composition is None or sorted(card.getIndex() for card in composition) == standard))
+
+    @staticmethod
+    def solveOmahaEquity(holes: list[list[int]], board: list[int], sampler: RunoutSampler, trials: int, evaluator: HandEvaluator = None) -> dict[str: float]:
+        """
+        The Omaha showdown of solveHandEquity. Runouts are collected in blocks, and each player's 60 two-plus-three
+        card hands on every runout of a block are scored in one batched lookup (see HandEvaluator.scoreOmahaBatch).
+
+        :param holes: The four card indices of each player's hole, or an empty list for a random hole.
+        :param board: The card indices already on the board.
+        :param sampler: A RunoutSampler dealing the missing board cards followed by four cards per random hole.
+        :param trials: The number of trials.
+        :param evaluator: An optional HandEvaluator (default is the standard evaluator).
+        :return: A dictionary of player names ("Player 1", ...) and their respective equity percentages, plus "CHOP".
+        """
+        evaluator = evaluator or HandEvaluator.standard()
+        boardCount = 5 - len(board)
+        names = ["Player "+str(i+1) for i in range(len(holes))]
+        totals = np.zeros(len(holes) + 1)
+        for block in sampler.sampleBlocks(trials):
+            totals += EquitySolver.tallyOmaha(evaluator, holes, board, boardCount, block)
+        return(dict(zip(names + ["CHOP"], totals.tolist())))
+
+    @staticmethod
+    def tallyOmaha(evaluator: HandEvaluator, holes: list[list[int]], board: list[int], boardCount: int, block: list[tuple[float, list[int]]]) -> np.ndarray:
+        """
+        Scores a block of Omaha runouts and tallies their weights by winner.
+
+        :param evaluator: The HandEvaluator to score with.
+        :param holes: The four card indices of each player's hole, or an empty list for a random hole.
+        :param board: The card indices already on the board.
+        :param boardCount: The number of board cards in each runout.
+        :param block: A list of (weight, runout) tuples.
+        :return: An array of the weight won by each player, followed by the weight of all-way chops.
+        """
+        weights = np.array([weight for weight, _ in block])
+        runouts = np.array([runout for _, runout in block], dtype = np.int64).reshape(len(block), -1)
+        boards = np.concatenate([np.tile(np.array(board, dtype = np.int64), (len(block), 1)), runouts[:, :boardCount]], axis = 1)
+        scores = []
+        start = boardCount
+        for hole in holes:
+            if hole:
+                scores.append(evaluator.scoreOmahaBatch(boards, np.tile(hole, (len(block), 1))))
+            else:
+                scores.append(evaluator.scoreOmahaBatch(boards, runouts[:, start:start+4]))
+                start += 4
+        scores = np.stack(scores)
+        winners = (scores == scores.max(axis = 0))
+        chops = winners.all(axis = 0)
+        return(np.append((winners & ~chops)@weights, weights[chops].sum()))
+
+    def calculateNextCardEquity(self) -> tuple[dict[str, dict[str, dict]], dict[str, list[Card]]]:
+        """
+        Calculates, for every possible next card on a flop or turn, each player's exact equity and made-hand
+        category once the card is dealt, along with each player's outs. All next cards are enumerated in one
+        pass over a shared board state; on the flop every river is enumerated below each turn.
+        A player's outs are the cards that give them the best made hand when they do not hold it now.
+
+        :return: A tuple of a dictionary of next cards (e.g., 'Ah') to their "equities" (player names and "CHOP")
+                 and "categories" (player names to made-hand names), and a dictionary of player names to their outs.
+        """
+        assert self.game == 'holdem', "NEXT-CARD EQUITY IS ONLY AVAILABLE IN HOLDEM."
+        assert len(self.players) > 0, "NO PLAYERS ADDED"
+        assert all(len(player.showHole()) == 2 for player in self.players), "ALL PLAYERS MUST HAVE A DEFINED HOLE."
+        assert self.flop and not self.river, "BOARD MUST BE A FLOP OR A TURN."
+
+        board = [card.getIndex() for card in self.flop + (self.turn or [])]
+        holes = [[card.getIndex() for card in player.showHole()] for player in self.players]
+        used = set(board) | {card for hole in holes for card in hole}
+        live = [card.getIndex() for card in self.deck.getCards() if card.getIndex() not in used]
+        names = [player.getName() for player in self.players]
+
+        state = BoardState(board, holes, HandEvaluator.forDeck(self.deck.getComposition() + [Card.fromIndex(card) for card in used], self.ranking))
+        current = state.winners([])
+        table = {}
+        outs = {name: [] for name in names}
+        for card in live:
+            scores = state.scores([card])
+            best = max(scores)
+            leaders = [i for i, score in enumerate(scores) if score == best]
+            equities = {name: 0 for name in names}
+            equities["CHOP"] = 0
+            # On the turn the next card completes the board, otherwise every river after it is enumerated.
+            rivers = ([None] if len(board) == 4 else [river for river in live if river != card])
+            for river in rivers:
+                winners = (leaders if river is None else state.winners([card, river]))
+                if len(winners) == len(names):
+                    equities["CHOP"] += 1
+                else:
+                    for winner in winners:
+                        equities[names[winner]] += 1
+            equities = {key: count/len(rivers) for key, count in equities.items()}
+
+            dealt = Card.fromIndex(card)
+            name = Card.ranks[dealt.getRank()]+dealt.getSuit()
+            table[name] = {"equities": equities, "categories": {names[i]: Hand.hands[HandEvaluator.category(score)] for i, score in enumerate(scores)}}
+            for i in leaders:
+                if i not in current:
+                    outs[names[i]].append(dealt)
+        return(table, outs)
+
+    @staticmethod
+    def fromSpot(spot: dict) -> Self:
+        """
+        Builds a solver from a spot definition, the JSON-friendly form used by batch and distributed runs:
+        {"holes": [["Ah", "Kh"], ["Qs", "Qc"], []], "board": ["Jh", "7c", "2h"], "dead": ["2c"]}.
+        An empty hole is dealt at random.
+
+        :param spot: A dictionary with a list of holes (lists of card strings), an optional board and optional dead cards.
+        :return: An EquitySolver object with the spot's players, holes and board defined.
+        """
+        assert isinstance(spot, dict) and isinstance(spot.get("holes"), list) and len(spot["holes"]) > 0, "SPOT HAS NO HOLES."
+        cards = [card for hole in spot["holes"] for card in hole] + list(spot.get("board") or []) + list(spot.get("dead") or [])
+        assert len({card.getIndex() for card in Card.generateSet(cards)}) == len(cards), "SPOT CARDS ARE NOT DISTINCT."
+
+        solver = EquitySolver()
+        solver.addPlayers(len(spot["holes"]))
+        for i, hole in enumerate(spot["holes"]):
+            if hole:
+                solver.defineHole(i+1, Card.generateSet(hole))
+        if spot.get("board"):
+            solver.defineBoard(Card.generateSet(spot["board"]))
+        if spot.get("dead"):
+            solver.defineDeck(EquitySolver.deadDeck(Card.generateSet(spot["dead"])))
+        return(solver)
+
+    @staticmethod
+    def deadDeck(dead: list[Card]) -> Deck:
+        """
+        Creates a standard deck with dead (folded or exposed) cards removed.
+
+        :param dead: A list of Card objects that cannot be dealt.
+        :return: A Deck object without the dead cards.
+        """
+        assert isinstance(dead, list) and all(isinstance(card, Card) for card in dead), "DEAD CARDS IS NOT A LIST OF CARDS."
+
+        deck = Deck()
+        for card in dead:
+            deck.remove(card)
+        return(deck)
+
+    @staticmethod
+    def calculateDistributed(spots: list[dict], trials: int = 10000, workers: int = None, queue: str = None, blockSize: int = 5000, lease: float = 120.0, seed: int = None) -> list[dict[str: float]]:
+        """
+        Calculates the hand equity of many spots on a coordinator/worker pool (see EquityCoordinator).
+
+        :param spots: A list of spot definitions (see fromSpot); a spot's "trials" overrides trials.
+        :param trials: The default number of trials per spot (default is 10000).
+        :param workers: The number of local worker processes (default is the CPU count).
+        :param queue: An optional queue directory shared with workers on other nodes (default is a temporary directory);
+                      with a queue, workers may be 0 to rely on remote workers only.
+        :param blockSize: The maximum number of trials per task (default is 5000).
+        :param lease: The number of seconds after which a lost worker's task is retried (default is 120).
+        :param seed: An optional integer seed for reproducible results.
+        :return: A list of equity dictionaries in the order of the spots.
+        """
+        from .distributed_runner import EquityCoordinator
+
+        with EquityCoordinator(queue, blockSize, lease) as coordinator:
+            return(coordinator.run(spots, trials, workers, seed = seed, remoteWorkers = queue is not None))
+
+    @staticmethod
+    def calculateBatch(spots: list[dict], trials: int = 10000, exactLimit: int = 50000, rng: RandomEngine | np.random.Generator = None, seed: int = None) -> list[dict[str: float]]:
+        """
+        Calculates the equity of many spots in one process, sharing completions, board evaluations and river
+        indexes between the spots on the same board and dead cards (see SpotBatch).
+
+        :param spots: A list of spot definitions (see fromSpot), each with "holes" or with "ranges" of hand classes.
+        :param trials: The number of completions sampled per board when there are more than exactLimit (default is 10000).
+        :param exactLimit: The largest number of board completions enumerated per board (default is 50000).
+        :param rng: An optional RandomEngine or NumPy Generator to sample completions from.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        :return: A list of equity dictionaries in the order of the spots.
+        """
+        from .spot_batch import SpotBatch
+
+        return(SpotBatch.solve(spots, trials, exactLimit, rng, seed))
+
     def toString(self) -> str:
         """
         Returns a string representation of the current simulation state.
@@ -211,13 +474,16 @@ class EquitySolver:
         return(message)
     
     @staticmethod
-    def generateRange(range: Iterable[str], simplify: bool = False) ->  list[list[Self]]:
+    def generateRange(range: Iterable[str], simplify: bool = False, rng: RandomEngine | np.random.Generator = None, seed: int = None) ->  list[list[Self]]:
         """
         Generates all possible hands from a given hand range.
 
         :param range: An iterable of strings representing the hand range (e.g., ["AKs", "AKo"]).
         :param simplify: Whether or not to return a minimal combination set. Will preserve frequencies of hand archetypes (returns half the length of full).
-        :return: A list of possible combinations of hands based on the specified range.
+        :param rng: An optional RandomEngine or NumPy Generator used to pick the suits of a simplified range.
+        :param seed: An optional integer seed used to pick the suits of a simplified range when no rng is given.
+        :return: A list of possible combinations of hands based on the specified range (see RangeStream.expand for a lazy,
+                 chunked alternative over card indices).
         """
         assert isinstance(range, Iterable) and all(isinstance(hand, str) for hand in range), "INPUT RANGE IS NOT AN ITERABLE OF STRINGS."
         assert all((len(hand) == 3 and hand[2] in {'s', 'o'}) or (len(hand) == 2 and hand[0] == hand[1]) for hand in range), "ONE OR MORE HANDS IS OF INVALID FORMAT."
@@ -225,52 +491,60 @@ class EquitySolver:
 
         enumerations = []
         if simplify:
+            engine = RandomEngine.resolve(rng, seed)
             for hand in range:
                 cases = []
                 if len(hand) == 2:
                     temp = list(combinations(list(Card.suits.keys()), 2))
-                    random.shuffle(temp)
+                    engine.shuffle(temp)
                     for i in builtins.range(3):
                         cases.append((hand[0]+temp[i][0], hand[1]+temp[i][1]))
                 elif hand[2] == 's':
                     temp = list(Card.suits.keys())
-                    random.shuffle(temp)
+                    engine.shuffle(temp)
                     for i in builtins.range(2):
                         cases.append((hand[0]+temp[i], hand[1]+temp[i]))
                 elif hand[2] == 'o':
                     temp = list(permutations(list(Card.suits.keys()), 2))
-                    random.shuffle(temp)
+                    engine.shuffle(temp)
                     for i in builtins.range(6):
                         cases.append((hand[0]+temp[i][0], hand[1]+temp[i][1]))
                 enumerations += cases
         else:
-            for hand in range:
-                cases = []
-                if len(hand) == 2:
-                    for pair in combinations(list(Card.suits.keys()), 2):
-                        cases.append((hand[0]+pair[0], hand[1]+pair[1]))
-                elif hand[2] == 's':
-                    for suit in list(Card.suits.keys()):
-                        cases.append((hand[0]+suit, hand[1]+suit))
-                elif hand[2] == 'o':
-                    for pair in permutations(list(Card.suits.keys()), 2):
-                        cases.append((hand[0]+pair[0], hand[1]+pair[1]))
-                enumerations += cases
+            # The full range is the materialized form of RangeStream.expand.
+            return([[Card.fromIndex(card) for card in hand] for chunk in RangeStream.expand(range) for hand in chunk.tolist()])
 
         return(Card.generateSetofSets(enumerations))
     
     @staticmethod
-    def calculateRangeEquity(*args: list[list[Card]], trials: int = 1000, customDeck: Deck = Deck(), customBoard: list[Card] = None) ->  tuple[dict[str: float], str]:
+    def calculateRangeEquity(*args: list[list[Card]], trials: int = 1000, customDeck: Deck = None, customBoard: list[Card] = None, sampling: str = 'uniform', rng: RandomEngine | np.random.Generator = None, seed: int = None, samples: int = None, weights: list[list[float]] = None, checkpoint: str = None, checkpointInterval: float = 60.0, budget: int = None, precision: float = None, ranking: str | tuple[str, ...] = 'standard') ->  tuple[dict[str: float], str]:
         """
         Calculates the equity for each range in a multi-way poker hand simulation.
 
         It iterates through all combinations of the hands from the given ranges and runs 
         simulations to determine the equity for each range based on the community cards (flop, turn, river).
+        On a complete (5 card) board the equity is exact instead: it is read from the board's RiverIndex,
+        trials are ignored and combinations with conflicting cards are skipped.
+        With samples given, combinations are sampled instead of enumerated (see sampleRangeEquity), so the
+        cost is bounded by the sample budget rather than by the size of the product of the ranges.
 
         :param args: A list of ranges (each range is a list of hands, with each hand being a list of Card objects).
         :param trials: The number of trials to run in the simulation (default is 1000).
         :param customDeck: A custom deck to be used for the simulation (default is a standard deck).
         :param customBoard: A custom board (community cards) to be used for the simulation (default is None).
+        :param sampling: The runout sampling mode passed to calculateHandEquity (default is 'uniform').
+        :param rng: An optional RandomEngine or NumPy Generator shared by all simulations.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        :param samples: An optional total number of sampled combinations, each with one runout (replaces trials).
+        :param weights: Optional weights of the hands of each range, used when sampling (default is uniform).
+        :param checkpoint: An optional file path for checkpointing the enumeration. The completed combinations,
+                           partial equities and generator state are saved periodically, and a later call with
+                           the same inputs resumes from the file instead of starting over. The file is removed on completion.
+        :param checkpointInterval: The number of seconds between checkpoints (default is 60).
+        :param budget: An optional total trial budget, split across combinations by adaptiveRangeEquity (replaces trials).
+        :param precision: An optional target confidence interval half-width for adaptiveRangeEquity (replaces trials).
+        :param ranking: The ranking order of made hands (see HandEvaluator.forDeck, default is 'standard'). Custom deck
+                        compositions and rankings are supported by the enumerated and complete board modes.
         :return: A tuple containing a dictionary of range equities and a string summary of the results.
         """
         assert len(args) > 0, "NO RANGES GIVEN."
@@ -282,33 +556,241 @@ class EquitySolver:
         for i in builtins.range(len(args)):
             rangeEquities["Range "+str(i+1)] = 0
         rangeEquities["CHOP"] = 0
+        errors = None
+        evaluator = HandEvaluator.forDeck((customDeck or Deck()).getComposition() + (customBoard or []) + [card for range in args for hand in range for card in hand], ranking)
+        assert evaluator is HandEvaluator.standard() or (samples is None and budget is None and precision is None), "CUSTOM DECK COMPOSITIONS AND RANKINGS ARE NOT SUPPORTED WITH SAMPLES, BUDGET OR PRECISION."
         
-        solver = EquitySolver()
-        solver.addPlayers(len(args))
-        if customBoard:
-            solver.defineBoard(customBoard)
-        if customDeck:
-            solver.defineDeck(customDeck)
-        
-        totalPerms = sum(1 for _ in product(*args))
-        for permutation in product(*args):
-            for i, hand in enumerate(permutation):
-                solver.defineHole(i+1, hand)
-            handEquities = solver.calculateHandEquity(trials)
-
-            for (key1, value1), (key2, value2) in zip(rangeEquities.items(), handEquities.items()):
-                rangeEquities[key1] += value2/totalPerms
+        if customBoard and len(customBoard) == 5 and (samples is None or len(args) == 2):
+            # On a complete board every hole has a fixed rank, so equity is an exact sweep over the board's index.
+            index = (RiverIndex.forBoard(customBoard) if evaluator is HandEvaluator.standard() else RiverIndex(customBoard, evaluator))
+            rangeEquities = index.rangeEquity(*args)
+        elif budget is not None or precision is not None:
+            rangeEquities, errors = EquitySolver.adaptiveRangeEquity(*args, budget = budget, precision = precision, customDeck = customDeck, customBoard = customBoard, sampling = sampling, rng = RandomEngine.resolve(rng, seed))
+        elif samples is not None:
+            rangeEquities = EquitySolver.sampleRangeEquity(*args, samples = samples, customDeck = customDeck, customBoard = customBoard, weights = weights, rng = RandomEngine.resolve(rng, seed))
+        else:
+            assert not customBoard or (len(customBoard) >= 3 and len(customBoard) <= 5), "BOARD IS NOT A LIST OF 3-5 CARDS."
+            # Inputs are frozen into tuples and each call draws from its own engine, so concurrent calls share no state.
+            board = tuple(customBoard or ())
+            deck = (tuple(customDeck.getCards()) if customDeck else None)
+            composition = (tuple(customDeck.getComposition()) if customDeck else None)
+
+            engine = RandomEngine.resolve(rng, seed)
+            totalPerms = RangeStream.countCombos(*args)
+            completed = 0
+            if checkpoint:
+                inputs = {"ranges": [[[card.getIndex() for card in hand] for hand in range] for range in args], "trials": trials, "sampling": sampling,
+                          "deck": [card.getIndex() for card in customDeck.getCards()] if customDeck else None,
+                          "board": [card.getIndex() for card in customBoard or []], "seed": seed if rng is None else None, "ranking": list(HandEvaluator.rankings[ranking] if isinstance(ranking, str) else ranking)}
+                checkpoint = Checkpoint(checkpoint, inputs)
+                stored = checkpoint.load()
+                if stored:
+                    completed = stored["completed"]
+                    rangeEquities = stored["equities"]
+                    engine.setState(stored["rngState"])
+                saved = time.time()
+
+            # Combinations are streamed in chunks of card indices, and resuming starts at the first one not yet folded in.
+            for chunk in RangeStream.combos(*args, start = completed):
+                for permutation in chunk.tolist():
+                    holes = tuple(tuple(Card.fromIndex(card) for card in hand) for hand in permutation)
+                    handEquities = EquitySolver.solveHandEquity(holes, board, deck, trials, sampling, engine, ranking = ranking, composition = composition)
+
+                    for (key1, value1), (key2, value2) in zip(rangeEquities.items(), handEquities.items()):
+                        rangeEquities[key1] += value2/totalPerms
+                    completed += 1
+
+                    if checkpoint and time.time() - saved >= checkpointInterval:
+                        checkpoint.save({"completed": completed, "equities": rangeEquities, "rngState": engine.getState()})
+                        saved = time.time()
+            if checkpoint:
+                checkpoint.clear()
         
         message = "____________________\nBoardCards: \n"
         if customBoard:
             message += Card.sequenceToString(customBoard)
         message += "\n____________________\n"
         for range, equity in rangeEquities.items():
-            message += range + " | " + str(rangeEquities[range]*100) + "%\n"
+            message += range + " | " + str(rangeEquities[range]*100) + "%" + (" ± " + str(errors[range]*100) + "%" if errors else "") + "\n"
         message += "____________________\n"
         
         return(rangeEquities, message)
     
+    @staticmethod
+    def adaptiveRangeEquity(*args: list[list[Card]], budget: int = None, precision: float = None, pilot: int = 64, confidence: float = 0.95, customDeck: Deck = None, customBoard: list[Card] = None, sampling: str = 'uniform', rng: RandomEngine | np.random.Generator = None, seed: int = None) -> tuple[dict[str: float], dict[str: float]]:
+        """
+        Estimates range equity by splitting a global trial budget across hand combinations in proportion to the
+        spread of each combination's outcome (Neyman allocation). Lopsided matchups such as AA vs 72o settle after
+        the pilot trials, while close matchups receive the remaining budget. Trials are added in rounds until the
+        confidence interval of every equity is within precision or the budget is spent. Combinations with
+        conflicting cards are skipped and the others are weighted equally.
+
+        :param args: A list of ranges (each range is a list of hands, with each hand being a list of Card objects).
+        :param budget: The maximum total number of trials, at least two per combination (default is 1000 per combination).
+        :param precision: The target half-width of the confidence interval of each equity (default is to spend the budget).
+        :param pilot: The number of trials per combination used to estimate its spread, capped so the pilot fits the budget (default is 64).
+        :param confidence: The confidence level of the interval (default is 0.95).
+        :param customDeck: A custom deck to deal runouts from (default is a standard deck).
+        :param customBoard: A custom board (community cards) of 0-5 cards (default is None).
+        :param sampling: The runout sampling mode, one of RunoutSampler.modes (default is 'uniform').
+        :param rng: An optional RandomEngine or NumPy Generator to draw runouts from.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        :return: A tuple of a dictionary of range equities and a dictionary of their confidence interval half-widths.
+        """
+        assert len(args) > 0, "NO RANGES GIVEN."
+        assert budget is None or (isinstance(budget, int) and budget > 0), "BUDGET IS NOT A POSITIVE INTEGER."
+        assert precision is None or precision > 0, "PRECISION IS NOT POSITIVE."
+        assert isinstance(pilot, int) and pilot > 1, "PILOT IS NOT AN INTEGER GREATER THAN 1."
+        assert confidence > 0 and confidence < 1, "CONFIDENCE IS NOT ON (0,1)."
+
+        from statistics import NormalDist
+        engine = RandomEngine.resolve(rng, seed)
+        board = tuple(customBoard or ())
+        deck = (tuple(customDeck.getCards()) if customDeck else None)
+        composition = (tuple(customDeck.getComposition()) if customDeck else None)
+        boardSet = {card.getIndex() for card in board}
+        combos = []
+        for permutation in product(*args):
+            cards = [card.getIndex() for hand in permutation for card in hand]
+            if len(set(cards)) == len(cards) and not boardSet & set(cards):
+                combos.append(tuple(tuple(hand) for hand in permutation))
+        assert combos, "EVERY COMBINATION OF HANDS HAS CONFLICTING CARDS."
+        budget = (budget or 1000*len(combos))
+        assert budget >= 2*len(combos), "BUDGET IS TOO SMALL, REQUIRES AT LEAST "+str(2*len(combos))+" TRIALS (TWO PER COMBINATION)."
+        z = NormalDist().inv_cdf((1 + confidence)/2)
+
+        names = ["Range "+str(i+1) for i in builtins.range(len(args))] + ["CHOP"]
+        counts = np.zeros((len(combos), len(names)))
+        trials = np.zeros(len(combos))
+
+        def simulate(allocation: np.ndarray) -> None:
+            for h in np.flatnonzero(allocation):
+                equities = EquitySolver.solveHandEquity(combos[h], board, deck, int(allocation[h]), sampling, engine, composition = composition)
+                counts[h] += np.array(list(equities.values()))*allocation[h]
+                trials[h] += allocation[h]
+
+        simulate(np.full(len(combos), min(pilot, budget // len(combos))))
+        while True:
+            # Outcomes are indicators, so each combination's variance follows from its (smoothed) frequencies.
+            frequencies = (counts + 0.5)/(trials[:, None] + 1)
+            spread = np.sqrt(frequencies*(1 - frequencies))
+            errors = z*np.sqrt(np.sum((spread/len(combos))**2/trials[:, None], axis = 0))
+            remaining = budget - int(trials.sum())
+            if remaining <= 0 or (precision is not None and np.all(errors <= precision)):
+                break
+            # Each round at most doubles the trials spent, targeting n_h proportional to the combination's spread.
+            total = trials.sum() + min(remaining, trials.sum())
+            sigma = np.sqrt(np.sum(spread**2, axis = 1))
+            target = total*sigma/sigma.sum()
+            allocation = np.floor(np.maximum(target - trials, 0)).astype(np.int64)
+            # Combinations already past their target are not cut back, so the others are scaled to the remaining budget.
+            if allocation.sum() > remaining:
+                allocation = np.floor(allocation*remaining/allocation.sum()).astype(np.int64)
+            if allocation.sum() == 0:
+                allocation[np.argmax(target - trials)] = 1
+            simulate(allocation)
+
+        equities = dict(zip(names, (np.mean(counts/trials[:, None], axis = 0)).tolist()))
+        return(equities, dict(zip(names, errors.tolist())))
+
+    @staticmethod
+    def calculateCategoryDistribution(hands: list[list[Card]], customBoard: list[Card] = None, customDeck: Deck = None) -> dict[str: float]:
+        """
+        Calculates the exact probability of each made-hand category (see Hand.hands) by the river for a hole
+        or a range on a board, by enumerating every runout. The rank keys and suit masks of the board and
+        each runout are computed once and combined with each hand by array arithmetic.
+
+        :param hands: A range (a list of hands, each a list of two Card objects); a single hole is a range of one hand.
+        :param customBoard: A custom board (community cards) of 0-5 cards (default is None).
+        :param customDeck: A custom deck to deal runouts from (default is a standard deck).
+        :return: A dictionary of made-hand categories and their probabilities, averaged over the hands that do not conflict with the board.
+        """
+        assert isinstance(hands, list) and len(hands) > 0 and all(isinstance(hand, list) and len(hand) == 2 and all(isinstance(card, Card) for card in hand) for hand in hands), "HANDS IS NOT A LIST OF TWO-CARD HANDS."
+
+        board = [card.getIndex() for card in (customBoard or [])]
+        live = [card.getIndex() for card in (customDeck or Deck()).getCards() if card.getIndex() not in board]
+        boardCount = 5 - len(board)
+        runouts = list(combinations(live, boardCount))
+        runouts = np.array(runouts, dtype = np.int64).reshape(len(runouts), boardCount)
+        keys, masks = HandEvaluator.partialBatch(np.concatenate([np.tile(board, (len(runouts), 1)).astype(np.int64), runouts], axis = 1))
+
+        evaluator = HandEvaluator.standard()
+        totals = np.zeros(len(Hand.hands))
+        valid = 0
+        for hand in hands:
+            hole = [card.getIndex() for card in hand]
+            if set(hole) & set(board):
+                continue
+            handKey, handMasks = HandEvaluator.partial(hole)
+            # Runouts holding one of the hand's cards cannot be dealt with it.
+            dealable = ~np.isin(runouts, hole).any(axis = 1)
+            scores = evaluator.scoreArrays(keys[dealable] + handKey, masks[dealable] | np.array(handMasks))
+            totals += np.bincount(len(Hand.hands) - 1 - (scores >> 20), minlength = len(Hand.hands))/len(scores)
+            valid += 1
+
+        assert valid > 0, "ALL HANDS CONFLICT WITH THE BOARD."
+        return({category: float(totals[i]/valid) for i, category in enumerate(Hand.hands)})
+
+    @staticmethod
+    def sampleRangeEquity(*args: list[list[Card]], samples: int = 100000, customDeck: Deck = None, customBoard: list[Card] = None, weights: list[list[float]] = None, rng: RandomEngine | np.random.Generator = None, seed: int = None) -> dict[str: float]:
+        """
+        Estimates range equity by sampling combinations of hands instead of enumerating their product.
+        Each sample draws one hand per range in proportion to its weight, rejects combinations with
+        conflicting cards, and deals a single runout from the remaining deck. The cost is bounded by
+        the sample budget regardless of the number or width of the ranges.
+
+        :param args: A list of ranges (each range is a list of hands, with each hand being a list of Card objects).
+        :param samples: The number of accepted samples (default is 100000).
+        :param customDeck: A custom deck to deal runouts from (default is a standard deck).
+        :param customBoard: A custom board (community cards) of 0-5 cards (default is None).
+        :param weights: Optional weights of the hands of each range (default is uniform).
+        :param rng: An optional RandomEngine or NumPy Generator to sample from.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        :return: A dictionary of range names and their respective equity percentages.
+        """
+        assert len(args) > 0 and all(len(range) > 0 for range in args), "NO RANGES GIVEN OR A RANGE IS EMPTY."
+        assert isinstance(samples, int) and samples > 0, "SAMPLES INPUT IS NOT A POSITIVE INTEGER."
+        assert weights is None or (len(weights) == len(args) and all(len(w) == len(range) for w, range in zip(weights, args))), "WEIGHTS DO NOT MATCH THE RANGES."
+
+        engine = RandomEngine.resolve(rng, seed)
+        board = [card.getIndex() for card in (customBoard or [])]
+        deck = [card.getIndex() for card in (customDeck or Deck()).getCards()]
+        boardSet = set(board)
+        live = [card for card in deck if card not in boardSet]
+        boardCount = 5 - len(board)
+        ranges = [[tuple(card.getIndex() for card in hand) for hand in range] for range in args]
+        probabilities = [None]*len(ranges) if weights is None else [np.asarray(w, dtype = float)/np.sum(w) for w in weights]
+        state = BoardState(board, [[] for _ in ranges])
+
+        counts = [0]*len(ranges)
+        chops = 0
+        accepted = 0
+        attempts = 0
+        while accepted < samples:
+            assert attempts < 100*samples, "TOO MANY CONFLICTING COMBINATIONS TO SAMPLE."
+            block = min(RunoutSampler.blockSize, samples - accepted)
+            picks = [engine.getGenerator().choice(len(range), size = block, p = p).tolist() for range, p in zip(ranges, probabilities)]
+            # Runouts are drawn with spare cards, so a runout hitting a hole is repaired from the spares.
+            runouts = engine.sampleIndices(len(live), min(len(live), boardCount + 2*len(ranges)), block).tolist()
+            for i in range(block):
+                attempts += 1
+                holes = [ranges[r][picks[r][i]] for r in range(len(ranges))]
+                used = {card for hole in holes for card in hole}
+                if len(used) < 2*len(ranges) or used & boardSet:
+                    continue
+                runout = [live[j] for j in runouts[i] if live[j] not in used][:boardCount]
+                winners = state.winners(runout, holes)
+                accepted += 1
+                if len(winners) == len(ranges):
+                    chops += 1
+                else:
+                    for winner in winners:
+                        counts[winner] += 1
+
+        equities = {"Range "+str(i+1): counts[i]/accepted for i in range(len(ranges))}
+        equities["CHOP"] = chops/accepted
+        return(equities)
+
     @staticmethod
     def calcEV(showEq: float, potPrcnt: float, foldEq: float, pc: int) -> float:
         """
@@ -349,6 +831,8 @@ class EquitySolver:
 
         if evFunc(showEq, potPrcnt, float(0), pc) >= 0:
             return(0.0)
+        # Imported here so that scipy is only loaded by the callers that need root-finding.
+        from scipy.optimize import root_scalar
         foldEq = root_scalar(lambda F: evFunc(showEq, potPrcnt, F, pc), bracket=[0.0, 0.9999], method='brentq')
 
         return(foldEq.root)
@@ -0,0 +1,252 @@
+from .card import Card
+from .made_hand import Hand
+from .hand_evaluator import HandEvaluator
+from .runout_sampler import RunoutSampler
+from .random_engine import RandomEngine
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, permutations
+from typing import Self, Iterator, TextIO
+import numpy as np
+import csv
+
+# flop_report.py
+# This file contains a class reporting range equity and made-hand hit rates across all strategically distinct flops.
+# The 22,100 flops reduce to 1,755 canonical flops under suit permutation, each weighted by its number of
+# suit-isomorphic variants, which is exact for ranges that are unchanged by relabeling suits.
+# The combos of the ranges are turned into partial hands once, and each chunk of flops shares them and the evaluator,
+# so a flop only adds its own cards and sampled turn and river with array arithmetic before a batched lookup.
+
+class FlopReport:
+
+    canonicalCache = None
+    suitPermutations = tuple(permutations(range(4)))
+    chunkSize = 16
+
+    def __init__(self, *args: list[list[Card]], samples: int = 2000, workers: int = 1, seed: int = None) -> Self:
+        """
+        Initializes a report over all canonical flops for the given ranges.
+
+        :param args: A list of ranges (each range is a list of hands, with each hand being a list of Card objects).
+                     Ranges must be suit-symmetric, as the full ranges returned by EquitySolver.generateRange are.
+        :param samples: The number of sampled combinations per flop, each with one turn and river (default is 2000).
+        :param workers: The number of worker processes (default is 1).
+        :param seed: An optional integer seed for reproducible results, independent of the number of workers.
+        """
+        assert len(args) > 1, "AT LEAST TWO RANGES ARE REQUIRED."
+        assert isinstance(samples, int) and samples > 0, "SAMPLES INPUT IS NOT A POSITIVE INTEGER."
+        assert isinstance(workers, int) and workers > 0, "WORKERS INPUT IS NOT A POSITIVE INTEGER."
+
+        self.ranges = [sorted({tuple(sorted(card.getIndex() for card in hand)) for hand in range}) for range in args]
+        assert all(FlopReport.isSymmetric(range) for range in self.ranges), "RANGES MUST BE SUIT-SYMMETRIC."
+        self.samples = samples
+        self.workers = workers
+        self.seed = seed
+
+    def rows(self) -> Iterator[dict]:
+        """
+        Lazily computes one row per canonical flop, in canonical order. With several workers, flops are
+        computed in parallel and rows are still yielded in order as soon as they are ready.
+
+        :return: An iterator of rows with the flop, its weight (number of isomorphic flops), the range
+                 equities, and the made-hand category frequencies of each range on the flop.
+        """
+        flops = FlopReport.canonicalFlops()
+        seeds = np.random.SeedSequence(self.seed).spawn(len(flops))
+        tasks = [(flop, weight, self.ranges, self.samples, sequence) for (flop, weight), sequence in zip(flops, seeds)]
+        chunks = (tasks[start:start + FlopReport.chunkSize] for start in range(0, len(tasks), FlopReport.chunkSize))
+        if self.workers == 1:
+            for rows in map(FlopReport.computeChunk, chunks):
+                yield from rows
+        else:
+            with ProcessPoolExecutor(self.workers) as pool:
+                for rows in pool.map(FlopReport.computeChunk, chunks):
+                    yield from rows
+
+    def write(self, stream: TextIO) -> dict[str: float]:
+        """
+        Streams the report as a CSV table (one line per canonical flop) and returns the overall equities.
+
+        :param stream: A text stream to write the table to.
+        :return: A dictionary of range names and their equity percentages averaged over all 22,100 flops. Each flop counts
+                 equally, rather than by its likelihood given the ranges, so the result can differ from preflop equity.
+                 Flops on which the ranges cannot meet (weight 0, see computeRow) are left out of the average.
+        """
+        names = ["Range "+str(i+1) for i in range(len(self.ranges))]
+        writer = csv.writer(stream)
+        writer.writerow(["flop", "weight"] + names + ["CHOP"] + [name+" "+hand for name in names for hand in Hand.hands])
+        totals = dict.fromkeys(names + ["CHOP"], 0.0)
+        weight = 0
+        for row in self.rows():
+            writer.writerow([row["flop"], row["weight"]] + [round(row["equities"][name], 6) for name in totals]
+                            + [round(row["hits"][name].get(hand, 0.0), 6) for name in names for hand in Hand.hands])
+            stream.flush()
+            if not row["weight"]:
+                continue
+            weight += row["weight"]
+            for name in totals:
+                totals[name] += row["weight"]*row["equities"][name]
+        return({name: total/max(1, weight) for name, total in totals.items()})
+
+    @staticmethod
+    def prepare(ranges: list[list[tuple[int, int]]]) -> dict:
+        """
+        Precomputes the state shared by every flop of a report: the card bitsets and partial hands (rank keys and
+        suit masks, see HandEvaluator.partialBatch) of each range's combos and of every single card, and the evaluator.
+
+        :param ranges: A list of ranges, each a list of card index pairs.
+        :return: A state dictionary for computeRow.
+        """
+        combos = [np.array(range, dtype = np.int64).reshape(-1, 2) for range in ranges]
+        cardKeys, cardMasks = HandEvaluator.partialBatch(np.arange(52).reshape(52, 1))
+        return({"bits": [np.left_shift(1, hands[:, 0]) | np.left_shift(1, hands[:, 1]) for hands in combos],
+                "partials": [HandEvaluator.partialBatch(hands) for hands in combos],
+                "cardKeys": cardKeys, "cardMasks": cardMasks, "evaluator": HandEvaluator.standard()})
+
+    @staticmethod
+    def computeChunk(tasks: list[tuple]) -> list[dict]:
+        """
+        Computes the rows of a chunk of flops of the same report, sharing one precomputed state (see prepare).
+
+        :param tasks: A list of computeRow tasks with the same ranges.
+        :return: A list of row dictionaries (see rows).
+        """
+        state = FlopReport.prepare(tasks[0][2])
+        return([FlopReport.computeRow(task, state) for task in tasks])
+
+    @staticmethod
+    def computeRow(task: tuple, state: dict = None) -> dict:
+        """
+        Computes the row of one canonical flop. When a range has no combo left on the flop, or no combination of one
+        combo per range is free of conflicts, the row has weight 0 and NaN equities.
+
+        :param task: A tuple of the flop (card indices), its weight, the ranges (card index pairs), the sample count and a SeedSequence.
+        :param state: The state shared by the flops of the report (default is computed from the task's ranges, see prepare).
+        :return: A row dictionary (see rows).
+        """
+        flop, weight, ranges, samples, sequence = task
+        state = state or FlopReport.prepare(ranges)
+        flopBits = sum(1 << card for card in flop)
+        indices = [np.flatnonzero((bits & flopBits) == 0) for bits in state["bits"]]
+        if FlopReport.hasMatchup([[ranges[r][i] for i in index.tolist()] for r, index in enumerate(indices)]):
+            equities = FlopReport.sampleEquities(flop, indices, samples, state, RandomEngine(sequence))
+        else:
+            weight = 0
+            equities = dict.fromkeys(["Range "+str(i+1) for i, _ in enumerate(ranges)] + ["CHOP"], float("nan"))
+
+        hits = {}
+        flopKey, flopMasks = HandEvaluator.partial(flop)
+        for i, index in enumerate(indices):
+            if not len(index):
+                hits["Range "+str(i+1)] = {}
+                continue
+            keys, masks = state["partials"][i]
+            scores = state["evaluator"].scoreArrays(flopKey + keys[index], np.array(flopMasks) | masks[index])
+            categories = np.bincount(len(Hand.hands) - 1 - (scores >> 20 & 15), minlength = len(Hand.hands))
+            hits["Range "+str(i+1)] = {Hand.hands[c]: count/len(index) for c, count in enumerate(categories.tolist()) if count}
+        return({"flop": "".join(Card.ranks[card.getRank()]+card.getSuit() for card in map(Card.fromIndex, flop)), "weight": weight, "equities": equities, "hits": hits})
+
+    @staticmethod
+    def sampleEquities(flop: tuple[int, ...], indices: list[np.ndarray], samples: int, state: dict, engine: RandomEngine) -> dict[str: float]:
+        """
+        Estimates the range equities on a flop like EquitySolver.sampleRangeEquity: each sample draws one live combo per
+        range uniformly, rejects combinations with conflicting cards and deals one turn and river from the rest of the
+        deck. Samples are drawn and scored in blocks, adding the partial hands of the flop, combos and runout cards.
+
+        :param flop: The flop as card indices.
+        :param indices: The indices of each range's combos that are live on the flop (see prepare).
+        :param samples: The number of accepted samples.
+        :param state: The state shared by the flops of the report (see prepare).
+        :param engine: The RandomEngine to sample from.
+        :return: A dictionary of range names and their respective equity percentages, plus "CHOP".
+        """
+        deck = np.array([card for card in range(52) if card not in flop])
+        flopKey, flopMasks = HandEvaluator.partial(flop)
+        counts = np.zeros(len(indices))
+        chops = 0
+        accepted = 0
+        attempts = 0
+        while accepted < samples:
+            assert attempts < 100*samples, "TOO MANY CONFLICTING COMBINATIONS TO SAMPLE."
+            block = min(RunoutSampler.blockSize, samples - accepted)
+            attempts += block
+            picks = [index[engine.getGenerator().integers(len(index), size = block)] for index in indices]
+            used = np.zeros(block, dtype = np.int64)
+            conflict = np.zeros(block, dtype = bool)
+            for bits, pick in zip(state["bits"], picks):
+                conflict |= (used & bits[pick]) != 0
+                used |= bits[pick]
+            picks = [pick[~conflict] for pick in picks]
+            used = used[~conflict]
+            if not len(used):
+                continue
+
+            # Runouts are drawn with spare cards, and the first two that miss every hole are the turn and river.
+            runouts = deck[engine.sampleIndices(len(deck), 2 + 2*len(indices), len(used))]
+            order = np.argsort(np.right_shift(used[:, None], runouts) & 1, axis = 1, kind = 'stable')[:, :2]
+            turnRiver = np.take_along_axis(runouts, order, axis = 1)
+            boardKeys = flopKey + state["cardKeys"][turnRiver].sum(axis = 1)
+            boardMasks = np.array(flopMasks) | state["cardMasks"][turnRiver[:, 0]] | state["cardMasks"][turnRiver[:, 1]]
+            scores = np.stack([state["evaluator"].scoreArrays(boardKeys + keys[pick], boardMasks | masks[pick]) for (keys, masks), pick in zip(state["partials"], picks)], axis = 1)
+            winners = scores == scores.max(axis = 1, keepdims = True)
+            chopped = winners.all(axis = 1)
+            chops += int(chopped.sum())
+            counts += winners[~chopped].sum(axis = 0)
+            accepted += len(used)
+
+        equities = {"Range "+str(i+1): float(count)/accepted for i, count in enumerate(counts.tolist())}
+        equities["CHOP"] = chops/accepted
+        return(equities)
+
+    @staticmethod
+    def hasMatchup(ranges: list[list[tuple[int, int]]], used: frozenset[int] = frozenset()) -> bool:
+        """
+        Checks whether some combination of one combo per range shares no cards, searching range by range.
+
+        :param ranges: A list of ranges, each a list of card index pairs.
+        :param used: The cards taken by the combos of the earlier ranges.
+        :return: True if a conflict-free combination exists, False otherwise.
+        """
+        if not ranges:
+            return(True)
+        return(any(FlopReport.hasMatchup(ranges[1:], used | set(hand)) for hand in ranges[0] if not used & set(hand)))
+
+    @staticmethod
+    def canonical(flop: list[Card] | tuple[int, ...]) -> tuple[int, ...]:
+        """
+        Returns the canonical form of a flop: the smallest sorted tuple of card indices among all its suit relabelings.
+
+        :param flop: A list of three Card objects, or a tuple of three card indices.
+        :return: A sorted tuple of three card indices.
+        """
+        cards = [(card.getIndex() if isinstance(card, Card) else card) for card in flop]
+        return(min(tuple(sorted(13*permutation[card // 13] + card % 13 for card in cards)) for permutation in FlopReport.suitPermutations))
+
+    @staticmethod
+    def canonicalFlops() -> list[tuple[tuple[int, ...], int]]:
+        """
+        Enumerates the 1,755 canonical flops with their multiplicity (weights sum to the 22,100 raw flops).
+        The enumeration is computed once and cached.
+
+        :return: A list of (canonical flop as card indices, weight) tuples, sorted by flop.
+        """
+        if FlopReport.canonicalCache is None:
+            weights = {}
+            for flop in combinations(range(52), 3):
+                key = FlopReport.canonical(flop)
+                weights[key] = weights.get(key, 0) + 1
+            FlopReport.canonicalCache = sorted(weights.items())
+        return(FlopReport.canonicalCache)
+
+    @staticmethod
+    def isSymmetric(range: list[tuple[int, int]]) -> bool:
+        """
+        Checks whether a range is unchanged by every relabeling of suits.
+
+        :param range: A list of sorted card index pairs.
+        :return: True if the range is suit-symmetric, False otherwise.
+        """
+        combos = set(range)
+        for permutation in FlopReport.suitPermutations:
+            if any(tuple(sorted(13*permutation[card // 13] + card % 13 for card in hand)) not in combos for hand in range):
+                return(False)
+        return(True)
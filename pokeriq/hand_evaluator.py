@@ -0,0 +1,413 @@
+from .card import Card
+from .made_hand import Hand
+from .checkpoint import Checkpoint
+from itertools import combinations, combinations_with_replacement
+from typing import Self, Iterable
+import numpy as np
+import os
+
+# hand_evaluator.py
+# This file contains classes for fast made-hand evaluation over integer card indices (see Card.getIndex).
+# Hands are reduced to an additive rank histogram key and per-suit rank masks, so partial hands (a board,
+# a hole) can be precomputed once and combined with newly dealt cards by addition and bitwise or.
+# Evaluators for custom deck compositions and ranking orders (e.g., short deck) are built by a factory
+# and their lookup tables cached on disk, keyed by the deck signature.
+
+class HandEvaluator:
+
+    # Each rank owns a 3-bit digit of the rank key, so adding a card adds one to its rank's count.
+    rankKeys = tuple(1 << 3*(index % 13) for index in range(52))
+    rankBits = tuple(1 << (index % 13) for index in range(52))
+
+    # An Omaha hand uses exactly two of the four hole cards and three of the five board cards: 6 x 10 = 60 hands.
+    omahaPairs = np.array(list(combinations(range(4), 2)))
+    omahaTriples = np.array(list(combinations(range(5), 3)))
+
+    # Ranking orders of the made-hand categories, strongest first. In short deck (6+), a flush beats a full house.
+    rankings = {'standard': Hand.hands,
+                'shortdeck': Hand.hands[:3] + ('FLUSH', 'FULL HOUSE') + Hand.hands[5:]}
+
+    standardEvaluator = None
+    evaluators = {}
+    cacheDirectory = os.environ.get("POKERIQ_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "pokeriq"))
+
+    def __init__(self, rankCounts: list[int] = None, ranking: str | tuple[str, ...] = 'standard') -> Self:
+        """
+        Initializes an evaluator for a deck composition and ranking order (default is standard Hold'em rankings).
+        Scores of non-flush hands are memoized by rank key on first use; flush scores are tabulated for all
+        8192 suit masks up front. Straights are five consecutive ranks among those in the deck, with the ace
+        also playing below the lowest rank (e.g., A-6-7-8-9 in short deck).
+
+        :param rankCounts: The number of cards of each rank 2-14 in the deck (default is four of each).
+        :param ranking: A name in HandEvaluator.rankings, or an order of the categories of Hand.hands, strongest first.
+        """
+        rankCounts = ([4]*13 if rankCounts is None else list(rankCounts))
+        ranking = tuple(HandEvaluator.rankings[ranking] if isinstance(ranking, str) else ranking)
+        assert len(rankCounts) == 13 and all(isinstance(count, int) and 0 <= count <= 7 for count in rankCounts), "RANK COUNTS IS NOT A LIST OF 13 INTEGERS ON [0,7]."
+        assert sorted(ranking) == sorted(Hand.hands), "RANKING IS NOT AN ORDER OF THE CATEGORIES OF Hand.hands."
+
+        self.rankCounts = rankCounts
+        self.ranking = ranking
+        self.straights = HandEvaluator.straightWindows([rank for rank in range(2, 15) if rankCounts[rank - 2]])
+        # Custom orders prefix scores with the category's strength, above the standard layout.
+        self.prefixes = [(0 if ranking == Hand.hands else (len(Hand.hands) - 1 - ranking.index(hand)) << 24) for hand in Hand.hands]
+        self.rankTable = {}
+        self.flushTable = [self.rerank(HandEvaluator.scoreFlush(mask, self.straights)) for mask in range(1 << 13)]
+        self.flushArray = np.array(self.flushTable, dtype = np.int64)
+
+    def rerank(self, score: int) -> int:
+        """
+        Applies the evaluator's ranking order to a score in the standard layout.
+
+        :param score: An integer score from scoreRanks or scoreFlush.
+        :return: The score under the evaluator's ranking order (0 stays 0).
+        """
+        return(score | self.prefixes[HandEvaluator.category(score)] if score else 0)
+
+    def scoreKey(self, key: int) -> int:
+        """
+        Scores the non-flush part of a hand from its rank key, memoized in rankTable.
+
+        :param key: The additive rank key of the hand.
+        :return: An integer score.
+        """
+        score = self.rankTable.get(key)
+        if score is None:
+            score = self.rankTable[key] = self.rerank(HandEvaluator.scoreRanks(key, self.straights))
+        return(score)
+
+    def fillTable(self) -> None:
+        """
+        Scores every rank key of five to seven cards that the deck composition allows.
+        """
+        ranks = [rank for rank in range(13) if self.rankCounts[rank]]
+        for size in range(5, 8):
+            for hand in combinations_with_replacement(ranks, size):
+                if all(hand.count(rank) <= self.rankCounts[rank] for rank in set(hand)):
+                    self.scoreKey(sum(1 << 3*rank for rank in hand))
+
+    def score(self, cards: Iterable[int]) -> int:
+        """
+        Scores a set of at least five cards. Higher scores are stronger hands and equal scores chop.
+
+        :param cards: An iterable of card indices.
+        :return: An integer score of the best five-card hand.
+        """
+        key, masks = HandEvaluator.partial(cards)
+        return(self.scorePartial(key, masks))
+
+    def scorePartial(self, key: int, masks: list[int]) -> int:
+        """
+        Scores a hand given as a rank key and per-suit rank masks (see partial).
+
+        :param key: The additive rank key of the hand.
+        :param masks: A list of four rank masks, one per suit.
+        :return: An integer score of the best five-card hand.
+        """
+        score = self.scoreKey(key)
+        for mask in masks:
+            if self.flushTable[mask] > score:
+                score = self.flushTable[mask]
+        return(score)
+
+    def scoreBatch(self, cards: np.ndarray) -> np.ndarray:
+        """
+        Scores many hands at once. Rank keys and suit masks are built with array arithmetic, the distinct
+        rank keys of the batch are scored once (memoized like score), and flushes are read from a dense table.
+
+        :param cards: An (n, k) integer array of card indices, one hand of k >= 5 distinct cards per row.
+        :return: An integer array of n scores.
+        """
+        cards = np.asarray(cards, dtype = np.int64)
+        assert cards.ndim == 2 and cards.shape[1] >= 5, "CARDS IS NOT AN (N, K >= 5) ARRAY."
+
+        keys, masks = HandEvaluator.partialBatch(cards)
+        return(self.scoreArrays(keys, masks))
+
+    def scoreArrays(self, keys: np.ndarray, masks: np.ndarray) -> np.ndarray:
+        """
+        Scores many hands given as rank keys and per-suit rank masks (see partialBatch), so that partial
+        hands computed once can be combined with array addition and bitwise or before scoring.
+
+        :param keys: An integer array of n rank keys.
+        :param masks: An (n, 4) integer array of suit masks.
+        :return: An integer array of n scores.
+        """
+        unique, inverse = np.unique(keys, return_inverse = True)
+        scores = np.array([self.scoreKey(key) for key in unique.tolist()], dtype = np.int64)[inverse.reshape(-1)]
+        for suit in range(4):
+            np.maximum(scores, self.flushArray[masks[:, suit]], out = scores)
+        return(scores)
+
+    def scoreOmaha(self, board: list[int], hole: list[int]) -> int:
+        """
+        Scores an Omaha hand, the best five-card hand using exactly two hole cards and three board cards.
+
+        :param board: A list of five board card indices.
+        :param hole: A list of four hole card indices.
+        :return: An integer score of the best five-card hand.
+        """
+        return(int(self.scoreOmahaBatch(np.array([board]), np.array([hole]))[0]))
+
+    def scoreOmahaBatch(self, boards: np.ndarray, holes: np.ndarray) -> np.ndarray:
+        """
+        Scores many Omaha hands at once. The rank keys and suit masks of the 6 hole pairs and 10 board triples are
+        combined by broadcasting, so all 60 five-card hands of every row are scored in one batched table lookup.
+
+        :param boards: An (n, 5) integer array of board card indices.
+        :param holes: An (n, 4) integer array of hole card indices.
+        :return: An integer array of n scores.
+        """
+        boards = np.asarray(boards, dtype = np.int64)
+        holes = np.asarray(holes, dtype = np.int64)
+        assert boards.ndim == 2 and boards.shape[1] == 5 and holes.shape == (len(boards), 4), "BOARDS AND HOLES ARE NOT (N, 5) AND (N, 4) ARRAYS."
+
+        count = len(boards)
+        pairKeys, pairMasks = HandEvaluator.partialBatch(holes[:, HandEvaluator.omahaPairs].reshape(-1, 2))
+        tripleKeys, tripleMasks = HandEvaluator.partialBatch(boards[:, HandEvaluator.omahaTriples].reshape(-1, 3))
+        keys = pairKeys.reshape(count, 6, 1) + tripleKeys.reshape(count, 1, 10)
+        masks = pairMasks.reshape(count, 6, 1, 4) | tripleMasks.reshape(count, 1, 10, 4)
+        return(self.scoreArrays(keys.reshape(-1), masks.reshape(-1, 4)).reshape(count, 60).max(axis = 1))
+
+    @staticmethod
+    def partial(cards: Iterable[int]) -> tuple[int, list[int]]:
+        """
+        Computes the rank key and per-suit rank masks of a partial hand.
+
+        :param cards: An iterable of card indices.
+        :return: A tuple of the rank key and a list of four suit masks.
+        """
+        key = 0
+        masks = [0, 0, 0, 0]
+        for card in cards:
+            key += HandEvaluator.rankKeys[card]
+            masks[card // 13] |= HandEvaluator.rankBits[card]
+        return(key, masks)
+
+    @staticmethod
+    def partialBatch(cards: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the rank keys and per-suit rank masks of many partial hands (see partial).
+
+        :param cards: An (n, k) integer array of card indices, one partial hand of distinct cards per row.
+        :return: A tuple of an integer array of n rank keys and an (n, 4) integer array of suit masks.
+        """
+        cards = np.asarray(cards, dtype = np.int64)
+        ranks = cards % 13
+        keys = np.sum(np.left_shift(1, 3*ranks), axis = 1)
+        bits = np.left_shift(1, ranks)
+        suits = cards // 13
+        masks = np.stack([np.bitwise_or.reduce(np.where(suits == suit, bits, 0), axis = 1) for suit in range(4)], axis = 1)
+        return(keys, masks)
+
+    @staticmethod
+    def category(score: int) -> int:
+        """
+        Converts a score to its made-hand category.
+
+        :param score: An integer score returned by any evaluator.
+        :return: The index of the category in Hand.hands (e.g., 0 for ROYAL FLUSH).
+        """
+        return(len(Hand.hands) - 1 - (score >> 20 & 15))
+
+    @staticmethod
+    def encode(category: int, ranks: list[int]) -> int:
+        """
+        Packs a made-hand category and its tie-breaking ranks into a single comparable score.
+
+        :param category: The index of the category in Hand.hands.
+        :param ranks: Up to five tie-breaking ranks (2-14), most significant first.
+        :return: An integer score.
+        """
+        score = len(Hand.hands) - 1 - category
+        for i in range(5):
+            score = (score << 4) | (ranks[i] if i < len(ranks) else 0)
+        return(score)
+
+    @staticmethod
+    def straightWindows(ranks: list[int]) -> tuple[tuple[int, int], ...]:
+        """
+        Lists the straights of a deck composition: every five consecutive ranks in the deck, and the ace
+        followed by the four lowest ranks.
+
+        :param ranks: The ranks (2-14) in the deck, in ascending order.
+        :return: A tuple of (top rank, 13-bit rank mask) pairs, highest straight first.
+        """
+        windows = [(ranks[i + 4], sum(1 << (rank - 2) for rank in ranks[i:i+5])) for i in range(len(ranks) - 4)]
+        if len(ranks) >= 5 and ranks[-1] == 14:
+            windows.append((ranks[3], sum(1 << (rank - 2) for rank in ranks[:4]) | 1 << 12))
+        return(tuple(sorted(windows, reverse = True)))
+
+    @staticmethod
+    def straightTop(mask: int, straights: tuple[tuple[int, int], ...] = None) -> int | None:
+        """
+        Finds the highest straight in a rank mask, counting the ace as low for the wheel.
+
+        :param mask: A 13-bit mask of the ranks present (bit 0 is the deuce).
+        :param straights: The straights of the deck composition (see straightWindows, default is a standard deck).
+        :return: The top rank of the highest straight, or None if there is no straight.
+        """
+        for top, window in (straights or HandEvaluator.standardStraights):
+            if mask & window == window:
+                return(top)
+        return(None)
+
+    @staticmethod
+    def scoreFlush(mask: int, straights: tuple[tuple[int, int], ...] = None) -> int:
+        """
+        Scores the flush held in a single suit's rank mask.
+
+        :param mask: A 13-bit mask of the ranks held in one suit.
+        :param straights: The straights of the deck composition (see straightWindows, default is a standard deck).
+        :return: The score of the flush or straight flush, or 0 if the suit holds fewer than five cards.
+        """
+        if mask.bit_count() < 5:
+            return(0)
+        top = HandEvaluator.straightTop(mask, straights)
+        if top == 14:
+            return(HandEvaluator.encode(0, [14]))
+        elif top:
+            return(HandEvaluator.encode(1, [top]))
+        ranks = [rank for rank in range(14, 1, -1) if mask >> (rank - 2) & 1]
+        return(HandEvaluator.encode(4, ranks[:5]))
+
+    @staticmethod
+    def scoreRanks(key: int, straights: tuple[tuple[int, int], ...] = None) -> int:
+        """
+        Scores the non-flush part of a hand from its rank key (quads down to high card, straights included).
+
+        :param key: The additive rank key of the hand.
+        :param straights: The straights of the deck composition (see straightWindows, default is a standard deck).
+        :return: An integer score.
+        """
+        counts = {rank: (key >> 3*(rank - 2)) & 7 for rank in range(14, 1, -1)}
+        ranks = [rank for rank, count in counts.items() if count > 0]
+        quads = [rank for rank in ranks if counts[rank] >= 4]
+        trips = [rank for rank in ranks if counts[rank] == 3]
+        pairs = [rank for rank in ranks if counts[rank] == 2]
+        top = HandEvaluator.straightTop(sum(1 << (rank - 2) for rank in ranks), straights)
+
+        if quads:
+            return(HandEvaluator.encode(2, [quads[0]] + [rank for rank in ranks if rank != quads[0]][:1]))
+        elif trips and len(trips + pairs) >= 2:
+            return(HandEvaluator.encode(3, [trips[0], max(trips[1:] + pairs)]))
+        elif top:
+            return(HandEvaluator.encode(5, [top]))
+        elif trips:
+            return(HandEvaluator.encode(6, [trips[0]] + [rank for rank in ranks if rank != trips[0]][:2]))
+        elif len(pairs) >= 2:
+            return(HandEvaluator.encode(7, pairs[:2] + [rank for rank in ranks if rank not in pairs[:2]][:1]))
+        elif pairs:
+            return(HandEvaluator.encode(8, pairs[:1] + [rank for rank in ranks if rank != pairs[0]][:3]))
+        return(HandEvaluator.encode(9, ranks[:5]))
+
+    @staticmethod
+    def standard() -> Self:
+        """
+        Returns the shared evaluator for standard Hold'em rankings, creating it on first use.
+
+        :return: A HandEvaluator object.
+        """
+        if HandEvaluator.standardEvaluator is None:
+            HandEvaluator.standardEvaluator = HandEvaluator()
+        return(HandEvaluator.standardEvaluator)
+
+    @staticmethod
+    def forDeck(cards: Iterable[Card | int], ranking: str | tuple[str, ...] = 'standard') -> Self:
+        """
+        Returns the evaluator for a deck composition and ranking order. A standard deck with standard rankings
+        gets the shared standard evaluator. Otherwise the rank table of every five to seven card hand is built
+        once, saved in HandEvaluator.cacheDirectory under the deck signature (the number of cards of each rank
+        and the ranking order), and loaded from there by later processes; evaluators are also kept in memory.
+
+        :param cards: The cards of the game's full deck before dead cards are removed (see Deck.getComposition),
+                      as Card objects or card indices (repeated cards count once).
+        :param ranking: A name in HandEvaluator.rankings, or an order of the categories of Hand.hands, strongest first.
+        :return: A HandEvaluator object.
+        """
+        ranking = tuple(HandEvaluator.rankings[ranking] if isinstance(ranking, str) else ranking)
+        rankCounts = [0]*13
+        for card in {(card.getIndex() if isinstance(card, Card) else card) for card in cards}:
+            rankCounts[card % 13] += 1
+        if ranking == Hand.hands and HandEvaluator.straightWindows([rank for rank in range(2, 15) if rankCounts[rank - 2]]) == HandEvaluator.standardStraights:
+            return(HandEvaluator.standard())
+
+        signature = Checkpoint.hash({"rankCounts": rankCounts, "ranking": ranking})
+        if signature not in HandEvaluator.evaluators:
+            evaluator = HandEvaluator(rankCounts, ranking)
+            path = os.path.join(HandEvaluator.cacheDirectory, "evaluator-"+signature+".npz")
+            if os.path.exists(path):
+                with np.load(path) as archive:
+                    evaluator.rankTable = dict(zip(archive["keys"].tolist(), archive["scores"].tolist()))
+            else:
+                evaluator.fillTable()
+                os.makedirs(HandEvaluator.cacheDirectory, exist_ok = True)
+                # Written to a temporary file and renamed, so concurrent processes never read a partial table.
+                temporary = path+"."+str(os.getpid())+".tmp"
+                with open(temporary, "wb") as file:
+                    np.savez(file, keys = np.array(list(evaluator.rankTable), dtype = np.int64), scores = np.array(list(evaluator.rankTable.values()), dtype = np.int64))
+                os.replace(temporary, path)
+            HandEvaluator.evaluators[signature] = evaluator
+        return(HandEvaluator.evaluators[signature])
+
+HandEvaluator.standardStraights = HandEvaluator.straightWindows(list(range(2, 15)))
+
+class BoardState:
+    def __init__(self, board: list[int], holes: list[list[int]], evaluator: HandEvaluator = None) -> Self:
+        """
+        Precomputes the rank key and suit masks of a known (partial) board and of each known hole, so
+        that each trial only folds in the newly dealt board cards and any randomly dealt holes.
+
+        :param board: A list of the card indices already on the board (0-5 cards).
+        :param holes: A list with the two card indices of each player's hole, or an empty list for a random hole.
+        :param evaluator: An optional HandEvaluator (default is the standard evaluator).
+        """
+        assert all(len(hole) in {0, 2} for hole in holes), "EACH HOLE MUST HAVE ZERO OR TWO CARDS."
+
+        self.evaluator = evaluator or HandEvaluator.standard()
+        self.boardKey, self.boardMasks = HandEvaluator.partial(board)
+        self.holes = [(HandEvaluator.partial(hole) if hole else None) for hole in holes]
+
+    def scores(self, runout: list[int], randomHoles: list[list[int]] = ()) -> list[int]:
+        """
+        Scores every player on the board completed by a runout.
+
+        :param runout: A list of the card indices completing the board.
+        :param randomHoles: A list of holes (two card indices each) for the players without a known hole, in seat order.
+        :return: A list of integer scores, one per player.
+        """
+        key = self.boardKey
+        masks = list(self.boardMasks)
+        for card in runout:
+            key += HandEvaluator.rankKeys[card]
+            masks[card // 13] |= HandEvaluator.rankBits[card]
+        # Only suits with three or more board cards can make a flush for anyone.
+        flushSuits = [suit for suit in range(4) if masks[suit].bit_count() >= 3]
+
+        rankTable = self.evaluator.rankTable
+        flushTable = self.evaluator.flushTable
+        dealt = iter(randomHoles)
+        scores = []
+        for hole in self.holes:
+            holeKey, holeMasks = hole or HandEvaluator.partial(next(dealt))
+            score = rankTable.get(key + holeKey)
+            if score is None:
+                score = self.evaluator.scoreKey(key + holeKey)
+            for suit in flushSuits:
+                flush = flushTable[masks[suit] | holeMasks[suit]]
+                if flush > score:
+                    score = flush
+            scores.append(score)
+        return(scores)
+
+    def winners(self, runout: list[int], randomHoles: list[list[int]] = ()) -> list[int]:
+        """
+        Determines the winning player(s) on the board completed by a runout.
+
+        :param runout: A list of the card indices completing the board.
+        :param randomHoles: A list of holes (two card indices each) for the players without a known hole, in seat order.
+        :return: A list of the indices of the winning player(s).
+        """
+        scores = self.scores(runout, randomHoles)
+        best = max(scores)
+        return([i for i, score in enumerate(scores) if score == best])
@@ -0,0 +1,329 @@
+from .card import Card
+from .player import Player
+from .hand_evaluator import HandEvaluator
+from .random_engine import RandomEngine
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, islice
+from math import comb
+from typing import Self, Iterator, TextIO
+import numpy as np
+import json
+import re
+
+# hand_history.py
+# This file contains a class streaming PokerStars-style hand histories and annotating all-in hands with
+# equity and EV-adjusted results. Hands are read and written one window at a time; the all-in spots of a
+# window are grouped by board so each group shares one set of runouts (exact enumeration when small enough),
+# and groups are computed in parallel.
+
+class HandHistory:
+
+    streets = ('preflop', 'flop', 'turn', 'river')
+    headerPattern = re.compile(r"^PokerStars (?:Zoom )?(?:Hand|Game) #(\d+)")
+    seatPattern = re.compile(r"^Seat \d+: (.+?) \(([^ ]+) in chips")
+    streetPattern = re.compile(r"^\*\*\* (FLOP|TURN|RIVER) \*\*\*")
+    cardsPattern = re.compile(r"\[([^\]]+)\]")
+    dealtPattern = re.compile(r"^Dealt to (.+?) \[(.+)\]")
+    showsPattern = re.compile(r"^(.+?): shows \[(.+?)\]")
+    actionPattern = re.compile(r"^(.+?): (posts|bets|calls|raises|checks|folds)(.*)$")
+    returnedPattern = re.compile(r"^Uncalled bet \((.+?)\) returned to (.+)$")
+    collectedPattern = re.compile(r"^(.+?) collected (.+?) from")
+    rakePattern = re.compile(r"^Total pot (\S+).*\| Rake (\S+)")
+    amountPattern = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+    def __init__(self, stream: TextIO, workers: int = 1, exactLimit: int = 50000, trials: int = 20000, windowSize: int = 1000, groupSize: int = 64, seed: int = None) -> Self:
+        """
+        Initializes a reader over a stream of hand histories.
+
+        :param stream: A text stream of PokerStars-style hand histories.
+        :param workers: The number of worker processes (default is 1).
+        :param exactLimit: The largest number of board completions enumerated exactly; spots with more are sampled (default is 50000).
+        :param trials: The number of sampled runouts per group of spots that are not enumerated (default is 20000).
+        :param windowSize: The number of hands read, annotated and written at a time (default is 1000).
+        :param groupSize: The largest number of spots sharing one set of runouts (default is 64).
+        :param seed: An optional integer seed for reproducible sampled equities, independent of the number of workers.
+        """
+        assert isinstance(workers, int) and workers > 0, "WORKERS INPUT IS NOT A POSITIVE INTEGER."
+        assert isinstance(exactLimit, int) and exactLimit > 0, "EXACT LIMIT IS NOT A POSITIVE INTEGER."
+        assert isinstance(trials, int) and trials > 0, "TRIALS INPUT IS NOT A POSITIVE INTEGER."
+        assert isinstance(windowSize, int) and windowSize > 0, "WINDOW SIZE IS NOT A POSITIVE INTEGER."
+        assert isinstance(groupSize, int) and groupSize > 0, "GROUP SIZE IS NOT A POSITIVE INTEGER."
+
+        self.stream = stream
+        self.workers = workers
+        self.exactLimit = exactLimit
+        self.trials = trials
+        self.windowSize = windowSize
+        self.groupSize = groupSize
+        self.seed = seed
+
+    def hands(self) -> Iterator[dict]:
+        """
+        Lazily parses the hands of the stream (see parse). Hands that cannot be parsed are skipped.
+
+        :return: An iterator of hand dictionaries.
+        """
+        lines = []
+        for line in self.stream:
+            line = line.strip()
+            if HandHistory.headerPattern.match(line) and lines:
+                yield from HandHistory.parseLines(lines)
+                lines = []
+            if line:
+                lines.append(line)
+        if lines:
+            yield from HandHistory.parseLines(lines)
+
+    def annotated(self) -> Iterator[dict]:
+        """
+        Lazily annotates the hands of the stream, in order. Each window of hands is annotated at once, with
+        its all-in spots grouped by board and the groups computed in parallel across the workers.
+
+        :return: An iterator of annotation dictionaries (see annotate).
+        """
+        sequence = np.random.SeedSequence(self.seed)
+        hands = self.hands()
+        pool = (ProcessPoolExecutor(self.workers) if self.workers > 1 else None)
+        try:
+            while True:
+                window = list(islice(hands, self.windowSize))
+                if not window:
+                    break
+                spots = [(i, HandHistory.spot(hand)) for i, hand in enumerate(window)]
+                spots = [(i, spot) for i, spot in spots if spot]
+                groups = {}
+                for i, spot in spots:
+                    groups.setdefault(tuple(spot["board"]), []).append((i, spot))
+                chunks = [members[start:start+self.groupSize] for members in groups.values() for start in range(0, len(members), self.groupSize)]
+                tasks = [(list(members[0][1]["board"]), [(spot["holes"], spot["layers"]) for _, spot in members], self.exactLimit, self.trials, child)
+                         for members, child in zip(chunks, sequence.spawn(len(chunks)))]
+
+                results = {}
+                for members, outcome in zip(chunks, (pool.map(HandHistory.computeGroup, tasks) if pool else map(HandHistory.computeGroup, tasks))):
+                    for (i, spot), (equities, winnings) in zip(members, outcome):
+                        results[i] = (spot["names"], equities, winnings)
+                for i, hand in enumerate(window):
+                    yield HandHistory.annotate(hand, results.get(i))
+        finally:
+            if pool:
+                pool.shutdown()
+
+    def write(self, stream: TextIO) -> dict[str, dict[str, float]]:
+        """
+        Streams the annotated hands as JSON lines (one per hand), flushing after every window, and totals the results.
+
+        :param stream: A text stream to write the annotations to.
+        :return: A dictionary of player names to their number of hands, net winnings ("net") and EV-adjusted
+                 net winnings ("evNet", all-in hands counted at their expected value).
+        """
+        totals = {}
+        for count, annotation in enumerate(self.annotated(), 1):
+            stream.write(json.dumps(annotation)+"\n")
+            if count % self.windowSize == 0:
+                stream.flush()
+            for name, result in annotation["players"].items():
+                total = totals.setdefault(name, {"hands": 0, "net": 0.0, "evNet": 0.0})
+                total["hands"] += 1
+                total["net"] += result["net"]
+                total["evNet"] += result.get("evNet", result["net"])
+        stream.flush()
+        return(totals)
+
+    @staticmethod
+    def parseLines(lines: list[str]) -> list[dict]:
+        """
+        Parses the lines of one hand, skipping it if it cannot be parsed.
+
+        :param lines: The non-empty lines of a hand.
+        :return: A list of one hand dictionary, or an empty list.
+        """
+        try:
+            return([HandHistory.parse(lines)])
+        except (AssertionError, ValueError, KeyError, IndexError):
+            return([])
+
+    @staticmethod
+    def parse(lines: list[str]) -> dict:
+        """
+        Parses one PokerStars-style hand. Contributions are tracked per street (a raise sets the street total,
+        antes are dead money) less uncalled bets, and the all-in street is the last street on which money entered the
+        main pot (the pot of the shortest all-in player), so a check-down after an all-in keeps the all-in board.
+
+        :param lines: The non-empty lines of a hand.
+        :return: A hand dictionary with the hand "id", the "players" (Player objects, holes assigned when known),
+                 the final "board", the "allInStreet" (None when nobody was all-in) and its board "allInBoard",
+                 the names of the players who "shown" down, and "contributed", "collected" and "rake" amounts.
+        """
+        header = HandHistory.headerPattern.match(lines[0])
+        assert header, "HAND HEADER NOT FOUND."
+
+        stacks = {}
+        holes = {}
+        shown = []
+        contributed = {}
+        committed = {}
+        collected = {}
+        allIn = set()
+        money = []
+        board = []
+        street = 0
+        rake = 0.0
+        summary = False
+        for line in lines[1:]:
+            if line.startswith("*** SUMMARY ***"):
+                summary = True
+            elif summary:
+                match = HandHistory.rakePattern.match(line)
+                if match:
+                    rake = HandHistory.amount(match.group(2))
+            elif match := HandHistory.seatPattern.match(line):
+                stacks[match.group(1)] = HandHistory.amount(match.group(2))
+            elif match := HandHistory.streetPattern.match(line):
+                for name, amount in committed.items():
+                    contributed[name] = contributed.get(name, 0.0) + amount
+                committed = {}
+                street += 1
+                board = [Card.generate(card) for group in HandHistory.cardsPattern.findall(line) for card in group.split()]
+            elif match := HandHistory.actionPattern.match(line):
+                name, action, rest = match.groups()
+                amounts = [HandHistory.amount(value) for value in HandHistory.amountPattern.findall(rest)]
+                before = contributed.get(name, 0.0) + committed.get(name, 0.0)
+                if action == 'posts' and "ante" in rest:
+                    contributed[name] = contributed.get(name, 0.0) + amounts[-1]
+                elif action in {'posts', 'bets', 'calls'}:
+                    committed[name] = committed.get(name, 0.0) + amounts[-1]
+                elif action == 'raises':
+                    committed[name] = amounts[-1]
+                money.append((street, before, contributed.get(name, 0.0) + committed.get(name, 0.0)))
+                if "all-in" in rest:
+                    allIn.add(name)
+            elif match := HandHistory.returnedPattern.match(line):
+                committed[match.group(2)] = committed.get(match.group(2), 0.0) - HandHistory.amount(match.group(1))
+            elif match := HandHistory.collectedPattern.match(line):
+                collected[match.group(1)] = collected.get(match.group(1), 0.0) + HandHistory.amount(match.group(2))
+            elif match := HandHistory.showsPattern.match(line):
+                holes[match.group(1)] = [Card.generate(card) for card in match.group(2).split()]
+                shown.append(match.group(1))
+            elif match := HandHistory.dealtPattern.match(line):
+                holes[match.group(1)] = [Card.generate(card) for card in match.group(2).split()]
+        for name, amount in committed.items():
+            contributed[name] = contributed.get(name, 0.0) + amount
+
+        players = []
+        for name, stack in stacks.items():
+            if stack > 0:
+                player = Player(name, stack)
+                for card in holes.get(name, []):
+                    player.assignHole(card)
+                players.append(player)
+        # The all-in street is the last street on which money entered the main pot, the pot of the shortest all-in
+        # player; checks and bets that only build side pots (e.g., the others betting on after the all-in) do not count.
+        cap = min((contributed.get(name, 0.0) for name in allIn), default = 0.0)
+        lastStreet = max((street for street, before, after in money if after > before and before < cap - 1e-9), default = 0)
+        allInBoard = board[:(0, 3, 4, 5)[lastStreet]]
+        return({"id": header.group(1), "players": players, "board": board, "allInStreet": HandHistory.streets[lastStreet] if allIn else None,
+                "allInBoard": allInBoard if allIn else None, "shown": [name for name in stacks if name in shown],
+                "contributed": {name: contributed.get(name, 0.0) for name in stacks}, "collected": collected, "rake": rake})
+
+    @staticmethod
+    def amount(text: str) -> float:
+        """
+        Parses a money amount, ignoring currency symbols and thousands separators.
+
+        :param text: An amount (e.g., '$1,234.50').
+        :return: A float.
+        """
+        return(float(re.sub(r"[^\d.]", "", text)))
+
+    @staticmethod
+    def spot(hand: dict) -> dict | None:
+        """
+        Extracts the all-in spot of a hand: the board and holes when the main pot closed and the pots as layers of
+        (amount, eligible players). Side pots are layered by the contributions of the players at showdown, and
+        the rake is taken from every layer in proportion.
+
+        :param hand: A hand dictionary (see parse).
+        :return: A dictionary of the "board" and "holes" (card indices), the "names" of the players at showdown and
+                 the pot "layers", or None if the hand has no all-in showdown.
+        """
+        holes = {player.getName(): player.showHole() for player in hand["players"]}
+        shown = [name for name in hand["shown"] if len(holes.get(name, [])) == 2]
+        if hand["allInStreet"] is None or len(shown) < 2:
+            return(None)
+
+        contributed = hand["contributed"]
+        pot = sum(contributed.values())
+        scale = (1 - hand["rake"]/pot if pot > 0 else 0.0)
+        layers = []
+        previous = 0.0
+        for level in sorted({contributed[name] for name in shown}):
+            amount = sum(min(value, level) - min(value, previous) for value in contributed.values())
+            layers.append((amount*scale, [i for i, name in enumerate(shown) if contributed[name] >= level]))
+            previous = level
+        return({"board": [card.getIndex() for card in hand["allInBoard"]], "holes": [[card.getIndex() for card in holes[name]] for name in shown],
+                "names": shown, "layers": layers})
+
+    @staticmethod
+    def computeGroup(task: tuple) -> list[tuple[list[float], list[float]]]:
+        """
+        Computes the equities and expected winnings of a group of spots on the same board. The board completions
+        are enumerated (or sampled) once from the cards off the board; each spot keeps those not holding its hole
+        cards, which for enumeration is exactly the set of its own board completions.
+
+        :param task: A tuple of the board (card indices), the spots as (holes, layers) tuples, the exact limit,
+                     the number of trials and a SeedSequence.
+        :return: A list of (equities, expected winnings) tuples, one per spot, with one value per player at showdown.
+        """
+        board, spots, exactLimit, trials, sequence = task
+        evaluator = HandEvaluator.standard()
+        missing = 5 - len(board)
+        deck = [card for card in range(52) if card not in board]
+        if comb(len(deck), missing) <= exactLimit:
+            runouts = np.array(list(combinations(deck, missing)), dtype = np.int64).reshape(comb(len(deck), missing), missing)
+        else:
+            runouts = np.array(deck)[RandomEngine.resolve(np.random.default_rng(sequence)).sampleIndices(len(deck), missing, trials)]
+        boardKey, boardMasks = HandEvaluator.partial(board)
+        keys, masks = (HandEvaluator.partialBatch(runouts) if missing else (np.zeros(1, dtype = np.int64), np.zeros((1, 4), dtype = np.int64)))
+        keys = keys + boardKey
+        masks = masks | np.array(boardMasks, dtype = np.int64)
+
+        results = []
+        for holes, layers in spots:
+            valid = ~np.isin(runouts, [card for hole in holes for card in hole]).any(axis = 1)
+            scores = []
+            for hole in holes:
+                holeKey, holeMasks = HandEvaluator.partial(hole)
+                scores.append(evaluator.scoreArrays(keys[valid] + holeKey, masks[valid] | np.array(holeMasks, dtype = np.int64)))
+            scores = np.stack(scores)
+            winners = (scores == scores.max(axis = 0))
+            equities = (winners/winners.sum(axis = 0)).mean(axis = 1)
+            winnings = np.zeros(len(holes))
+            for amount, eligible in layers:
+                layer = scores[eligible]
+                shares = (layer == layer.max(axis = 0))
+                winnings[eligible] += amount*(shares/shares.sum(axis = 0)).mean(axis = 1)
+            results.append((equities.tolist(), winnings.tolist()))
+        return(results)
+
+    @staticmethod
+    def annotate(hand: dict, result: tuple[list[str], list[float], list[float]] | None) -> dict:
+        """
+        Builds the annotation of a hand.
+
+        :param hand: A hand dictionary (see parse).
+        :param result: The names of the players at the hand's all-in showdown with their equities and expected winnings, or None.
+        :return: A dictionary with the hand "id", the "allIn" street and "board" (None without an all-in showdown) and,
+                 per player, the "hole" (when known) and "net" winnings; players at an all-in showdown also get
+                 their "equity", expected winnings ("ev") and EV-adjusted net winnings ("evNet").
+        """
+        players = {}
+        for player in hand["players"]:
+            name = player.getName()
+            players[name] = {"hole": "".join(Card.ranks[card.getRank()]+card.getSuit() for card in player.showHole()) or None,
+                             "net": round(hand["collected"].get(name, 0.0) - hand["contributed"][name], 6)}
+        if result is None:
+            return({"id": hand["id"], "allIn": None, "board": None, "players": players})
+
+        for name, equity, ev in zip(*result):
+            players[name].update({"equity": round(equity, 6), "ev": round(ev, 6), "evNet": round(ev - hand["contributed"][name], 6)})
+        return({"id": hand["id"], "allIn": hand["allInStreet"], "board": "".join(Card.ranks[card.getRank()]+card.getSuit() for card in hand["allInBoard"]), "players": players})
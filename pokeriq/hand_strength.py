@@ -0,0 +1,136 @@
+from .card import Card
+from .deck import Deck
+from .hand_evaluator import HandEvaluator
+from .runout_sampler import RunoutSampler
+from .random_engine import RandomEngine
+from math import comb
+from typing import Self
+import numpy as np
+import builtins
+
+# hand_strength.py
+# This file contains a class computing equity-distribution metrics of every hand in a range against an
+# opponent range: hand strength (HS), expected hand strength (EHS), expected squared hand strength (EHS²)
+# and river strength histograms. All hands share one set of runouts, scored with the batch evaluator.
+
+class HandStrength:
+
+    chunkSize = 64
+
+    def __init__(self, board: list[Card], opponents: list[list[Card]], runouts: int = 1000, customDeck: Deck = None, rng: RandomEngine | np.random.Generator = None, seed: int = None) -> Self:
+        """
+        Initializes the metrics for a board and an opponent range, drawing the shared runouts. When the
+        number of possible board completions is at most runouts, every completion is enumerated instead.
+
+        :param board: A list of 0-5 Card objects representing the community board.
+        :param opponents: The opponent range, a list of hands (each a list of two Card objects).
+        :param runouts: The number of runouts shared by all hands (default is 1000).
+        :param customDeck: A custom deck to deal runouts from (default is a standard deck).
+        :param rng: An optional RandomEngine or NumPy Generator to draw runouts from.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        """
+        assert isinstance(board, list) and all(isinstance(card, Card) for card in board) and len(board) <= 5, "BOARD IS NOT A LIST OF 0-5 CARDS."
+        assert isinstance(opponents, list) and len(opponents) > 0, "OPPONENT RANGE IS EMPTY."
+        assert isinstance(runouts, int) and runouts > 0, "RUNOUTS INPUT IS NOT A POSITIVE INTEGER."
+
+        self.board = [card.getIndex() for card in board]
+        self.evaluator = HandEvaluator.standard()
+        self.opponents = np.array([sorted(card.getIndex() for card in hand) for hand in opponents], dtype = np.int64)
+        live = [card.getIndex() for card in (customDeck or Deck()).getCards() if card.getIndex() not in self.board]
+
+        boardCount = 5 - len(self.board)
+        mode = ('exact' if comb(len(live), boardCount) <= runouts else 'uniform')
+        sampled = list(RunoutSampler(live, boardCount, 0, mode, RandomEngine.resolve(rng, seed)).sample(runouts))
+        self.weights = np.array([weight for weight, _ in sampled])
+        self.runouts = np.array([self.board + runout for _, runout in sampled], dtype = np.int64).reshape(len(sampled), 5)
+
+    def strength(self, range: list[list[Card]], boards: np.ndarray) -> np.ndarray:
+        """
+        Computes the hand strength of every hand of a range on each of several boards: the fraction of the
+        opponent combos it beats, counting ties as half. Opponent combos sharing a card with the hand or the
+        board are excluded. Hands conflicting with a board get NaN on that board.
+
+        :param range: A list of hands (each a list of two Card objects).
+        :param boards: An (m, k) integer array of boards with 3-5 card indices each.
+        :return: An (n, m) array of strengths on [0,1], one row per hand.
+        """
+        hands = np.array([sorted(card.getIndex() for card in hand) for hand in range], dtype = np.int64)
+        members = {tuple(combo) for combo in self.opponents.tolist()}
+        duplicate = np.array([tuple(hand) in members for hand in hands.tolist()], dtype = np.int64)
+        # Scores are below 2^24, so (card, score) pairs sort by card first with card*2^24 + score.
+        shift = 1 << 24
+
+        strengths = np.full((len(hands), len(boards)), np.nan)
+        for start in builtins.range(0, len(boards), HandStrength.chunkSize):
+            chunk = boards[start:start+HandStrength.chunkSize]
+            heroScores = self.scoreOn(hands, chunk)
+            opponentScores = self.scoreOn(self.opponents, chunk)
+            for j, board in enumerate(chunk):
+                blocked = np.isin(self.opponents, board).any(axis = 1)
+                valid = ~np.isin(hands, board).any(axis = 1)
+                opponents = self.opponents[~blocked]
+                scores = opponentScores[~blocked, j]
+                hero = heroScores[valid, j]
+                first, second = hands[valid, 0], hands[valid, 1]
+
+                overall = np.sort(scores)
+                pairs = np.sort(np.concatenate([opponents[:, 0]*shift + scores, opponents[:, 1]*shift + scores]))
+                below = np.searchsorted(overall, hero, 'left')
+                upTo = np.searchsorted(overall, hero, 'right')
+                total = np.full(len(hero), len(overall))
+                # Combos holding one of the hand's cards are removed with per-card counts.
+                for card in (first, second):
+                    base = np.searchsorted(pairs, card*shift, 'left')
+                    below -= np.searchsorted(pairs, card*shift + hero, 'left') - base
+                    upTo -= np.searchsorted(pairs, card*shift + hero, 'right') - base
+                    total -= np.searchsorted(pairs, (card + 1)*shift, 'left') - base
+                # The hand itself is removed twice when it is also an opponent combo.
+                upTo += duplicate[valid]
+                total += duplicate[valid]
+                strengths[valid, start + j] = np.where(total > 0, (below + (upTo - below)/2)/np.maximum(total, 1), np.nan)
+        return(strengths)
+
+    def scoreOn(self, hands: np.ndarray, boards: np.ndarray) -> np.ndarray:
+        """
+        Scores every hand on every board with the batch evaluator.
+
+        :param hands: An (n, 2) integer array of holes.
+        :param boards: An (m, k) integer array of boards.
+        :return: An (n, m) integer array of scores.
+        """
+        cards = np.concatenate([np.repeat(hands, len(boards), axis = 0), np.tile(boards, (len(hands), 1))], axis = 1)
+        return(self.evaluator.scoreBatch(cards).reshape(len(hands), len(boards)))
+
+    def metrics(self, range: list[list[Card]]) -> dict[str, np.ndarray]:
+        """
+        Computes HS, EHS and EHS² for every hand of a range. HS is the strength on the current board (NaN
+        preflop); EHS and EHS² are the mean of the river strength and of its square over the shared runouts
+        that do not conflict with the hand.
+
+        :param range: A list of hands (each a list of two Card objects).
+        :return: A dictionary of "hs", "ehs" and "ehs2" arrays, aligned with the range.
+        """
+        rivers = self.strength(range, self.runouts)
+        weights = np.where(np.isnan(rivers), 0, self.weights)
+        weights = weights/np.maximum(weights.sum(axis = 1, keepdims = True), 1e-300)
+        filled = np.nan_to_num(rivers)
+        current = (self.strength(range, np.array([self.board]))[:, 0] if len(self.board) >= 3 else np.full(len(range), np.nan))
+        return({"hs": current, "ehs": np.sum(weights*filled, axis = 1), "ehs2": np.sum(weights*filled**2, axis = 1)})
+
+    def distribution(self, range: list[list[Card]], bins: int = 50) -> np.ndarray:
+        """
+        Computes the histogram of river strength over the shared runouts for every hand of a range,
+        the equity distribution used for clustering hands into buckets (e.g., with k-means).
+
+        :param range: A list of hands (each a list of two Card objects).
+        :param bins: The number of equal-width bins on [0,1] (default is 50).
+        :return: An (n, bins) array whose rows sum to 1.
+        """
+        assert isinstance(bins, int) and bins > 0, "BINS INPUT IS NOT A POSITIVE INTEGER."
+
+        rivers = self.strength(range, self.runouts)
+        weights = np.where(np.isnan(rivers), 0, self.weights)
+        indices = np.minimum((np.nan_to_num(rivers)*bins).astype(np.int64), bins - 1)
+        histograms = np.zeros((len(range), bins))
+        np.add.at(histograms, (np.arange(len(range))[:, None], indices), weights)
+        return(histograms/np.maximum(histograms.sum(axis = 1, keepdims = True), 1e-300))
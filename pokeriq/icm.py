@@ -0,0 +1,121 @@
+from .player import Player
+from .random_engine import RandomEngine
+from math import comb
+from typing import Self
+import numpy as np
+
+# icm.py
+# This file contains a class for tournament equity under the Independent Chip Model (Malmuth-Harville).
+# Exact equity is a dynamic program over the sets of players already finished (bitmasks), which replaces the
+# factorial enumeration of finishing orders; large fields fall back to Monte Carlo over sampled finishing orders.
+
+class ICMCalculator:
+    def __init__(self, payouts: list[float], maxStates: int = 200000, trials: int = 100000, rng: RandomEngine | np.random.Generator = None, seed: int = None) -> Self:
+        """
+        Initializes a calculator for a payout structure.
+
+        :param payouts: The prize of each finishing place, first place first.
+        :param maxStates: The largest number of finished-player sets solved exactly before Monte Carlo is used (default is 200000).
+        :param trials: The number of sampled finishing orders in Monte Carlo mode (default is 100000).
+        :param rng: An optional RandomEngine or NumPy Generator for Monte Carlo mode.
+        :param seed: An optional integer seed for Monte Carlo mode when no rng is given.
+        """
+        assert isinstance(payouts, list) and len(payouts) > 0 and all(isinstance(payout, (int, float)) and payout >= 0 for payout in payouts), "PAYOUTS IS NOT A LIST OF NON-NEGATIVE NUMBERS."
+        assert isinstance(maxStates, int) and maxStates > 0, "MAX STATES IS NOT A POSITIVE INTEGER."
+        assert isinstance(trials, int) and trials > 0, "TRIALS INPUT IS NOT A POSITIVE INTEGER."
+
+        self.payouts = [float(payout) for payout in payouts]
+        self.maxStates = maxStates
+        self.trials = trials
+        self.rng = RandomEngine.resolve(rng, seed)
+
+    def equity(self, stacks: list[int | float] | list[Player]) -> list[float]:
+        """
+        Calculates the ICM equity of each player, exactly when the number of finished-player sets to solve is
+        at most maxStates, and by Monte Carlo otherwise.
+
+        :param stacks: A list of chip stacks, or a list of Player objects (see Player.getStack).
+        :return: A list of prize equities, one per player.
+        """
+        stacks = ICMCalculator.toArray(stacks)
+        if self.countStates(stacks.shape[1]) <= self.maxStates:
+            return(self.equityBatch(stacks)[0].tolist())
+        return(self.monteCarlo(stacks[0]).tolist())
+
+    def equityBatch(self, stacks: np.ndarray) -> np.ndarray:
+        """
+        Calculates exact ICM equity for many stack configurations of the same field size at once. The dynamic
+        program walks the finished-player sets place by place, with each state holding one probability per configuration.
+
+        :param stacks: An (m, n) array of chip stacks, one configuration of n players per row.
+        :return: An (m, n) array of prize equities.
+        """
+        stacks = ICMCalculator.toArray(stacks)
+        count, players = stacks.shape
+        places = min(len(self.payouts), players)
+        total = stacks.sum(axis = 1)
+        equities = np.zeros((count, players))
+        # Each state maps a set of finished players to the probability that they took the top places.
+        level = {0: (np.ones(count), np.zeros(count))}
+        for place in range(places):
+            following = {}
+            for mask, (probability, finished) in level.items():
+                remaining = total - finished
+                for player in range(players):
+                    if mask >> player & 1:
+                        continue
+                    chance = probability*np.divide(stacks[:, player], remaining, out = np.zeros(count), where = remaining > 0)
+                    equities[:, player] += chance*self.payouts[place]
+                    nextMask = mask | 1 << player
+                    if nextMask in following:
+                        following[nextMask][0][:] += chance
+                    else:
+                        following[nextMask] = (chance, finished + stacks[:, player])
+            level = following
+        return(equities)
+
+    def monteCarlo(self, stacks: list[int | float] | np.ndarray) -> np.ndarray:
+        """
+        Estimates ICM equity by sampling finishing orders. Under Malmuth-Harville, sorting players by an
+        exponential variable divided by their stack yields each finishing order with its exact probability.
+
+        :param stacks: A list or array of the chip stacks of n players.
+        :return: An array of n estimated prize equities.
+        """
+        stacks = np.asarray(stacks, dtype = float)
+        payouts = np.zeros(len(stacks))
+        payouts[:min(len(self.payouts), len(stacks))] = self.payouts[:len(stacks)]
+        # Busted players take no places, as in the exact dynamic program.
+        payouts[np.count_nonzero(stacks):] = 0
+        equities = np.zeros(len(stacks))
+        for start in range(0, self.trials, 4096):
+            block = min(4096, self.trials - start)
+            with np.errstate(divide = 'ignore'):
+                times = self.rng.getGenerator().exponential(size = (block, len(stacks)))/stacks
+            order = np.argsort(times, axis = 1)
+            np.add.at(equities, order, np.broadcast_to(payouts, order.shape))
+        return(equities/self.trials)
+
+    def countStates(self, players: int) -> int:
+        """
+        Counts the finished-player sets the exact dynamic program visits for a field.
+
+        :param players: The number of players.
+        :return: The number of states.
+        """
+        return(sum(comb(players, place) for place in range(min(len(self.payouts), players))))
+
+    @staticmethod
+    def toArray(stacks: list[int | float] | list[Player] | np.ndarray) -> np.ndarray:
+        """
+        Converts stacks or players to a two-dimensional array of stacks.
+
+        :param stacks: A list of chip stacks, a list of Player objects, or an (m, n) array of stacks.
+        :return: An (m, n) float array.
+        """
+        if isinstance(stacks, list) and all(isinstance(player, Player) for player in stacks):
+            stacks = [player.getStack() for player in stacks]
+        stacks = np.asarray(stacks, dtype = float)
+        stacks = (stacks[None, :] if stacks.ndim == 1 else stacks)
+        assert stacks.ndim == 2 and stacks.shape[1] > 0 and np.all(stacks >= 0), "STACKS IS NOT A LIST OR ARRAY OF NON-NEGATIVE NUMBERS."
+        return(stacks)
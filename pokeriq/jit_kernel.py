@@ -0,0 +1,183 @@
+from .hand_evaluator import HandEvaluator
+from .random_engine import RandomEngine
+from .runout_sampler import RunoutSampler
+from typing import Self
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# jit_kernel.py
+# This file contains a class running the deal-evaluate-tally loop of hand equity over integer card arrays.
+# When Numba is installed the kernel is compiled to machine code; the rank table is flattened into sorted
+# key and score arrays so that the compiled loop needs no Python dictionaries. Uniform runouts are dealt inside
+# the kernel from an array of live cards and a block of uniforms, so no runout is built as a Python list.
+# Without Numba, EquitySolver falls back to the pure Python loop over BoardState.
+
+class JitKernel:
+
+    available = numba is not None
+    kernels = {}
+
+    def __init__(self, evaluator: HandEvaluator) -> Self:
+        """
+        Initializes the kernel's tables from an evaluator. Every rank key of five to seven cards is scored
+        up front (see HandEvaluator.fillTable), since the compiled loop cannot fill the table lazily.
+
+        :param evaluator: The HandEvaluator whose scores the kernel reproduces.
+        """
+        evaluator.fillTable()
+        keys = np.array(list(evaluator.rankTable), dtype = np.int64)
+        order = np.argsort(keys)
+        self.tableKeys = keys[order]
+        self.tableScores = np.array(list(evaluator.rankTable.values()), dtype = np.int64)[order]
+        self.flushTable = evaluator.flushArray
+        self.rankKeys = np.array(HandEvaluator.rankKeys, dtype = np.int64)
+        self.rankBits = np.array(HandEvaluator.rankBits, dtype = np.int64)
+
+    def tally(self, board: list[int], holes: list[list[int]], boardCount: int, block: list[tuple[float, list[int]]], totals: np.ndarray, kernel: callable = None) -> None:
+        """
+        Scores a block of runouts and adds their weights to the totals of the winners.
+
+        :param board: The card indices already on the board.
+        :param holes: The two card indices of each player's hole, or an empty list for a random hole.
+        :param boardCount: The number of board cards in each runout.
+        :param block: A list of (weight, runout) tuples.
+        :param totals: An array of the totals of each player followed by all-way chops, updated in place.
+        :param kernel: The kernel function to run (default is the compiled kernel; JitKernel.tallyBlock runs it uncompiled).
+        """
+        weights = np.array([weight for weight, _ in block])
+        runouts = np.array([runout for _, runout in block], dtype = np.int64).reshape(len(block), boardCount + 2*sum(1 for hole in holes if not hole))
+        self.run(board, holes, boardCount, runouts, weights, np.empty(0, dtype = np.int64), np.empty((0, 0)), totals, kernel)
+
+    def deal(self, board: list[int], holes: list[list[int]], boardCount: int, cards: list[int], trials: int, rng: RandomEngine, totals: np.ndarray, kernel: callable = None) -> None:
+        """
+        Deals uniform runouts inside the kernel and adds their weights to the totals of the winners. Only the uniforms
+        are drawn outside, one block of up to RunoutSampler.blockSize runouts per engine call.
+
+        :param board: The card indices already on the board.
+        :param holes: The two card indices of each player's hole, or an empty list for a random hole.
+        :param boardCount: The number of board cards still to be dealt.
+        :param cards: The card indices that can still be dealt.
+        :param trials: The number of runouts to deal.
+        :param rng: The RandomEngine the uniforms are drawn from.
+        :param totals: An array of the totals of each player followed by all-way chops, updated in place.
+        :param kernel: The kernel function to run (default is the compiled kernel; JitKernel.tallyBlock runs it uncompiled).
+        """
+        depth = boardCount + 2*sum(1 for hole in holes if not hole)
+        cards = np.array(cards, dtype = np.int64)
+        for start in range(0, trials, RunoutSampler.blockSize):
+            count = min(RunoutSampler.blockSize, trials - start)
+            runouts = np.empty((count, depth), dtype = np.int64)
+            self.run(board, holes, boardCount, runouts, np.full(count, 1/trials), cards, rng.uniforms(count, depth), totals, kernel)
+
+    def run(self, board: list[int], holes: list[list[int]], boardCount: int, runouts: np.ndarray, weights: np.ndarray, cards: np.ndarray, uniforms: np.ndarray, totals: np.ndarray, kernel: callable = None) -> None:
+        """
+        Folds the known board and holes into rank keys and suit masks and runs the kernel over a block.
+
+        :param board: The card indices already on the board.
+        :param holes: The two card indices of each player's hole, or an empty list for a random hole.
+        :param boardCount: The number of board cards in each runout.
+        :param runouts: An (n, m) integer array of runouts, overwritten when uniforms are given.
+        :param weights: An array of n runout weights.
+        :param cards: The card indices runouts are dealt from (empty when the runouts are given).
+        :param uniforms: An (n, m) array of uniforms the runouts are dealt with (empty when the runouts are given).
+        :param totals: An array of the totals of each player followed by all-way chops, updated in place.
+        :param kernel: The kernel function to run (default is the compiled kernel).
+        """
+        boardKey, boardMasks = HandEvaluator.partial(board)
+        partials = [(HandEvaluator.partial(hole) if hole else (0, [0, 0, 0, 0])) for hole in holes]
+        (kernel or JitKernel.compiled)(runouts, weights, cards, uniforms, boardCount, boardKey, np.array(boardMasks, dtype = np.int64),
+                                       np.array([key for key, _ in partials], dtype = np.int64), np.array([masks for _, masks in partials], dtype = np.int64).reshape(len(holes), 4),
+                                       np.array([bool(hole) for hole in holes]), self.rankKeys, self.rankBits, self.tableKeys, self.tableScores, self.flushTable, totals)
+
+    @staticmethod
+    def forEvaluator(evaluator: HandEvaluator) -> Self:
+        """
+        Returns the kernel of an evaluator, building its tables on first use.
+
+        :param evaluator: A HandEvaluator object.
+        :return: A JitKernel object.
+        """
+        if evaluator not in JitKernel.kernels:
+            JitKernel.kernels[evaluator] = JitKernel(evaluator)
+        return(JitKernel.kernels[evaluator])
+
+    @staticmethod
+    def tallyBlock(runouts: np.ndarray, weights: np.ndarray, cards: np.ndarray, uniforms: np.ndarray, boardCount: int, boardKey: int, boardMasks: np.ndarray, holeKeys: np.ndarray, holeMasks: np.ndarray, known: np.ndarray,
+                   rankKeys: np.ndarray, rankBits: np.ndarray, tableKeys: np.ndarray, tableScores: np.ndarray, flushTable: np.ndarray, totals: np.ndarray) -> None:
+        """
+        Scores a block of runouts and adds their weights to the totals of the winners (see EquitySolver.solveHandEquity).
+        When uniforms are given, each runout is first dealt from cards by a partial Fisher-Yates shuffle, the i-th card
+        swapped with a card picked by the i-th uniform among those not yet dealt, so every runout is equally likely.
+
+        :param runouts: An (n, m) integer array of runouts, the missing board cards followed by two cards per random hole.
+        :param weights: An array of n runout weights.
+        :param cards: The card indices runouts are dealt from (empty when the runouts are given).
+        :param uniforms: An (n, m) array of uniforms on [0,1) the runouts are dealt with (empty when the runouts are given).
+        :param boardCount: The number of board cards in each runout.
+        :param boardKey: The rank key of the known board.
+        :param boardMasks: The four suit masks of the known board.
+        :param holeKeys: The rank key of each player's hole (ignored for random holes).
+        :param holeMasks: A (p, 4) array of the suit masks of each player's hole (ignored for random holes).
+        :param known: A boolean array marking the players with a known hole.
+        :param rankKeys: The rank key of each card index (see HandEvaluator.rankKeys).
+        :param rankBits: The rank bit of each card index (see HandEvaluator.rankBits).
+        :param tableKeys: The sorted rank keys of the evaluator's rank table.
+        :param tableScores: The scores of tableKeys.
+        :param flushTable: The flush score of each suit mask.
+        :param totals: An array of p + 1 totals, one per player followed by all-way chops, updated in place.
+        """
+        players = len(holeKeys)
+        masks = np.empty(4, dtype = np.int64)
+        hole = np.empty(4, dtype = np.int64)
+        scores = np.empty(players, dtype = np.int64)
+        pool = cards.copy()
+        for trial in range(runouts.shape[0]):
+            if uniforms.shape[0] > 0:
+                for i in range(runouts.shape[1]):
+                    j = i + min(int(uniforms[trial, i]*(len(pool) - i)), len(pool) - i - 1)
+                    pool[i], pool[j] = pool[j], pool[i]
+                    runouts[trial, i] = pool[i]
+
+            key = boardKey
+            masks[:] = boardMasks
+            for i in range(boardCount):
+                card = runouts[trial, i]
+                key += rankKeys[card]
+                masks[card // 13] |= rankBits[card]
+
+            dealt = boardCount
+            best = -1
+            for player in range(players):
+                if known[player]:
+                    holeKey = holeKeys[player]
+                    hole[:] = holeMasks[player]
+                else:
+                    holeKey = 0
+                    hole[:] = 0
+                    for card in (runouts[trial, dealt], runouts[trial, dealt + 1]):
+                        holeKey += rankKeys[card]
+                        hole[card // 13] |= rankBits[card]
+                    dealt += 2
+                score = tableScores[np.searchsorted(tableKeys, key + holeKey)]
+                for suit in range(4):
+                    score = max(score, flushTable[masks[suit] | hole[suit]])
+                scores[player] = score
+                best = max(best, score)
+
+            winners = 0
+            for player in range(players):
+                if scores[player] == best:
+                    winners += 1
+            if winners == players:
+                totals[players] += weights[trial]
+            else:
+                for player in range(players):
+                    if scores[player] == best:
+                        totals[player] += weights[trial]
+
+# The kernel is compiled lazily by Numba on its first call and cached next to the module.
+JitKernel.compiled = (numba.njit(cache = True, nogil = True)(JitKernel.tallyBlock) if numba is not None else None)
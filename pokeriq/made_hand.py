@@ -24,9 +24,12 @@ class Hand:
         based on the combination of both the board and hole cards.
 
         :param board: A list of `Card` objects representing the community cards on the board.
-        :param hole: A list of `Card` objects representing the player's hole cards.
+        :param hole: A list of `Card` objects representing the player's hole cards (four cards for an Omaha hand).
         """
-        self.hand, self.strength = Hand.calculateHand(board, hole)
+        if len(hole) == 4:
+            self.hand, self.strength = Hand.calculateOmahaHand(board, hole)
+        else:
+            self.hand, self.strength = Hand.calculateHand(board, hole)
 
     def toString(self) -> str:
         """
@@ -59,7 +62,7 @@ class Hand:
         equal rank, it compares the hand strengths to break the tie.
 
         :param other: The other `Hand` object to compare against.
-        :returns: -1 if the current hand is weaker, 1 if stronger, or 0 if they are of equal strength.
+        :returns: -1 if the current hand is stronger, 1 if weaker, or 0 if they are of equal strength.
         """
         if self.hand < other.hand:
             return(-1)
@@ -70,7 +73,7 @@ class Hand:
                 if self.strength[i] > other.getStrength()[i]:
                     return(-1)
                 elif self.strength[i] < other.getStrength()[i]:
-                    return(2)
+                    return(1)
             return(0)
     
     @staticmethod
@@ -92,6 +95,23 @@ class Hand:
             if result != None:
                 return(i, result)
         
+    @staticmethod
+    def calculateOmahaHand(board: list[Card], hole: list[Card]) -> tuple[int, list[int]]:
+        """
+        Calculates the rank and strength of an Omaha hand, which must use exactly two hole cards and three board
+        cards. All 60 combinations are scored in one batch by the HandEvaluator.
+
+        :param board: A list of five `Card` objects representing the community cards on the board.
+        :param hole: A list of four `Card` objects representing the player's hole cards.
+        :returns: A tuple consisting of an integer representing the hand's rank and a list of integers
+                  representing the hand's strength.
+        """
+        # Imported here, since the evaluator depends on this module for the hand names.
+        from .hand_evaluator import HandEvaluator
+
+        score = HandEvaluator.standard().scoreOmaha([card.getIndex() for card in board], [card.getIndex() for card in hole])
+        return(HandEvaluator.category(score), [score >> 4*i & 15 for i in range(4, -1, -1)])
+
     @staticmethod
     def checkHighCard(total: list[Card]) -> list[int] | None:
         """
@@ -146,6 +166,7 @@ class Hand:
         for i in range(len(ranks)-1):
             if ranks[i] == ranks[i+1]:
                 pairOne = ranks[i]
+                break
 
         if pairOne == None:
             return(None)
@@ -155,6 +176,7 @@ class Hand:
         for i in range(len(ranks)-1):
             if ranks[i] == ranks[i+1]:
                 pairTwo = ranks[i]
+                break
 
         if pairTwo == None:
             return(None)
@@ -296,9 +318,12 @@ class Hand:
         :returns: A list of integers where the first value is the highest rank in the straight flush. Returns `None`
                   if no Straight Flush hand is found.
         """
-        flushCond = Hand.checkFlush(total)
-        if flushCond == None:
+        if Hand.checkFlush(total) == None:
             return(None)
+        bySuit = {'s': [], 'h': [], 'd': [], 'c': []}
+        for card in total:
+            bySuit[card.getSuit()].append(card.getRank())
+        flushCond = sorted(max(bySuit.values(), key = len), reverse = True)
         if 14 in flushCond:
             flushCond.append(1)
 
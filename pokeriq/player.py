@@ -8,18 +8,24 @@ from typing import Self
 # assigning hole cards, identifying the player's hand, and determining the winner among a list of players.
 
 class Player:
-    def __init__(self, name: str, chipStack: int | float = 200) -> Self:
+
+    holeSizes = {'holdem': 2, 'omaha': 4}
+
+    def __init__(self, name: str, chipStack: int | float = 200, game: str = 'holdem') -> Self:
         """
         Initializes a player with a name and an optional chip stack amount.
 
         :param name: The name of the player (string).
         :param chipStack: The initial chip stack (positive number, default is 200).
+        :param game: The game played, 'holdem' (two hole cards) or 'omaha' (four hole cards, default is 'holdem').
         """
         assert isinstance(name, str), "INPUT NAME IS NOT A STRING."
         assert (isinstance(chipStack, int) or isinstance(chipStack, float)) and chipStack > 0, "INPUT CHIPSTACK IS NOT A POSITIVE NUMBER."
+        assert game in Player.holeSizes, "GAME MUST BE ONE OF "+str(tuple(Player.holeSizes))+"."
         
         self.name = name
         self.stack = chipStack
+        self.game = game
         self.hole = []
         self.currentBet = 0
         
@@ -72,13 +78,13 @@ class Player:
     
     def assignHole(self, dealtCard: Card) -> None:
         """
-        Assigns a card to the player's hole cards, ensuring the player only has two cards and the cards are not duplicates.
+        Assigns a card to the player's hole cards, ensuring the player only has two cards (four in Omaha) and the cards are not duplicates.
 
         :param dealtCard: The card to assign to the hole (Card object).
         """
-        assert len(self.hole) < 2, "HOLE CARDS MAXIMUM ALREADY REACHED (2)."
+        assert len(self.hole) < Player.holeSizes[self.game], "HOLE CARDS MAXIMUM ALREADY REACHED ("+str(Player.holeSizes[self.game])+")."
         assert isinstance(dealtCard, Card), "INPUT CARD IS OF INVALID TYPE."
-        assert len(self.hole) == 0 or not dealtCard.equals(self.hole[0]), "BOTH HOLE CARDS WOULD BE THE SAME."
+        assert not Card.contains(self.hole, dealtCard), "BOTH HOLE CARDS WOULD BE THE SAME."
 
         self.hole.append(dealtCard)
     
@@ -117,6 +123,14 @@ class Player:
         """
         return(self.name)
     
+    def getGame(self) -> str:
+        """
+        Retrieves the game the player is dealt into.
+
+        :returns: 'holdem' or 'omaha'.
+        """
+        return(self.game)
+
     def getStack(self) -> int:
         """
         Retrieves the player's current chip stack.
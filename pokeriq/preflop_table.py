@@ -0,0 +1,198 @@
+from .card import Card
+from .hand_evaluator import HandEvaluator
+from .random_engine import RandomEngine
+from itertools import combinations
+from math import ceil
+from typing import Self
+import numpy as np
+import os
+
+# preflop_table.py
+# This file contains a class holding the preflop equity of all 169 starting hand classes against 1-9 random opponents.
+# The table is built once by vectorized Monte Carlo to a stated precision, shipped with the package as a compact
+# NumPy archive, and loaded lazily on the first lookup, so preflop versus random hands queries need no simulation.
+# A second table holds the heads-up equity of every class against every other class, with the number of
+# card-disjoint combo pairs behind each matchup, for solvers that work with class-level strategies.
+
+class PreflopTable:
+
+    # Classes in the order of the usual 13x13 grid: pairs on the diagonal, suited above it and offsuit below it.
+    classes = tuple(a+b if i == j else (a+b+"s" if i < j else b+a+"o") for i, a in enumerate("AKQJT98765432") for j, b in enumerate("AKQJT98765432"))
+    maxOpponents = 9
+    defaultPath = os.path.join(os.path.dirname(__file__), "data", "preflop_equity.npz")
+    defaultTable = None
+    matchupPath = os.path.join(os.path.dirname(__file__), "data", "preflop_matchups.npz")
+    matchupTable = None
+
+    def __init__(self, equities: np.ndarray, precision: float, trials: int) -> Self:
+        """
+        Initializes a table from its equities.
+
+        :param equities: A (169, 9) array of equities, one row per class of PreflopTable.classes and one column per opponent count.
+        :param precision: The largest standard error of the table's equities.
+        :param trials: The number of trials behind each class.
+        """
+        equities = np.asarray(equities, dtype = np.float32)
+        assert equities.shape == (len(PreflopTable.classes), PreflopTable.maxOpponents), "EQUITIES IS NOT A (169, 9) ARRAY."
+
+        self.equities = equities
+        self.precision = float(precision)
+        self.trials = int(trials)
+
+    def lookup(self, hole: list[Card] | str, opponents: int = 1) -> float:
+        """
+        Returns the preflop equity (share of the pot, ties split) of a hole against random opponents.
+
+        :param hole: A list of two Card objects, or a hand class (e.g., 'AKs', 'QQ', 'T9o').
+        :param opponents: The number of random opponents (1-9, default is 1).
+        :return: A float on [0,1].
+        """
+        assert isinstance(opponents, int) and opponents >= 1 and opponents <= PreflopTable.maxOpponents, "OPPONENTS IS NOT AN INTEGER ON [1,9]."
+
+        handClass = (hole if isinstance(hole, str) else PreflopTable.handClass(hole))
+        assert handClass in PreflopTable.classes, "INVALID HAND CLASS."
+        return(float(self.equities[PreflopTable.classes.index(handClass), opponents - 1]))
+
+    def save(self, path: str) -> None:
+        """
+        Saves the table as a compressed NumPy archive.
+
+        :param path: The destination path.
+        """
+        np.savez_compressed(path, equities = self.equities, precision = self.precision, trials = self.trials)
+
+    @staticmethod
+    def load(path: str = None) -> Self:
+        """
+        Loads a table saved with save.
+
+        :param path: The path of the archive (default is the table shipped with the package).
+        :return: A PreflopTable object.
+        """
+        with np.load(path or PreflopTable.defaultPath) as archive:
+            return(PreflopTable(archive["equities"], archive["precision"], archive["trials"]))
+
+    @staticmethod
+    def default() -> Self:
+        """
+        Returns the table shipped with the package, loading it on first use.
+
+        :return: A PreflopTable object.
+        """
+        if PreflopTable.defaultTable is None:
+            PreflopTable.defaultTable = PreflopTable.load()
+        return(PreflopTable.defaultTable)
+
+    @staticmethod
+    def handClass(hole: list[Card]) -> str:
+        """
+        Converts a hole to its starting hand class.
+
+        :param hole: A list of two Card objects.
+        :return: The hand class (e.g., 'AKs', 'QQ', 'T9o').
+        """
+        assert isinstance(hole, list) and len(hole) == 2 and all(isinstance(card, Card) for card in hole), "HOLE IS NOT A LIST OF TWO CARDS."
+
+        high, low = sorted(hole, key = lambda card: card.getRank(), reverse = True)
+        if high.getRank() == low.getRank():
+            return(Card.ranks[high.getRank()]*2)
+        return(Card.ranks[high.getRank()]+Card.ranks[low.getRank()]+("s" if high.getSuit() == low.getSuit() else "o"))
+
+    @staticmethod
+    def representative(handClass: str) -> list[int]:
+        """
+        Returns the card indices of one hole of a hand class; all holes of a class have the same equity against random hands.
+
+        :param handClass: A hand class (e.g., 'AKs').
+        :return: A list of two card indices.
+        """
+        suits = list(Card.suits)
+        second = (suits[0] if handClass.endswith("s") else suits[1])
+        return([Card.generate(handClass[0]+suits[0]).getIndex(), Card.generate(handClass[1]+second).getIndex()])
+
+    @staticmethod
+    def build(precision: float = 0.002, blockSize: int = 4096, rng: RandomEngine | np.random.Generator = None, seed: int = None) -> Self:
+        """
+        Builds the table by Monte Carlo. Each trial deals a board and nine opponent holes, scored in batches; the
+        equity against k opponents uses the first k of them, so all opponent counts share the same deals.
+
+        :param precision: The target standard error of every equity (default is 0.002, about 62,500 trials per class).
+        :param blockSize: The number of trials scored per batch (default is 4096).
+        :param rng: An optional RandomEngine or NumPy Generator to deal from.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        :return: A PreflopTable object.
+        """
+        assert precision > 0, "PRECISION IS NOT POSITIVE."
+
+        engine = RandomEngine.resolve(rng, seed)
+        evaluator = HandEvaluator.standard()
+        # An equity is a mean of values on [0,1], whose standard deviation is at most 1/2.
+        trials = ceil(0.25/precision**2)
+        depth = 5 + 2*PreflopTable.maxOpponents
+        equities = np.zeros((len(PreflopTable.classes), PreflopTable.maxOpponents))
+        for c, handClass in enumerate(PreflopTable.classes):
+            hole = PreflopTable.representative(handClass)
+            live = np.array([card for card in range(52) if card not in hole])
+            for start in range(0, trials, blockSize):
+                block = min(blockSize, trials - start)
+                dealt = live[engine.sampleIndices(len(live), depth, block)]
+                board = dealt[:, :5]
+                hero = evaluator.scoreBatch(np.concatenate([board, np.tile(hole, (block, 1))], axis = 1))
+                holes = dealt[:, 5:].reshape(block*PreflopTable.maxOpponents, 2)
+                villains = evaluator.scoreBatch(np.concatenate([np.repeat(board, PreflopTable.maxOpponents, axis = 0), holes], axis = 1))
+                villains = villains.reshape(block, PreflopTable.maxOpponents)
+                best = np.maximum.accumulate(villains, axis = 1)
+                ties = np.cumsum(villains == hero[:, None], axis = 1)
+                shares = np.where(hero[:, None] > best, 1.0, np.where(hero[:, None] == best, 1/(1 + ties), 0.0))
+                equities[c] += shares.sum(axis = 0)
+        return(PreflopTable(equities/trials, precision, trials))
+
+    @staticmethod
+    def matchups(path: str = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the heads-up class-versus-class equity table, loading the table shipped with the package on first use.
+
+        :param path: The path of an archive written from buildMatchups (default is the table shipped with the package).
+        :return: A tuple of a (169, 169) array of the equity of each class (row) against each class (column), and a
+                 (169, 169) array of the number of card-disjoint combo pairs of each matchup.
+        """
+        if path:
+            with np.load(path) as archive:
+                return(archive["equities"].astype(np.float64), archive["weights"].astype(np.float64))
+        if PreflopTable.matchupTable is None:
+            PreflopTable.matchupTable = PreflopTable.matchups(PreflopTable.matchupPath)
+        return(PreflopTable.matchupTable)
+
+    @staticmethod
+    def buildMatchups(boards: int = 10000, rng: RandomEngine | np.random.Generator = None, seed: int = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Builds the class-versus-class equity table by Monte Carlo over boards. On each board all 1,326 holes are
+        scored at once, every card-disjoint pair of holes is compared, and the results are summed into classes
+        with two matrix products. Save the result with np.savez_compressed(path, equities = ..., weights = ...).
+
+        :param boards: The number of sampled boards (default is 10000).
+        :param rng: An optional RandomEngine or NumPy Generator to deal from.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        :return: A tuple of the equities and the combo pair counts (see matchups).
+        """
+        assert isinstance(boards, int) and boards > 0, "BOARDS INPUT IS NOT A POSITIVE INTEGER."
+
+        engine = RandomEngine.resolve(rng, seed)
+        evaluator = HandEvaluator.standard()
+        holes = np.array(list(combinations(range(52), 2)), dtype = np.int64)
+        members = np.zeros((len(holes), len(PreflopTable.classes)), dtype = np.float32)
+        for i, hole in enumerate(holes.tolist()):
+            members[i, PreflopTable.classes.index(PreflopTable.handClass([Card.fromIndex(card) for card in hole]))] = 1
+        first, second = holes[:, :1], holes[:, 1:]
+        disjoint = ~((first == first.T) | (first == second.T) | (second == first.T) | (second == second.T))
+
+        wins = np.zeros((len(PreflopTable.classes), len(PreflopTable.classes)))
+        counts = np.zeros((len(PreflopTable.classes), len(PreflopTable.classes)))
+        for board in engine.sampleIndices(52, 5, boards):
+            live = ~np.isin(holes, board).any(axis = 1)
+            scores = evaluator.scoreBatch(np.concatenate([np.tile(board, (len(holes), 1)), holes], axis = 1))
+            valid = (disjoint & live[:, None] & live[None, :]).astype(np.float32)
+            results = ((scores[:, None] > scores[None, :]) + 0.5*(scores[:, None] == scores[None, :])).astype(np.float32)*valid
+            wins += members.T @ (results @ members)
+            counts += members.T @ (valid @ members)
+        return(wins/np.maximum(counts, 1), members.T @ (disjoint.astype(np.float32) @ members))
@@ -0,0 +1,197 @@
+from .preflop_table import PreflopTable
+from typing import Self
+import numpy as np
+import warnings
+
+# push_fold.py
+# This file contains a class solving push/fold equilibria over the 169 starting hand classes by fictitious play.
+# Every decision is a vector of 169 push or call frequencies, and best responses are computed for all classes at
+# once from the class-versus-class equity table (see PreflopTable.matchups), with card removal between the two
+# players of each matchup, so a full chart takes matrix-vector products instead of range equity simulations.
+
+class PushFoldSolver:
+
+    positionNames = ('UTG', 'UTG+1', 'UTG+2', 'LJ', 'HJ', 'CO', 'BTN', 'SB', 'BB')
+
+    def __init__(self, players: int = 2, stack: float = 10.0, smallBlind: float = 0.5, bigBlind: float = 1.0, ante: float = 0.0, matchups: tuple[np.ndarray, np.ndarray] = None) -> Self:
+        """
+        Initializes a push/fold game. Players act in order from the first position to the big blind; each may push
+        all-in or fold until someone pushes, after which each later player may call or fold. Only the first caller
+        plays against the pusher (no overcalls), so every all-in is heads-up.
+
+        :param players: The number of players (2-9, default is 2).
+        :param stack: The starting stack of every player, antes and blinds included (default is 10).
+        :param smallBlind: The small blind (default is 0.5).
+        :param bigBlind: The big blind (default is 1).
+        :param ante: The ante posted by every player (default is 0).
+        :param matchups: An optional (equities, weights) tuple (default is PreflopTable.matchups()).
+        """
+        assert isinstance(players, int) and players >= 2 and players <= len(PushFoldSolver.positionNames), "PLAYERS IS NOT AN INTEGER ON [2,9]."
+        assert stack > ante + bigBlind, "STACK MUST EXCEED THE ANTE AND BIG BLIND."
+        assert smallBlind >= 0 and bigBlind >= smallBlind and ante >= 0, "INVALID BLINDS OR ANTE."
+
+        self.players = players
+        self.stack = float(stack)
+        self.smallBlind = float(smallBlind)
+        self.bigBlind = float(bigBlind)
+        self.ante = float(ante)
+        self.equities, self.weights = (matchups or PreflopTable.matchups())
+        self.winWeights = self.weights*self.equities
+        self.combos = self.weights.sum(axis = 1)
+        self.positions = PushFoldSolver.positionNames[-players:]
+        self.blinds = [0.0]*(players - 2) + [self.smallBlind, self.bigBlind]
+        self.push = {k: np.full(len(PreflopTable.classes), 0.5) for k in range(players - 1)}
+        self.call = {(k, m): np.full(len(PreflopTable.classes), 0.5) for k in range(players - 1) for m in range(k + 1, players)}
+        self.gap = None
+        self.converged = False
+
+    def solve(self, iterations: int = 5000, tolerance: float = 1e-3) -> dict[str, dict]:
+        """
+        Runs fictitious play: every iteration computes the best response of each decision to the average strategies
+        and moves the averages toward it by 1/(t+2). Stops early once no decision gains more than tolerance (in
+        chips per hand) by deviating to its best response. If the gap is still above tolerance after the last
+        iteration, converged is False and a RuntimeWarning is issued; the strategies are returned either way.
+
+        :param iterations: The largest number of iterations (default is 5000).
+        :param tolerance: The largest gain of a best response to accept as converged (default is 0.001).
+        :return: A dictionary with the "push" frequencies of each position and the "call" frequencies of each
+                 (pusher, caller) pair of positions, each a dictionary of classes to frequencies.
+        """
+        assert isinstance(iterations, int) and iterations > 0, "ITERATIONS IS NOT A POSITIVE INTEGER."
+
+        for t in range(iterations):
+            pushes, calls, gap = self.bestResponses()
+            self.gap = gap
+            if gap <= tolerance:
+                break
+            step = 1/(t + 2)
+            for k in self.push:
+                self.push[k] += step*(pushes[k] - self.push[k])
+            for pair in self.call:
+                self.call[pair] += step*(calls[pair] - self.call[pair])
+        self.converged = (self.gap <= tolerance)
+        if not self.converged:
+            warnings.warn("PUSH/FOLD SOLVE DID NOT CONVERGE: GAP "+str(round(self.gap, 6))+" EXCEEDS TOLERANCE "+str(tolerance)+" AFTER "+str(iterations)+" ITERATIONS.", RuntimeWarning, stacklevel = 2)
+        return(self.charts())
+
+    def bestResponses(self) -> tuple[dict, dict, float]:
+        """
+        Computes the best response of every decision to the current average strategies.
+
+        :return: A tuple of the best push strategies by position, the best call strategies by (pusher, caller) and the
+                 largest gain, over all decisions, of switching from the average strategy to its best response.
+        """
+        prior = self.combos/self.combos.sum()
+        pushes = {}
+        calls = {}
+        gap = 0.0
+        for (k, m), strategy in self.call.items():
+            reach = self.weights @ self.push[k]
+            called = np.divide(self.winWeights @ self.push[k], reach, out = np.zeros_like(reach), where = reach > 0)*self.pot(k, m) - self.stack
+            fold = -(self.ante + self.blinds[m])
+            calls[(k, m)] = (called > fold).astype(float)
+            # Each class of the caller is reached in proportion to the pusher's combos that push against it.
+            share = prior*reach/max(prior @ reach, 1e-300)
+            gap = max(gap, share @ (np.maximum(called, fold) - (strategy*called + (1 - strategy)*fold)))
+        for k, strategy in self.push.items():
+            pushed = self.pushValue(k)
+            fold = -(self.ante + self.blinds[k])
+            pushes[k] = (pushed > fold).astype(float)
+            gap = max(gap, prior @ (np.maximum(pushed, fold) - (strategy*pushed + (1 - strategy)*fold)))
+        return(pushes, calls, gap)
+
+    def pushValue(self, k: int) -> np.ndarray:
+        """
+        Computes the expected result of pushing each class from a position against the average call strategies.
+
+        :param k: The index of the pushing position.
+        :return: An array of 169 expected results, relative to the stack before posting.
+        """
+        value = np.zeros(len(PreflopTable.classes))
+        folded = np.ones(len(PreflopTable.classes))
+        for m in range(k + 1, self.players):
+            calls = (self.weights @ self.call[(k, m)])/self.combos
+            wins = (self.winWeights @ self.call[(k, m)])/self.combos
+            value += folded*(wins*self.pot(k, m) - calls*self.stack)
+            folded *= 1 - calls
+        steal = self.players*self.ante + self.smallBlind + self.bigBlind
+        return(value + folded*(steal - self.ante - self.blinds[k]))
+
+    def pot(self, k: int, m: int) -> float:
+        """
+        Returns the pot of an all-in between two positions: both stacks, every ante and the blinds of the others.
+
+        :param k: The index of the pushing position.
+        :param m: The index of the calling position.
+        :return: The pot size.
+        """
+        dead = sum(blind for position, blind in enumerate(self.blinds) if position not in {k, m})
+        return(2*(self.stack - self.ante) + self.players*self.ante + dead)
+
+    def charts(self, threshold: float = 0.0) -> dict[str, dict]:
+        """
+        Returns the current strategies by position and hand class.
+
+        :param threshold: Classes played with a frequency at or below threshold are left out (default is 0).
+        :return: A dictionary with the "push" frequencies of each position and the "call" frequencies of each
+                 (pusher, caller) pair of positions, each a dictionary of classes to frequencies.
+        """
+        def frequencies(strategy: np.ndarray) -> dict[str, float]:
+            return({handClass: round(float(frequency), 4) for handClass, frequency in zip(PreflopTable.classes, strategy) if frequency > threshold})
+
+        return({"push": {self.positions[k]: frequencies(strategy) for k, strategy in self.push.items()},
+                "call": {(self.positions[k], self.positions[m]): frequencies(strategy) for (k, m), strategy in self.call.items()}})
+
+    def pushRange(self, position: str) -> list[str]:
+        """
+        Returns the classes a position pushes more often than not.
+
+        :param position: A position name (e.g., 'SB').
+        :return: A list of hand classes.
+        """
+        assert position in self.positions[:-1], "POSITION MUST BE ONE OF "+str(self.positions[:-1])+"."
+
+        strategy = self.push[self.positions.index(position)]
+        return([handClass for handClass, frequency in zip(PreflopTable.classes, strategy) if frequency > 0.5])
+
+    def callRange(self, pusher: str, caller: str) -> list[str]:
+        """
+        Returns the classes a position calls with more often than not against a push from an earlier position.
+
+        :param pusher: The position of the pusher (e.g., 'SB').
+        :param caller: The position of the caller (e.g., 'BB').
+        :return: A list of hand classes.
+        """
+        assert pusher in self.positions and caller in self.positions and self.positions.index(pusher) < self.positions.index(caller), "CALLER MUST ACT AFTER PUSHER."
+
+        strategy = self.call[(self.positions.index(pusher), self.positions.index(caller))]
+        return([handClass for handClass, frequency in zip(PreflopTable.classes, strategy) if frequency > 0.5])
+
+    @staticmethod
+    def chart(stacks: list[float], players: int = 2, smallBlind: float = 0.5, bigBlind: float = 1.0, ante: float = 0.0, iterations: int = 5000, tolerance: float = 1e-3) -> dict[str, dict[str, float]]:
+        """
+        Solves a push/fold chart over several stack sizes: for each position and class, the largest stack at which
+        the class is pushed (or called, against each earlier position) more often than not.
+
+        :param stacks: The stack sizes to solve.
+        :param players: The number of players (default is 2).
+        :param smallBlind: The small blind (default is 0.5).
+        :param bigBlind: The big blind (default is 1).
+        :param ante: The ante posted by every player (default is 0).
+        :param iterations: The largest number of iterations per stack (default is 5000).
+        :param tolerance: The convergence tolerance per stack (default is 0.001); a stack that does not converge warns (see solve).
+        :return: A dictionary of decisions (a position for pushes, "pusher/caller" for calls) to dictionaries of
+                 classes and the largest stack at which they are played; classes never played are left out.
+        """
+        matchups = PreflopTable.matchups()
+        chart = {}
+        for stack in sorted(stacks):
+            solver = PushFoldSolver(players, stack, smallBlind, bigBlind, ante, matchups)
+            solver.solve(iterations, tolerance)
+            for k in solver.push:
+                for handClass in solver.pushRange(solver.positions[k]):
+                    chart.setdefault(solver.positions[k], {})[handClass] = stack
+            for k, m in solver.call:
+                for handClass in solver.callRange(solver.positions[k], solver.positions[m]):
+                    chart.setdefault(solver.positions[k]+"/"+solver.positions[m], {})[handClass] = stack
+        return(chart)
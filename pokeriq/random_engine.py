@@ -0,0 +1,135 @@
+from typing import Self, Any
+import numpy as np
+
+# random_engine.py
+# This file contains a class wrapping a NumPy random Generator as the single source of randomness in the library.
+# It provides seeding, bulk draws of card indices, shuffling, independent spawned streams and state capture.
+
+class RandomEngine:
+    def __init__(self, seed: int | np.random.Generator | np.random.SeedSequence | None = None) -> Self:
+        """
+        Initializes the engine from a seed, a SeedSequence or an existing NumPy Generator. Without a seed
+        the engine draws fresh entropy from the operating system.
+
+        :param seed: An optional integer seed, NumPy SeedSequence, or NumPy Generator to draw from.
+        """
+        assert seed is None or isinstance(seed, (int, np.integer, np.random.Generator, np.random.SeedSequence)), "INPUT SEED IS OF INVALID TYPE."
+
+        if isinstance(seed, np.random.Generator):
+            self.generator = seed
+        else:
+            self.generator = np.random.default_rng(seed)
+
+    def getGenerator(self) -> np.random.Generator:
+        """
+        Returns the underlying NumPy Generator.
+
+        :return: The NumPy Generator used by the engine.
+        """
+        return(self.generator)
+
+    def random(self) -> float:
+        """
+        Draws a single float uniformly from [0,1).
+
+        :return: A float on [0,1).
+        """
+        return(float(self.generator.random()))
+
+    def uniforms(self, count: int, depth: int) -> np.ndarray:
+        """
+        Draws a block of uniform vectors in one call.
+
+        :param count: The number of vectors to draw.
+        :param depth: The length of each vector.
+        :return: A (count, depth) array of floats on [0,1).
+        """
+        return(self.generator.random((count, depth)))
+
+    def sampleIndices(self, population: int, k: int, count: int) -> np.ndarray:
+        """
+        Draws a block of samples without replacement in one call. Each row holds k distinct indices
+        from range(population) in uniformly random order, e.g. the card indices of one runout.
+
+        :param population: The number of items to sample from.
+        :param k: The number of distinct indices per row.
+        :param count: The number of rows to draw.
+        :return: A (count, k) integer array.
+        """
+        assert isinstance(k, int) and k >= 0 and k <= population, "SAMPLE SIZE IS NOT AN INTEGER ON [0,POPULATION]."
+
+        keys = self.generator.random((count, population))
+        if k == 0:
+            return(np.empty((count, 0), dtype = np.intp))
+        if k < population:
+            smallest = np.argpartition(keys, k - 1, axis = 1)[:, :k]
+        else:
+            smallest = np.tile(np.arange(population), (count, 1))
+        order = np.argsort(np.take_along_axis(keys, smallest, axis = 1), axis = 1)
+        return(np.take_along_axis(smallest, order, axis = 1))
+
+    def sample(self, items: list[Any], k: int) -> list[Any]:
+        """
+        Draws k distinct items from a list in random order.
+
+        :param items: A list of items to sample from.
+        :param k: The number of items to draw.
+        :return: A list of k items.
+        """
+        return([items[i] for i in self.sampleIndices(len(items), k, 1)[0]])
+
+    def shuffle(self, items: list[Any]) -> None:
+        """
+        Shuffles a list in place.
+
+        :param items: The list to shuffle.
+        """
+        items[:] = [items[i] for i in self.generator.permutation(len(items))]
+
+    def spawn(self, count: int) -> list[Self]:
+        """
+        Creates independent child engines, e.g. one per worker of a parallel job. Children spawned from
+        engines with the same seed produce the same streams.
+
+        :param count: The number of child engines to create.
+        :return: A list of RandomEngine objects.
+        """
+        assert isinstance(count, int) and count > 0, "COUNT INPUT IS NOT A POSITIVE INTEGER."
+
+        return([RandomEngine(child) for child in self.generator.spawn(count)])
+
+    def getState(self) -> dict:
+        """
+        Returns the state of the underlying bit generator, which can be stored and restored later.
+
+        :return: A dictionary describing the generator state.
+        """
+        return(self.generator.bit_generator.state)
+
+    def setState(self, state: dict) -> None:
+        """
+        Restores a state previously returned by getState.
+
+        :param state: A dictionary describing the generator state.
+        """
+        assert isinstance(state, dict), "INPUT STATE IS NOT A DICTIONARY."
+
+        self.generator.bit_generator.state = state
+
+    @staticmethod
+    def resolve(rng: Self | np.random.Generator | None = None, seed: int | None = None) -> Self:
+        """
+        Resolves the rng/seed pair accepted by library functions into an engine. An explicit rng takes
+        precedence over a seed; with neither, a fresh unseeded engine is returned.
+
+        :param rng: An optional RandomEngine or NumPy Generator.
+        :param seed: An optional integer seed.
+        :return: A RandomEngine object.
+        """
+        assert rng is None or isinstance(rng, (RandomEngine, np.random.Generator)), "INPUT RNG IS OF INVALID TYPE."
+
+        if isinstance(rng, RandomEngine):
+            return(rng)
+        if rng is not None:
+            return(RandomEngine(rng))
+        return(RandomEngine(seed))
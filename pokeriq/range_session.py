@@ -0,0 +1,138 @@
+from .card import Card
+from .hand_evaluator import HandEvaluator
+from .random_engine import RandomEngine
+from .range_stream import RangeStream
+from itertools import combinations, product
+from math import comb
+from typing import Self, Iterable
+import numpy as np
+
+# range_session.py
+# This file contains a class keeping a range-versus-range equity up to date while ranges are edited one hand
+# class at a time. Each tuple of classes (one per range) contributes its wins, chops and weight to the result,
+# and the contributions are cached, so an edit only computes or drops the tuples of the edited class.
+
+class RangeSession:
+    def __init__(self, *args: Iterable[str], board: list[Card] = None, runouts: int = 5000, rng: RandomEngine | np.random.Generator = None, seed: int = None) -> Self:
+        """
+        Initializes a session over ranges of hand classes on a board. All combinations share one set of board
+        completions: every completion when there are at most runouts of them, and runouts sampled ones otherwise.
+
+        :param args: Two or more ranges, each an iterable of hand classes (e.g., ["AKs", "QQ"]); a range may start empty.
+        :param board: A list of 0-5 Card objects representing the community board (default is an empty board).
+        :param runouts: The largest number of board completions enumerated, and the number sampled beyond it (default is 5000).
+        :param rng: An optional RandomEngine or NumPy Generator to sample completions from.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        """
+        board = board or []
+        assert len(args) > 1, "AT LEAST TWO RANGES ARE REQUIRED."
+        assert isinstance(board, list) and all(isinstance(card, Card) for card in board) and len(board) <= 5, "BOARD IS NOT A LIST OF 0-5 CARDS."
+        assert isinstance(runouts, int) and runouts > 0, "RUNOUTS INPUT IS NOT A POSITIVE INTEGER."
+
+        self.board = [card.getIndex() for card in board]
+        self.evaluator = HandEvaluator.standard()
+        deck = [card for card in range(52) if card not in self.board]
+        missing = 5 - len(self.board)
+        if comb(len(deck), missing) <= runouts:
+            self.runouts = np.array(list(combinations(deck, missing)), dtype = np.int64).reshape(comb(len(deck), missing), missing)
+        else:
+            self.runouts = np.array(deck)[RandomEngine.resolve(rng, seed).sampleIndices(len(deck), missing, runouts)]
+        boardKey, boardMasks = HandEvaluator.partial(self.board)
+        keys, masks = (HandEvaluator.partialBatch(self.runouts) if missing else (np.zeros(1, dtype = np.int64), np.zeros((1, 4), dtype = np.int64)))
+        self.keys = keys + boardKey
+        self.masks = masks | np.array(boardMasks, dtype = np.int64)
+
+        self.ranges = [[] for _ in args]
+        self.scores = {}
+        self.contributions = {}
+        self.totals = np.zeros(len(args) + 2)
+        for index, classes in enumerate(args):
+            for handClass in classes:
+                self.add(index, handClass)
+
+    def add(self, index: int, handClass: str) -> dict[str: float]:
+        """
+        Adds a hand class to a range, computing only the class tuples that contain it.
+
+        :param index: The index of the range (0 for the first range).
+        :param handClass: A hand class (e.g., 'AKs').
+        :return: The updated equities (see equities).
+        """
+        assert index >= 0 and index < len(self.ranges), "RANGE INDEX IS OUT OF BOUNDS."
+        assert handClass not in self.ranges[index], "HAND CLASS IS ALREADY IN THE RANGE."
+
+        RangeStream.classCombos(handClass)
+        self.ranges[index].append(handClass)
+        others = [([handClass] if i == index else range) for i, range in enumerate(self.ranges)]
+        for classes in product(*others):
+            contribution = self.contribution(classes)
+            self.contributions[classes] = contribution
+            self.totals += contribution
+        return(self.equities())
+
+    def remove(self, index: int, handClass: str) -> dict[str: float]:
+        """
+        Removes a hand class from a range, dropping the cached contributions of the class tuples that contain it.
+
+        :param index: The index of the range (0 for the first range).
+        :param handClass: A hand class in the range.
+        :return: The updated equities (see equities).
+        """
+        assert index >= 0 and index < len(self.ranges), "RANGE INDEX IS OUT OF BOUNDS."
+        assert handClass in self.ranges[index], "HAND CLASS IS NOT IN THE RANGE."
+
+        self.ranges[index].remove(handClass)
+        for classes in [classes for classes in self.contributions if classes[index] == handClass]:
+            self.totals -= self.contributions.pop(classes)
+        # Totals are re-summed when a range empties, so rounding errors do not accumulate over long sessions
+        # (every cached tuple holds a class of each range, so this drops them all and the totals return to zero).
+        if not self.ranges[index]:
+            self.totals = sum(self.contributions.values(), np.zeros(len(self.ranges) + 2))
+        return(self.equities())
+
+    def equities(self) -> dict[str: float]:
+        """
+        Returns the current range equities: the average over every combination of one hand from each range that
+        shares no cards (with each other or the board), with the same win and chop rules as calculateRangeEquity.
+
+        :return: A dictionary of range names ("Range 1", ...) and their equity percentages, plus "CHOP";
+                 all zero while a range is empty or every combination conflicts.
+        """
+        names = ["Range "+str(i+1) for i in range(len(self.ranges))] + ["CHOP"]
+        weight = self.totals[-1]
+        return({name: (float(total/weight) if weight > 0.5 else 0.0) for name, total in zip(names, self.totals[:-1])})
+
+    def contribution(self, classes: tuple[str, ...]) -> np.ndarray:
+        """
+        Computes the contribution of a tuple of classes: the summed wins of each range and chops over the tuple's
+        card-disjoint combinations, each the average over the shared completions that hold none of its cards.
+
+        :param classes: One hand class per range.
+        :return: An array of the wins of each range, the chops and the number of combinations (the weight).
+        """
+        combos = [[combo for combo in RangeStream.classCombos(handClass) if not set(combo) & set(self.board)] for handClass in classes]
+        contribution = np.zeros(len(classes) + 2)
+        for holes in product(*combos):
+            cards = [card for hole in holes for card in hole]
+            if len(set(cards)) < len(cards):
+                continue
+            valid = ~np.isin(self.runouts, cards).any(axis = 1)
+            scores = np.stack([self.score(hole)[valid] for hole in holes])
+            winners = (scores == scores.max(axis = 0))
+            chops = winners.all(axis = 0)
+            contribution[:-2] += (winners & ~chops).mean(axis = 1)
+            contribution[-2] += chops.mean()
+            contribution[-1] += 1
+        return(contribution)
+
+    def score(self, hole: tuple[int, int]) -> np.ndarray:
+        """
+        Scores a hole on every shared completion, caching the scores for the rest of the session.
+
+        :param hole: A pair of card indices.
+        :return: An integer array of scores, one per completion.
+        """
+        if hole not in self.scores:
+            holeKey, holeMasks = HandEvaluator.partial(hole)
+            self.scores[hole] = self.evaluator.scoreArrays(self.keys + holeKey, self.masks | np.array(holeMasks, dtype = np.int64))
+        return(self.scores[hole])
@@ -0,0 +1,112 @@
+from .card import Card
+from itertools import combinations, permutations
+from math import prod
+from typing import Iterable, Iterator
+import numpy as np
+import builtins
+
+# range_stream.py
+# This file contains a class expanding hand ranges and iterating the combinations of several ranges lazily.
+# Hands are integer card index pairs (see Card.getIndex) yielded in fixed-size chunks, and combinations of
+# ranges are decoded from their position in the product, so memory stays flat however wide the product is.
+
+class RangeStream:
+
+    chunkSize = 65536
+    rankIndices = {symbol: rank - 2 for rank, symbol in Card.ranks.items()}
+    # Suit offsets of the combos of a pair, a suited and an offsuit hand, in the order of EquitySolver.generateRange.
+    suitPatterns = {'pair': tuple(combinations(builtins.range(4), 2)),
+                    's': tuple((suit, suit) for suit in builtins.range(4)),
+                    'o': tuple(permutations(builtins.range(4), 2))}
+
+    @staticmethod
+    def expand(range: Iterable[str], chunkSize: int = None) -> Iterator[np.ndarray]:
+        """
+        Lazily expands a hand range into its combos, in the order of EquitySolver.generateRange.
+
+        :param range: An iterable of strings representing the hand range (e.g., ["AKs", "AKo"]).
+        :param chunkSize: The largest number of combos per chunk (default is RangeStream.chunkSize).
+        :return: An iterator of (k, 2) integer arrays of card indices, one combo per row.
+        """
+        chunkSize = chunkSize or RangeStream.chunkSize
+        chunk = []
+        for hand in range:
+            chunk += RangeStream.classCombos(hand)
+            if len(chunk) >= chunkSize:
+                yield np.array(chunk[:chunkSize], dtype = np.int64)
+                chunk = chunk[chunkSize:]
+        if chunk:
+            yield np.array(chunk, dtype = np.int64)
+
+    @staticmethod
+    def classCombos(hand: str) -> list[tuple[int, int]]:
+        """
+        Lists the combos of one hand class.
+
+        :param hand: A hand class (e.g., 'AKs', 'QQ', 'T9o').
+        :return: A list of card index pairs.
+        """
+        assert isinstance(hand, str) and ((len(hand) == 3 and hand[2] in {'s', 'o'}) or (len(hand) == 2 and hand[0] == hand[1])), "ONE OR MORE HANDS IS OF INVALID FORMAT."
+        assert hand[0] in RangeStream.rankIndices and hand[1] in RangeStream.rankIndices, "ONE OR MORE HANDS IS OF INVALID FORMAT."
+
+        first, second = RangeStream.rankIndices[hand[0]], RangeStream.rankIndices[hand[1]]
+        pattern = RangeStream.suitPatterns['pair' if len(hand) == 2 else hand[2]]
+        return([(13*a + first, 13*b + second) for a, b in pattern])
+
+    @staticmethod
+    def count(range: Iterable[str]) -> int:
+        """
+        Counts the combos of a hand range without expanding it (6 per pair, 4 per suited and 12 per offsuit hand).
+
+        :param range: An iterable of strings representing the hand range.
+        :return: The number of combos.
+        """
+        return(sum(len(RangeStream.suitPatterns['pair' if len(hand) == 2 else hand[2]]) for hand in range))
+
+    @staticmethod
+    def toArray(range: list[list[Card]] | np.ndarray) -> np.ndarray:
+        """
+        Converts a range to an integer array of card index pairs.
+
+        :param range: A list of hands (each a list of two Card objects), or an (n, 2) integer array.
+        :return: An (n, 2) integer array.
+        """
+        if isinstance(range, np.ndarray):
+            return(range.astype(np.int64).reshape(-1, 2))
+        return(np.array([[card.getIndex() for card in hand] for hand in range], dtype = np.int64).reshape(len(range), 2))
+
+    @staticmethod
+    def combos(*args: list[list[Card]] | np.ndarray, start: int = 0, stop: int = None, chunkSize: int = None) -> Iterator[np.ndarray]:
+        """
+        Lazily iterates the combinations of one hand from each range, in the order of itertools.product.
+        Each combination is decoded from its position in the product by mixed-radix division, so iteration
+        can start at any position (e.g., to resume) without walking the ones before it.
+
+        :param args: A list of ranges (each a list of hands of two Card objects, or an (n, 2) integer array).
+        :param start: The position of the first combination (default is 0).
+        :param stop: The position after the last combination (default is the end of the product).
+        :param chunkSize: The largest number of combinations per chunk (default is RangeStream.chunkSize).
+        :return: An iterator of (k, r, 2) integer arrays, one combination of r holes per row.
+        """
+        ranges = [RangeStream.toArray(range) for range in args]
+        sizes = [len(range) for range in ranges]
+        chunkSize = chunkSize or RangeStream.chunkSize
+        stop = (prod(sizes) if stop is None else min(stop, prod(sizes)))
+        for begin in builtins.range(start, stop, chunkSize):
+            positions = np.arange(begin, min(begin + chunkSize, stop), dtype = np.int64)
+            holes = []
+            # The last range varies fastest, as in itertools.product.
+            for range, size in zip(reversed(ranges), reversed(sizes)):
+                holes.append(range[positions % size])
+                positions //= size
+            yield np.stack(holes[::-1], axis = 1)
+
+    @staticmethod
+    def countCombos(*args: list[list[Card]] | np.ndarray) -> int:
+        """
+        Counts the combinations of one hand from each range.
+
+        :param args: A list of ranges.
+        :return: The size of the product of the ranges.
+        """
+        return(prod(len(range) for range in args))
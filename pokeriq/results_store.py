@@ -0,0 +1,342 @@
+from .card import Card
+from .deck import Deck
+from .equity_tools import EquitySolver
+from .hand_evaluator import HandEvaluator
+from typing import Self
+import hashlib
+import sqlite3
+import json
+import math
+import time
+
+# results_store.py
+# This file contains a class for persisting equity results to SQLite so they can be queried and reused.
+# Spots are keyed by canonical hashes of the board, of each range and of the game (dead cards, deck composition,
+# ranking and game), indexed by board texture and range id, and new trials for a stored spot are merged into it
+# so its precision improves over time; exact results replace sampled ones and are never diluted by them.
+
+class ResultsStore:
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS spots (
+            spot TEXT PRIMARY KEY,
+            board TEXT NOT NULL,
+            boardHash TEXT NOT NULL,
+            texture TEXT NOT NULL,
+            ranges TEXT NOT NULL,
+            trials INTEGER NOT NULL,
+            counts TEXT NOT NULL,
+            error REAL NOT NULL,
+            updated REAL NOT NULL,
+            exact INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS spotRanges (
+            spot TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            rangeId TEXT NOT NULL,
+            PRIMARY KEY (spot, position)
+        );
+        CREATE INDEX IF NOT EXISTS spotsByBoard ON spots (boardHash);
+        CREATE INDEX IF NOT EXISTS spotsByTexture ON spots (texture);
+        CREATE INDEX IF NOT EXISTS spotRangesById ON spotRanges (rangeId);
+    """
+
+    def __init__(self, path: str = ":memory:", batchSize: int = 100) -> Self:
+        """
+        Opens (or creates) a results store.
+
+        :param path: The path of the SQLite database file (default is an in-memory database).
+        :param batchSize: The number of pending records that triggers a write (default is 100).
+        """
+        assert isinstance(path, str), "PATH IS NOT A STRING."
+        assert isinstance(batchSize, int) and batchSize > 0, "BATCH SIZE IS NOT A POSITIVE INTEGER."
+
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(ResultsStore.schema)
+        self.batchSize = batchSize
+        self.pending = {}
+
+    def __enter__(self) -> Self:
+        return(self)
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+    def record(self, board: list[Card], ranges: list[list[list[Card]]], equities: dict[str: float], trials: int, deck: Deck = None, ranking: str | tuple[str, ...] = 'standard', game: str = 'holdem', exact: bool = False) -> str:
+        """
+        Queues an equity result for writing. Results for a spot already stored (or queued) are merged with it,
+        weighting each by its number of trials. An exact result replaces a sampled one, and sampled results
+        are not merged into an exact one.
+
+        :param board: A list of 0-5 Card objects representing the community board.
+        :param ranges: A list of ranges, one per player (a defined hole is a range of one hand, a random hole an empty range).
+        :param equities: A dictionary of equities as returned by calculateHandEquity or calculateRangeEquity.
+        :param trials: The number of trials behind the result (for an exact result, the number of runouts or combinations).
+        :param deck: The deck the result was calculated with; its composition and dead cards are part of the spot (default is a standard deck).
+        :param ranking: The ranking order the result was calculated with (default is 'standard').
+        :param game: The game the result was calculated for (default is 'holdem').
+        :param exact: Whether the result was enumerated exactly rather than sampled (default is False).
+        :return: The hash identifying the spot.
+        """
+        assert isinstance(board, list) and all(isinstance(card, Card) for card in board), "BOARD IS NOT A LIST OF CARDS."
+        assert isinstance(ranges, list) and len(ranges) == len(equities) - 1, "RANGES DO NOT MATCH THE EQUITIES."
+        assert isinstance(trials, int) and trials > 0, "TRIALS INPUT IS NOT A POSITIVE INTEGER."
+        assert deck is None or isinstance(deck, Deck), "DECK INPUT IS OF INVALID TYPE."
+
+        rangeIds = [ResultsStore.rangeId(range) for range in ranges]
+        spot = ResultsStore.spotHash(board, rangeIds, ResultsStore.context(board, ranges, deck, ranking, game))
+        # Results are stored by seat position, so hand ("Player n") and range ("Range n") results merge alike.
+        counts = [value*trials for value in equities.values()]
+        entry = self.pending.get(spot)
+        if entry and entry["exact"] >= exact:
+            if not entry["exact"]:
+                entry["trials"] += trials
+                entry["counts"] = [a + b for a, b in zip(entry["counts"], counts)]
+        else:
+            self.pending[spot] = {"board": board, "rangeIds": rangeIds, "trials": trials, "counts": counts, "exact": exact}
+        if len(self.pending) >= self.batchSize:
+            self.flush()
+        return(spot)
+
+    def recordHandEquity(self, solver: EquitySolver, trials: int, exact: bool = False) -> str:
+        """
+        Queues the result of the last calculateHandEquity call of a solver, with the solver's deck, ranking and game.
+
+        :param solver: An EquitySolver whose hand equities have been calculated.
+        :param trials: The number of trials the equities were calculated with.
+        :param exact: Whether the equities were calculated with sampling='exact' (default is False).
+        :return: The hash identifying the spot.
+        """
+        assert isinstance(solver, EquitySolver) and solver.getHandEquities(), "SOLVER HAS NO HAND EQUITIES."
+
+        board = (solver.flop or []) + (solver.turn or []) + (solver.river or [])
+        ranges = [[player.showHole()] if player.showHole() else [] for player in solver.players]
+        return(self.record(board, ranges, solver.getHandEquities(), trials, solver.deck, solver.ranking, solver.game, exact))
+
+    def recordRangeEquity(self, ranges: list[list[list[Card]]], board: list[Card], equities: dict[str: float], trials: int, customDeck: Deck = None, ranking: str | tuple[str, ...] = 'standard', exact: bool = None) -> str:
+        """
+        Queues the result of a calculateRangeEquity call.
+
+        :param ranges: The ranges passed to calculateRangeEquity.
+        :param board: The custom board passed to calculateRangeEquity (or None).
+        :param equities: The equity dictionary returned by calculateRangeEquity.
+        :param trials: The total number of trials (or samples) behind the result.
+        :param customDeck: The custom deck passed to calculateRangeEquity (or None).
+        :param ranking: The ranking passed to calculateRangeEquity (default is 'standard').
+        :param exact: Whether the result is exact (default is True on a complete board, where calculateRangeEquity enumerates).
+        :return: The hash identifying the spot.
+        """
+        exact = (len(board or []) == 5 if exact is None else exact)
+        return(self.record(board or [], ranges, equities, trials, customDeck, ranking, exact = exact))
+
+    def flush(self) -> None:
+        """
+        Writes all queued records in a single transaction, merging them into stored spots.
+        """
+        if not self.pending:
+            return
+        with self.connection:
+            stored = self.fetch(list(self.pending))
+            rows = []
+            links = []
+            for spot, entry in self.pending.items():
+                trials = entry["trials"]
+                counts = entry["counts"]
+                exact = entry["exact"]
+                if spot in stored and stored[spot]["exact"]:
+                    continue
+                if spot in stored and not exact:
+                    trials += stored[spot]["trials"]
+                    counts = [a + b for a, b in zip(counts, stored[spot]["counts"])]
+                board = [card.getIndex() for card in entry["board"]]
+                rows.append((spot, json.dumps(sorted(board)), ResultsStore.boardHash(entry["board"]), ResultsStore.texture(entry["board"]),
+                             json.dumps(entry["rangeIds"]), trials, json.dumps(counts), (0.0 if exact else ResultsStore.error(counts, trials)), time.time(), int(exact)))
+                links += [(spot, position, rangeId) for position, rangeId in enumerate(entry["rangeIds"])]
+            self.connection.executemany("INSERT OR REPLACE INTO spots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.connection.executemany("INSERT OR IGNORE INTO spotRanges VALUES (?, ?, ?)", links)
+        self.pending = {}
+
+    def fetch(self, spots: list[str]) -> dict[str, dict]:
+        """
+        Reads stored spots by hash.
+
+        :param spots: A list of spot hashes.
+        :return: A dictionary of spot hashes to stored entries.
+        """
+        entries = {}
+        for start in range(0, len(spots), 500):
+            chunk = spots[start:start+500]
+            query = "SELECT spot, board, texture, ranges, trials, counts, error, exact FROM spots WHERE spot IN ("+",".join("?"*len(chunk))+")"
+            for row in self.connection.execute(query, chunk):
+                entries[row[0]] = ResultsStore.entry(row)
+        return(entries)
+
+    def lookup(self, board: list[Card], ranges: list[list[list[Card]]], deck: Deck = None, ranking: str | tuple[str, ...] = 'standard', game: str = 'holdem') -> dict | None:
+        """
+        Looks up a stored spot, including records not yet written.
+
+        :param board: A list of 0-5 Card objects representing the community board.
+        :param ranges: A list of ranges, one per player.
+        :param deck: The deck of the spot (default is a standard deck).
+        :param ranking: The ranking order of the spot (default is 'standard').
+        :param game: The game of the spot (default is 'holdem').
+        :return: A dictionary with the spot's equities, trials, standard error and exact flag, or None if the spot is unknown.
+        """
+        self.flush()
+        spot = ResultsStore.spotHash(board, [ResultsStore.rangeId(range) for range in ranges], ResultsStore.context(board, ranges, deck, ranking, game))
+        return(self.fetch([spot]).get(spot))
+
+    def lookupBoard(self, board: list[Card]) -> list[dict]:
+        """
+        Returns all stored spots on a board (in any card order).
+
+        :param board: A list of 0-5 Card objects.
+        :return: A list of stored entries.
+        """
+        self.flush()
+        rows = self.connection.execute("SELECT spot, board, texture, ranges, trials, counts, error, exact FROM spots WHERE boardHash = ?", (ResultsStore.boardHash(board),))
+        return([ResultsStore.entry(row) for row in rows])
+
+    def lookupTexture(self, texture: str) -> list[dict]:
+        """
+        Returns all stored spots whose board has the given texture (see texture).
+
+        :param texture: A texture string, e.g. 'A-twotone-unpaired'.
+        :return: A list of stored entries.
+        """
+        self.flush()
+        rows = self.connection.execute("SELECT spot, board, texture, ranges, trials, counts, error, exact FROM spots WHERE texture = ?", (texture,))
+        return([ResultsStore.entry(row) for row in rows])
+
+    def lookupRange(self, range: list[list[Card]] | str) -> list[dict]:
+        """
+        Returns all stored spots in which some player holds the given range.
+
+        :param range: A range (list of hands) or its range id.
+        :return: A list of stored entries.
+        """
+        self.flush()
+        rangeId = range if isinstance(range, str) else ResultsStore.rangeId(range)
+        rows = self.connection.execute("SELECT DISTINCT s.spot, s.board, s.texture, s.ranges, s.trials, s.counts, s.error, s.exact FROM spots s "
+                                       "JOIN spotRanges r ON r.spot = s.spot WHERE r.rangeId = ?", (rangeId,))
+        return([ResultsStore.entry(row) for row in rows])
+
+    def close(self) -> None:
+        """
+        Writes all queued records and closes the database.
+        """
+        self.flush()
+        self.connection.close()
+
+    @staticmethod
+    def entry(row: tuple) -> dict:
+        """
+        Converts a stored row to an entry with equities by seat ("Seat 1", ..., "CHOP").
+
+        :param row: A (spot, board, texture, ranges, trials, counts, error, exact) row.
+        :return: A dictionary describing the stored spot.
+        """
+        spot, board, texture, ranges, trials, counts, error, exact = row
+        counts = json.loads(counts)
+        names = ["Seat "+str(i+1) for i in range(len(counts) - 1)] + ["CHOP"]
+        return({"spot": spot, "board": [Card.fromIndex(card) for card in json.loads(board)], "texture": texture, "ranges": json.loads(ranges),
+                "trials": trials, "counts": counts, "equities": {name: count/trials for name, count in zip(names, counts)}, "error": error, "exact": bool(exact)})
+
+    @staticmethod
+    def error(counts: list[float], trials: int) -> float:
+        """
+        Returns the largest binomial standard error among the outcomes of a result.
+
+        :param counts: The weighted count of each outcome.
+        :param trials: The number of trials.
+        :return: The standard error.
+        """
+        return(max(math.sqrt(max(0.0, p*(1 - p))/trials) for p in (count/trials for count in counts)))
+
+    @staticmethod
+    def rangeId(range: list[list[Card]]) -> str:
+        """
+        Returns a canonical id of a range, independent of the order of its hands and of the cards in each hand.
+        A random hole (empty range) has the id 'random'.
+
+        :param range: A list of hands, each a list of two Card objects.
+        :return: A hex digest identifying the range.
+        """
+        if not range:
+            return("random")
+        combos = sorted(tuple(sorted(card.getIndex() for card in hand)) for hand in range)
+        return(hashlib.sha1(json.dumps(combos).encode()).hexdigest()[:20])
+
+    @staticmethod
+    def boardHash(board: list[Card]) -> str:
+        """
+        Returns a canonical hash of a board, independent of card order.
+
+        :param board: A list of 0-5 Card objects.
+        :return: A hex digest identifying the board.
+        """
+        return(hashlib.sha1(json.dumps(sorted(card.getIndex() for card in board)).encode()).hexdigest()[:20])
+
+    @staticmethod
+    def context(board: list[Card], ranges: list[list[list[Card]]], deck: Deck = None, ranking: str | tuple[str, ...] = 'standard', game: str = 'holdem') -> dict | None:
+        """
+        Describes what a spot was calculated under beyond its board and ranges: the dead cards (cards of the deck's
+        composition that were neither in the deck nor on the board or in a hole), a non-standard deck composition,
+        a non-standard ranking order and a game other than Hold'em.
+
+        :param board: A list of 0-5 Card objects.
+        :param ranges: A list of ranges, one per player.
+        :param deck: The deck the spot was calculated with (default is a standard deck).
+        :param ranking: A name in HandEvaluator.rankings, or an order of the categories of Hand.hands.
+        :param game: The game, 'holdem' or 'omaha'.
+        :return: A dictionary of the non-default parts, or None for a standard Hold'em spot.
+        """
+        context = {}
+        if deck is not None:
+            composition = sorted({card.getIndex() for card in deck.getComposition()})
+            inPlay = {card.getIndex() for card in deck.getCards() + board} | {card.getIndex() for range in ranges if len(range) == 1 for card in range[0]}
+            dead = [card for card in composition if card not in inPlay]
+            if dead:
+                context["dead"] = dead
+            if composition != list(range(52)):
+                context["deck"] = composition
+        ranking = list(HandEvaluator.rankings[ranking] if isinstance(ranking, str) else ranking)
+        if ranking != list(HandEvaluator.rankings['standard']):
+            context["ranking"] = ranking
+        if game != 'holdem':
+            context["game"] = game
+        return(context or None)
+
+    @staticmethod
+    def spotHash(board: list[Card], rangeIds: list[str], context: dict = None) -> str:
+        """
+        Returns the hash identifying a spot: its board, the range id of each seat and its context (see context).
+        Standard Hold'em spots have no context, so their hashes are unchanged from stores written before it.
+
+        :param board: A list of 0-5 Card objects.
+        :param rangeIds: The range id of each seat, in seat order.
+        :param context: An optional dictionary of dead cards, deck composition, ranking and game.
+        :return: A hex digest identifying the spot.
+        """
+        key = ResultsStore.boardHash(board)+":"+":".join(rangeIds)
+        if context:
+            key += ":"+json.dumps(context, sort_keys = True)
+        return(hashlib.sha1(key.encode()).hexdigest()[:24])
+
+    @staticmethod
+    def texture(board: list[Card]) -> str:
+        """
+        Classifies a board by its highest rank, suitedness and pairing, e.g. 'A-twotone-unpaired'. Suitedness is
+        'monotone' when every card shares a suit, and otherwise by the most cards of one suit: 'rainbow' (one),
+        'twotone' (two), 'threeflush' (three) or 'fourflush' (four). Empty (preflop) boards have the texture 'preflop'.
+
+        :param board: A list of 0-5 Card objects.
+        :return: A texture string.
+        """
+        if not board:
+            return("preflop")
+        suits = max([card.getSuit() for card in board].count(suit) for suit in Card.suits)
+        ranks = max([card.getRank() for card in board].count(card.getRank()) for card in board)
+        suitedness = ("monotone" if suits == len(board) and len(board) > 1 else ("rainbow", "twotone", "threeflush", "fourflush")[suits - 1])
+        pairing = ("unpaired" if ranks == 1 else "paired" if ranks == 2 else "trips" if ranks == 3 else "quads")
+        return(Card.ranks[max(card.getRank() for card in board)]+"-"+suitedness+"-"+pairing)
@@ -0,0 +1,219 @@
+from .card import Card
+from .hand_evaluator import HandEvaluator
+from itertools import combinations, product
+from bisect import bisect_left, bisect_right
+from typing import Self
+import threading
+
+# river_index.py
+# This file contains a class indexing the showdown strength of every possible hole on a complete board.
+# It answers winner and range-versus-hand queries by lookup and binary search, and computes river
+# range-versus-range equity with a single sorted sweep instead of simulation.
+
+class RiverIndex:
+
+    cache = {}
+    cacheSize = 256
+    cacheLock = threading.Lock()
+
+    def __init__(self, board: list[Card], evaluator: HandEvaluator = None) -> Self:
+        """
+        Initializes the index by scoring all holes that do not conflict with a complete board.
+
+        :param board: A list of 5 Card objects representing the complete community board.
+        :param evaluator: An optional HandEvaluator (default is the standard evaluator).
+        """
+        assert isinstance(board, list) and all(isinstance(card, Card) for card in board), "BOARD IS NOT A LIST OF CARDS."
+        assert len(board) == 5, "FULL BOARD NOT PROVIDED (5)."
+
+        self.board = [card.getIndex() for card in board]
+        self.evaluator = evaluator or HandEvaluator.standard()
+
+        boardKey, boardMasks = HandEvaluator.partial(self.board)
+        live = [card for card in range(52) if card not in self.board]
+        self.scores = {}
+        for hole in combinations(live, 2):
+            key, masks = HandEvaluator.partial(hole)
+            self.scores[hole] = self.evaluator.scorePartial(boardKey + key, [boardMasks[i] | masks[i] for i in range(4)])
+        self.order = sorted(self.scores, key = self.scores.get)
+        self.sortedScores = [self.scores[hole] for hole in self.order]
+
+    def getBoard(self) -> list[Card]:
+        """
+        Returns the board the index was built for.
+
+        :return: A list of 5 Card objects.
+        """
+        return([Card.fromIndex(card) for card in self.board])
+
+    def score(self, hole: list[Card]) -> int:
+        """
+        Returns the showdown score of a hole on the indexed board (higher is stronger).
+
+        :param hole: A list of two Card objects.
+        :return: An integer score.
+        """
+        return(self.scores[RiverIndex.key(hole)])
+
+    def rank(self, hole: list[Card]) -> float:
+        """
+        Returns the fraction of all holes on the board that the given hole beats, counting ties as half.
+        Holes sharing a card with the given hole are not excluded.
+
+        :param hole: A list of two Card objects.
+        :return: A float on [0,1].
+        """
+        score = self.score(hole)
+        below = bisect_left(self.sortedScores, score)
+        tied = bisect_right(self.sortedScores, score) - below - 1
+        return((below + tied/2)/(len(self.sortedScores) - 1))
+
+    def winners(self, holes: list[list[Card]]) -> list[int]:
+        """
+        Determines the winning hole(s) among several holes on the indexed board.
+
+        :param holes: A list of holes, each a list of two Card objects.
+        :return: A list of the indices of the winning hole(s).
+        """
+        scores = [self.score(hole) for hole in holes]
+        best = max(scores)
+        return([i for i, score in enumerate(scores) if score == best])
+
+    def rangeIndex(self, range: list[list[Card]]) -> tuple[list[int], dict[int, list[int]], set[tuple[int, int]]]:
+        """
+        Sorts the scores of a range, overall and per card held, for repeated binary-search queries.
+        Combos conflicting with the board are dropped.
+
+        :param range: A list of hands, each a list of two Card objects.
+        :return: A tuple of the sorted scores, a dictionary of sorted scores per card index, and the set of combo keys.
+        """
+        overall = []
+        byCard = {}
+        members = set()
+        for hand in range:
+            key = RiverIndex.key(hand)
+            if key not in self.scores:
+                continue
+            members.add(key)
+            overall.append(self.scores[key])
+            for card in key:
+                byCard.setdefault(card, []).append(self.scores[key])
+        overall.sort()
+        for scores in byCard.values():
+            scores.sort()
+        return(overall, byCard, members)
+
+    def compareRange(self, range: list[list[Card]] | tuple, hole: list[Card]) -> tuple[int, int, int]:
+        """
+        Counts the combos of a range that the given hole beats, ties and loses to, excluding the combos
+        blocked by the hole. Passing the output of rangeIndex makes each query O(log n).
+
+        :param range: A list of hands (each a list of two Card objects), or the output of rangeIndex.
+        :param hole: A list of two Card objects.
+        :return: A tuple of (combos beaten, combos tied, combos ahead).
+        """
+        overall, byCard, members = range if isinstance(range, tuple) else self.rangeIndex(range)
+        key = RiverIndex.key(hole)
+        score = self.scores[key]
+        lists = [overall] + [byCard.get(card, []) for card in key]
+        signs = [1, -1, -1]
+        below = sum(sign*bisect_left(scores, score) for sign, scores in zip(signs, lists))
+        upTo = sum(sign*bisect_right(scores, score) for sign, scores in zip(signs, lists))
+        total = sum(sign*len(scores) for sign, scores in zip(signs, lists))
+        # The hole itself is removed twice (once per card) when it is also a combo of the range.
+        if key in members:
+            upTo += 1
+            total += 1
+        return(below, upTo - below, total - upTo)
+
+    def fractionAhead(self, range: list[list[Card]] | tuple, hole: list[Card]) -> float:
+        """
+        Returns the fraction of the combos of a range that beat the given hole, excluding blocked combos.
+
+        :param range: A list of hands (each a list of two Card objects), or the output of rangeIndex.
+        :param hole: A list of two Card objects.
+        :return: A float on [0,1].
+        """
+        beaten, tied, ahead = self.compareRange(range, hole)
+        return(ahead/max(1, beaten + tied + ahead))
+
+    def rangeEquity(self, *args: list[list[Card]]) -> dict[str: float]:
+        """
+        Calculates exact river equity between ranges, weighting every non-conflicting combination of
+        hands equally. Two ranges are solved by a sorted sweep in O(n log n); more ranges enumerate
+        their product by score lookup.
+
+        :param args: Ranges, each a list of hands (each a list of two Card objects).
+        :return: A dictionary of range names and their respective equity percentages, plus "CHOP".
+        """
+        assert len(args) > 0, "NO RANGES GIVEN."
+
+        equities = {"Range "+str(i+1): 0 for i in range(len(args))}
+        equities["CHOP"] = 0
+        if len(args) == 2:
+            index = self.rangeIndex(args[1])
+            wins = losses = chops = 0
+            for hand in args[0]:
+                if RiverIndex.key(hand) not in self.scores:
+                    continue
+                beaten, tied, ahead = self.compareRange(index, hand)
+                wins += beaten
+                chops += tied
+                losses += ahead
+            total = wins + chops + losses
+            if total:
+                equities["Range 1"] = wins/total
+                equities["Range 2"] = losses/total
+                equities["CHOP"] = chops/total
+            return(equities)
+
+        keys = [[RiverIndex.key(hand) for hand in range if RiverIndex.key(hand) in self.scores] for range in args]
+        total = 0
+        for combo in product(*keys):
+            cards = [card for key in combo for card in key]
+            if len(set(cards)) < len(cards):
+                continue
+            total += 1
+            scores = [self.scores[key] for key in combo]
+            best = max(scores)
+            winners = [i for i, score in enumerate(scores) if score == best]
+            if len(winners) == len(args):
+                equities["CHOP"] += 1
+            else:
+                for winner in winners:
+                    equities["Range "+str(winner+1)] += 1
+        for name in equities:
+            equities[name] /= max(1, total)
+        return(equities)
+
+    @staticmethod
+    def key(hole: list[Card]) -> tuple[int, int]:
+        """
+        Converts a hole to the sorted tuple of card indices used as an index key.
+
+        :param hole: A list of two Card objects.
+        :return: A sorted tuple of two card indices.
+        """
+        return(tuple(sorted(card.getIndex() for card in hole)))
+
+    @staticmethod
+    def forBoard(board: list[Card]) -> Self:
+        """
+        Returns the cached index of a board, building it on first use. Boards are cached irrespective
+        of card order, and the oldest entry is evicted once cacheSize boards are held. Safe to call from several threads.
+
+        :param board: A list of 5 Card objects representing the complete community board.
+        :return: A RiverIndex object.
+        """
+        assert isinstance(board, list) and all(isinstance(card, Card) for card in board), "BOARD IS NOT A LIST OF CARDS."
+
+        signature = tuple(sorted(card.getIndex() for card in board))
+        index = RiverIndex.cache.get(signature)
+        if index is None:
+            index = RiverIndex(board)
+            # Eviction iterates the cache, so updates are serialized; indexes are only read once built.
+            with RiverIndex.cacheLock:
+                if len(RiverIndex.cache) >= RiverIndex.cacheSize:
+                    RiverIndex.cache.pop(next(iter(RiverIndex.cache)))
+                index = RiverIndex.cache.setdefault(signature, index)
+        return(index)
@@ -2,7 +2,9 @@ from .card import Card
 from .made_hand import Hand
 from .player import Player
 from .deck import Deck
+from .random_engine import RandomEngine
 from typing import Self
+import numpy as np
 
 # runout_simulation.py
 # This file contains a class for running a poker hand simulation.
@@ -95,40 +97,43 @@ class Simulation:
         return(self.highHand)
 
     @staticmethod
-    def runSim(playerCount: int, customDeck: Deck = Deck(), customPlayers: list[Player] = None, customFlop: list[Card] = None, customTurn: list[Card] = None, customRiver: list[Card] = None) -> Self:
+    def runSim(playerCount: int, customDeck: Deck = None, customPlayers: list[Player] = None, customFlop: list[Card] = None, customTurn: list[Card] = None, customRiver: list[Card] = None, rng: RandomEngine | np.random.Generator = None, seed: int = None, game: str = 'holdem') -> Self:
         """
         Runs a simulation by creating a deck and dealing cards to players. 
         It allows customization for the number of players, deck, and community cards.
 
         :param playerCount: The number of players in the simulation (1-10).
-        :param customDeck: An optional custom Deck object.
+        :param customDeck: An optional custom Deck object. It is copied before shuffling and dealing, so it is never modified.
         :param customPlayers: An optional list of custom Player objects.
         :param customFlop: An optional custom flop (list of 3 Card objects).
         :param customTurn: An optional custom turn (1 Card object).
         :param customRiver: An optional custom river (1 Card object).
+        :param rng: An optional RandomEngine or NumPy Generator to shuffle with (default is the deck's own engine).
+        :param seed: An optional integer seed to shuffle with when no rng is given.
+        :param game: The game dealt, 'holdem' or 'omaha' (default is 'holdem').
         :returns: A Simulation object representing the hand.
         """
         assert isinstance(playerCount, int) and playerCount > 0 and playerCount <= 10, "INPUT PC IS NOT AN INTEGER ON [1,10]."
-        assert isinstance(customDeck, Deck), "INPUT DECK IS OF INVALID TYPE."
+        assert customDeck is None or isinstance(customDeck, Deck), "INPUT DECK IS OF INVALID TYPE."
+        assert game in Player.holeSizes, "GAME MUST BE ONE OF "+str(tuple(Player.holeSizes))+"."
         assert not customPlayers or isinstance(customPlayers, list) and all(isinstance(player, Player) for player in customPlayers), "INVALID PLAYER LIST PROVIDED."
         assert not customFlop or isinstance(customFlop, list) and all(isinstance(card, Card) for card in customFlop) and len(customFlop) == 3, "INVALID FLOP PROVIDED."
         assert not customTurn or isinstance(customTurn, list) and all(isinstance(card, Card) for card in customTurn) and len(customTurn) == 1, "INVALID TURN PROVIDED."
         assert not customRiver or isinstance(customRiver, list) and all(isinstance(card, Card) for card in customRiver) and len(customRiver) == 1, "INVALID RIVER PROVIDED."
 
         message = ""
-        deck = customDeck
-        deck.shuffle()
+        # Dealing pops cards, so a fresh deck (or a copy of the custom one) keeps concurrent calls independent.
+        deck = (Deck(customDeck.getCards(), customDeck.rng) if customDeck else Deck())
+        deck.shuffle(RandomEngine.resolve(rng, seed) if rng is not None or seed is not None else None)
 
         if customPlayers:
             players = customPlayers
 
         else:
-            players = [Player("Player "+str(i+1)) for i in range(playerCount)]
-            for player in players:
-                player.assignHole(deck.draw())
-
-            for player in players:
-                player.assignHole(deck.draw())
+            players = [Player("Player "+str(i+1), game = game) for i in range(playerCount)]
+            for _ in range(Player.holeSizes[game]):
+                for player in players:
+                    player.assignHole(deck.draw())
         
         if customFlop:
             flop = customFlop
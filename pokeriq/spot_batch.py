@@ -0,0 +1,149 @@
+from .card import Card
+from .hand_evaluator import HandEvaluator
+from .random_engine import RandomEngine
+from .range_stream import RangeStream
+from .river_index import RiverIndex
+from itertools import combinations, product
+from math import comb
+from typing import Self
+import numpy as np
+
+# spot_batch.py
+# This file contains a class calculating the equities of many spots at once. Spots are grouped by board and dead
+# cards; each group shares one set of board completions (exact enumeration when small enough), the board's partial
+# histograms and, on the river, the board's RiverIndex, and every hole is scored on the group's completions once.
+
+class SpotBatch:
+    def __init__(self, board: list[int], dead: list[int], trials: int = 10000, exactLimit: int = 50000, rng: RandomEngine = None) -> Self:
+        """
+        Initializes a group of spots sharing a board and dead cards.
+
+        :param board: The card indices of the board (0-5 cards).
+        :param dead: The card indices that cannot be dealt.
+        :param trials: The number of completions sampled when there are more than exactLimit of them (default is 10000).
+        :param exactLimit: The largest number of board completions enumerated (default is 50000).
+        :param rng: An optional RandomEngine to sample completions from.
+        """
+        self.board = list(board)
+        self.dead = set(dead)
+        self.evaluator = HandEvaluator.standard()
+        self.index = (RiverIndex.forBoard([Card.fromIndex(card) for card in self.board]) if len(self.board) == 5 else None)
+        missing = 5 - len(self.board)
+        deck = [card for card in range(52) if card not in self.board and card not in self.dead]
+        if comb(len(deck), missing) <= exactLimit:
+            self.runouts = np.array(list(combinations(deck, missing)), dtype = np.int64).reshape(comb(len(deck), missing), missing)
+        else:
+            self.runouts = np.array(deck)[RandomEngine.resolve(rng).sampleIndices(len(deck), missing, trials)]
+        boardKey, boardMasks = HandEvaluator.partial(self.board)
+        keys, masks = (HandEvaluator.partialBatch(self.runouts) if missing else (np.zeros(1, dtype = np.int64), np.zeros((1, 4), dtype = np.int64)))
+        self.keys = keys + boardKey
+        self.masks = masks | np.array(boardMasks, dtype = np.int64)
+        self.scores = {}
+
+    def score(self, hole: tuple[int, int]) -> np.ndarray:
+        """
+        Scores a hole on every completion of the group, caching the scores for the group's other spots.
+        On the river the score is read from the board's RiverIndex.
+
+        :param hole: A pair of card indices.
+        :return: An integer array of scores, one per completion.
+        """
+        hole = tuple(sorted(hole))
+        if hole not in self.scores:
+            if self.index is not None:
+                self.scores[hole] = np.array([self.index.scores[hole]], dtype = np.int64)
+            else:
+                holeKey, holeMasks = HandEvaluator.partial(hole)
+                self.scores[hole] = self.evaluator.scoreArrays(self.keys + holeKey, self.masks | np.array(holeMasks, dtype = np.int64))
+        return(self.scores[hole])
+
+    def tally(self, holes: list[tuple[int, int]]) -> np.ndarray:
+        """
+        Computes the win and chop rates of known holes over the group's completions that hold none of their cards.
+        As in EquitySolver.solveHandEquity, a tie between some of the players counts as a win for each of them and
+        a tie between all of them as a chop.
+
+        :param holes: The card index pair of each player.
+        :return: An array of the win rate of each player followed by the chop rate.
+        """
+        valid = ~np.isin(self.runouts, [card for hole in holes for card in hole]).any(axis = 1)
+        scores = np.stack([self.score(hole)[valid] for hole in holes])
+        winners = (scores == scores.max(axis = 0))
+        chops = winners.all(axis = 0)
+        return(np.append((winners & ~chops).mean(axis = 1), chops.mean()))
+
+    def handEquity(self, holes: list[list[int]]) -> dict[str: float]:
+        """
+        Calculates the hand equity of known holes.
+
+        :param holes: The two card indices of each player's hole.
+        :return: A dictionary of player names ("Player 1", ...) and their respective equity percentages, plus "CHOP".
+        """
+        names = ["Player "+str(i+1) for i in range(len(holes))] + ["CHOP"]
+        return(dict(zip(names, self.tally([tuple(hole) for hole in holes]).tolist())))
+
+    def rangeEquity(self, ranges: list[list[str]]) -> dict[str: float]:
+        """
+        Calculates range-versus-range equity, weighting every combination of one hand from each range that shares
+        no cards (with each other, the board or the dead cards) equally. On the river two ranges are solved by the
+        RiverIndex's sorted sweep.
+
+        :param ranges: A list of ranges, each a list of hand classes (e.g., ["AKs", "QQ"]).
+        :return: A dictionary of range names ("Range 1", ...) and their respective equity percentages, plus "CHOP".
+        """
+        used = set(self.board) | self.dead
+        combos = [[combo for handClass in range for combo in RangeStream.classCombos(handClass) if not set(combo) & used] for range in ranges]
+        if self.index is not None and len(ranges) == 2:
+            return(self.index.rangeEquity(*[[[Card.fromIndex(card) for card in combo] for combo in range] for range in combos]))
+
+        names = ["Range "+str(i+1) for i in range(len(ranges))] + ["CHOP"]
+        totals = np.zeros(len(names))
+        count = 0
+        for holes in product(*combos):
+            cards = [card for hole in holes for card in hole]
+            if len(set(cards)) < len(cards):
+                continue
+            totals += self.tally(holes)
+            count += 1
+        return(dict(zip(names, (totals/max(1, count)).tolist())))
+
+    @staticmethod
+    def solve(spots: list[dict], trials: int = 10000, exactLimit: int = 50000, rng: RandomEngine | np.random.Generator = None, seed: int = None) -> list[dict[str: float]]:
+        """
+        Calculates the equities of many spots, grouping them by board and dead cards. Spots take the form of
+        EquitySolver.fromSpot, with either "holes" or "ranges" (lists of hand classes). Spots with a random hole
+        are calculated on their own (see EquitySolver.calculateHandEquity), as their completions include the hole.
+
+        :param spots: A list of spot definitions.
+        :param trials: The number of completions sampled per group when there are more than exactLimit (default is 10000).
+        :param exactLimit: The largest number of board completions enumerated per group (default is 50000).
+        :param rng: An optional RandomEngine or NumPy Generator to sample completions from.
+        :param seed: An optional integer seed for reproducible results when no rng is given.
+        :return: A list of equity dictionaries in the order of the spots.
+        """
+        assert isinstance(spots, list) and all(isinstance(spot, dict) for spot in spots), "SPOTS IS NOT A LIST OF DICTIONARIES."
+        assert isinstance(trials, int) and trials > 0, "TRIALS INPUT IS NOT A POSITIVE INTEGER."
+        assert all(len(spot.get("holes") or spot.get("ranges") or []) > 1 for spot in spots), "EACH SPOT REQUIRES TWO OR MORE HOLES OR RANGES."
+
+        from .equity_tools import EquitySolver
+
+        engine = RandomEngine.resolve(rng, seed)
+        groups = {}
+        results = [None]*len(spots)
+        for position, spot in enumerate(spots):
+            board = [card.getIndex() for card in Card.generateSet(spot.get("board") or [])]
+            dead = [card.getIndex() for card in Card.generateSet(spot.get("dead") or [])]
+            holes = [[card.getIndex() for card in Card.generateSet(hole)] for hole in (spot.get("holes") or [])]
+            cards = board + dead + [card for hole in holes for card in hole]
+            assert len(board) <= 5 and len(set(cards)) == len(cards), "SPOT CARDS ARE NOT DISTINCT."
+            assert all(len(hole) in {0, 2} for hole in holes), "EACH HOLE MUST HAVE ZERO OR 2 CARDS."
+
+            if holes and not all(holes):
+                results[position] = EquitySolver.fromSpot(spot).calculateHandEquity(trials, rng = engine)
+                continue
+            key = (tuple(board), frozenset(dead))
+            if key not in groups:
+                groups[key] = SpotBatch(board, dead, trials, exactLimit, engine)
+            group = groups[key]
+            results[position] = (group.handEquity(holes) if holes else group.rangeEquity(spot["ranges"]))
+        return(results)
@@ -6,9 +6,17 @@ setup(
     name='pokeriq', 
     version='0.2.0',      
     packages=find_packages(),  
+    package_data={'pokeriq': ['data/*.npz']},
     install_requires=[
-        'scipy>=1.2.0'
+        'scipy>=1.7.0',
+        'numpy>=1.25.0'
     ],     
+    extras_require={
+        'jit': ['numba>=0.58.0']
+    },
+    entry_points={
+        'console_scripts': ['pokeriq=pokeriq.cli:main']
+    },
     description='A Micro-Library for Holdem Simulation',  
     python_requires='>=3.7',  
     url='https://github.com/sumaddury/pokeriq',